@@ -0,0 +1,52 @@
+"""Time to get the statements of a script from disk, parsed or from its cache.
+
+python -m benchmarks.cache [DECLARATIONS]
+"""
+
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from plox import cache
+from plox.ast import Stmt
+from plox.parser import Parser
+from plox.scanner import RegexScanner, mapped_source
+
+from .programs import declarations
+
+
+def _parse(path: Path) -> list[Stmt]:
+    with mapped_source(path) as source:
+        return Parser(RegexScanner(source).scan_tokens()).parse()
+
+
+def _load(path: Path) -> list[Stmt]:
+    with mapped_source(path) as source:
+        statements = cache.load(path, source)
+    assert statements is not None
+    return statements
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp) / "benchmark.lox"
+        path.write_text(declarations(n))
+        print(f"{path.stat().st_size / 1e6:.1f} MB of source, {n} declarations")
+
+        with mapped_source(path) as source:
+            cache.dump(path, source, _parse(path))
+        size = cache.cache_path(path).stat().st_size
+        print(f"{size / 1e6:.1f} MB cached")
+
+        for load in (_parse, _load):
+            start = perf_counter()
+            load(path)
+            elapsed = perf_counter() - start
+            print(f"{load.__name__:>6}: {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
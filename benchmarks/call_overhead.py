@@ -0,0 +1,63 @@
+"""Time per call of a Lox function that does nothing, and of a native, by engine.
+
+The time of the same loop without the call is subtracted.
+
+python -m benchmarks.call_overhead [ITERATIONS]
+"""
+
+import sys
+from collections.abc import Callable
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from plox.interpreter import ClosureInterpreter, Interpreter, StackInterpreter
+from plox.lox import Lox
+
+_ENGINES: dict[str, Callable[[], Interpreter]] = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "stack": StackInterpreter,
+}
+
+_CALLS = {
+    "none": "nil",
+    "function": "f()",
+    "native": "clock()",
+}
+
+
+def _loop(n: int, call: str) -> str:
+    return (
+        "fun f() {}\n"
+        "{\n"
+        f"  for (var i = 0; i < {n}; i = i + 1) {{\n"
+        f"    {call};\n"
+        "  }\n"
+        "}\n"
+    )
+
+
+def _time(engine: Callable[[], Interpreter], source: str) -> float:
+    start = perf_counter()
+    with redirect_stdout(StringIO()):
+        Lox(caching=False, engine=engine).run(source)
+    return perf_counter() - start
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    for name, engine in _ENGINES.items():
+        times = {
+            call: _time(engine, _loop(n, source)) for call, source in _CALLS.items()
+        }
+        per_call = ", ".join(
+            f"{call} {(times[call] - times['none']) / n * 1e6:.2f} µs"
+            for call in ("function", "native")
+        )
+        print(f"{name:>8}: {per_call} per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Time per call of a recursive function, and memory per call environment.
+
+Without resolving, each call's environment stores its variables in a dict, by name.
+Resolved, it stores them in a list, by slot.
+
+python -m benchmarks.calls [N]
+"""
+
+import sys
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from plox.environment import Environment
+from plox.interpreter import Interpreter
+from plox.parser import Parser
+from plox.resolver import resolve
+from plox.scanner import RegexScanner
+from plox.tokens import Token, TokenType
+
+from .programs import fib
+
+_ENVIRONMENTS = 100_000
+
+
+def _calls(n: int) -> int:
+    return 1 if n < 2 else _calls(n - 2) + _calls(n - 1) + 1
+
+
+def _environment_size(resolved: bool) -> float:
+    name = Token(TokenType.IDENTIFIER, "n", None, 1)
+    tracemalloc.start()
+    environments = []
+    for i in range(_ENVIRONMENTS):
+        if resolved:
+            environments.append(Environment(None, [float(i)]))
+        else:
+            env = Environment()
+            env.define(name, float(i))
+            environments.append(env)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Don't count the list's pointer to each environment, or the float.
+    return held / _ENVIRONMENTS - 8 - 24
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    source = fib(n)
+    calls = _calls(n)
+    print(f"fib({n}): {calls} calls")
+
+    for resolving in (False, True):
+        statements = Parser(RegexScanner(source).scan_tokens()).parse()
+        start = perf_counter()
+        if resolving:
+            resolve(statements)
+        with redirect_stdout(StringIO()):
+            Interpreter().interpret(statements)
+        elapsed = perf_counter() - start
+        label = "resolved" if resolving else "unresolved"
+        print(
+            f"{label:>10}: {elapsed:.2f} s, {elapsed / calls * 1e6:.1f} µs per call, "
+            f"{_environment_size(resolving):.0f} bytes per environment"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Time to run recursive, loop- and closure-heavy programs with each engine.
+
+python -m benchmarks.engines [FIB_N] [ITERATIONS]
+"""
+
+import sys
+from collections.abc import Callable
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from plox.interpreter import (
+    ClosureInterpreter,
+    Interpreter,
+    StackInterpreter,
+    TranspilingInterpreter,
+    VMInterpreter,
+)
+from plox.lox import Lox
+
+from .programs import calls, closures, fib, loops
+
+_ENGINES: dict[str, Callable[[], Interpreter]] = {
+    "tree": Interpreter,
+    "stack": StackInterpreter,
+    "closure": ClosureInterpreter,
+    "python": TranspilingInterpreter,
+    "vm": VMInterpreter,
+}
+
+
+def main() -> None:
+    fib_n = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    programs = {
+        "fib": fib(fib_n),
+        "calls": calls(n),
+        "loops": loops(n),
+        "closures": closures(n),
+    }
+
+    for name, source in programs.items():
+        for engine_name, engine in _ENGINES.items():
+            start = perf_counter()
+            with redirect_stdout(StringIO()):
+                Lox(caching=False, engine=engine).run(source)
+            elapsed = perf_counter() - start
+            print(f"{name:>8}, {engine_name:>7}: {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
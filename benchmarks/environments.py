@@ -0,0 +1,40 @@
+"""Environments created, and reused, running recursive and loop-heavy programs.
+
+python -m benchmarks.environments [FIB_N] [ITERATIONS]
+"""
+
+import sys
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from plox.environment import Environment
+from plox.lox import Lox
+
+from .programs import closures, fib, loops
+
+
+def main() -> None:
+    fib_n = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    programs = {
+        "fib": fib(fib_n),
+        "loops": loops(n),
+        "closures": closures(n),
+    }
+
+    for name, source in programs.items():
+        created, reused = Environment.created, Environment.reused
+        start = perf_counter()
+        with redirect_stdout(StringIO()):
+            Lox(caching=False).run(source)
+        elapsed = perf_counter() - start
+        created, reused = Environment.created - created, Environment.reused - reused
+        print(
+            f"{name:>8}: {elapsed:.2f} s, {created} environments created, "
+            f"{reused} reused"
+        )
+
+
+if __name__ == "__main__":
+    main()
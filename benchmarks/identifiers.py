@@ -0,0 +1,67 @@
+"""Memory held by the identifiers of parsed scripts, and time to look variables up.
+
+Reports the number of identifier tokens, and of distinct lexeme strings they hold,
+each of which is hashed the first time it is looked up, the memory held by the
+statements parsed from a script of many declarations, and the time to run a loop
+over global variables, which are looked up by name.
+
+python -m benchmarks.identifiers [DECLARATIONS] [ITERATIONS]
+"""
+
+import sys
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from plox.lox import Lox
+from plox.parser import Parser
+from plox.scanner import RegexScanner
+from plox.tokens import TokenType
+
+from .programs import declarations
+
+
+def _globals_loop(n: int) -> str:
+    """Return a program that loops n times reading and assigning global variables."""
+    return (
+        "var total = 0;\n"
+        "var count = 0;\n"
+        f"while (count < {n}) {{\n"
+        "  total = total + count;\n"
+        "  count = count + 1;\n"
+        "}\n"
+        "print total;\n"
+    )
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    source = declarations(n)
+
+    identifiers = [
+        token.lexeme
+        for token in RegexScanner(source).scan_tokens()
+        if token.kind == TokenType.IDENTIFIER
+    ]
+    strings = len({id(lexeme) for lexeme in identifiers})
+    print(f"{len(identifiers)} identifiers, {strings} distinct lexeme strings")
+    del identifiers
+
+    tracemalloc.start()
+    statements = Parser(RegexScanner(source).scan_tokens()).parse()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del statements
+    print(f"{held / 2**20:.1f} MiB held by the statements of {n} declarations")
+
+    start = perf_counter()
+    with redirect_stdout(StringIO()):
+        Lox(caching=False).run(_globals_loop(iterations))
+    elapsed = perf_counter() - start
+    print(f"{elapsed:.2f} s for {iterations} iterations over globals")
+
+
+if __name__ == "__main__":
+    main()
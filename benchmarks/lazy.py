@@ -0,0 +1,30 @@
+"""Time to run a "library" of functions of which only one is called.
+
+python -m benchmarks.lazy [DECLARATIONS]
+"""
+
+import sys
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from plox.lox import Lox
+
+from .programs import declarations
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    source = declarations(n) + "print f0(10, 5);\n"
+    print(f"{len(source) / 1e6:.1f} MB of source, {n} declarations")
+
+    for lazy in (False, True):
+        start = perf_counter()
+        with redirect_stdout(StringIO()):
+            Lox(lazy=lazy).run(source)
+        elapsed = perf_counter() - start
+        print(f"{'lazy' if lazy else 'eager':>5}: {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
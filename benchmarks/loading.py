@@ -0,0 +1,52 @@
+"""Time and memory to load and scan a script from disk.
+
+Compares decoding the whole file with Path.read_text against scanning it in place
+with mapped_source. Memory is as traced by tracemalloc, which counts the decoded
+source but not the file-backed pages of a memory map.
+
+    python -m benchmarks.loading [DECLARATIONS]
+"""
+
+import sys
+import tracemalloc
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from plox.scanner import RegexScanner, mapped_source
+
+from .programs import declarations
+
+
+def _read_text(path: Path) -> None:
+    RegexScanner(path.read_text()).scan_tokens()
+
+
+def _mapped(path: Path) -> None:
+    with mapped_source(path) as source:
+        RegexScanner(source).scan_tokens()
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp) / "benchmark.lox"
+        path.write_text(declarations(n))
+        print(f"{path.stat().st_size / 1e6:.1f} MB of source, {n} declarations")
+
+        for load in (_read_text, _mapped):
+            start = perf_counter()
+            load(path)
+            elapsed = perf_counter() - start
+
+            tracemalloc.start()
+            load(path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(f"{load.__name__:>11}: {elapsed:.2f} s, {peak / 2**20:7.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
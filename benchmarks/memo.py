@@ -0,0 +1,41 @@
+"""Time to run recursive programs with and without memoizing pure functions.
+
+python -m benchmarks.memo [FIB_N] [ITERATIONS] [MEMO_SIZE]
+"""
+
+import sys
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from plox.lox import Lox
+from plox.memo import Memo
+
+from .programs import calls, fib
+
+
+def main() -> None:
+    fib_n = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    memo_size = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    programs = {
+        "fib": fib(fib_n),
+        "calls": calls(n),
+    }
+
+    for name, source in programs.items():
+        for memoize in (0, memo_size):
+            hits, misses, evictions = Memo.hits, Memo.misses, Memo.evictions
+            start = perf_counter()
+            with redirect_stdout(StringIO()):
+                Lox(caching=False, memoize=memoize).run(source)
+            elapsed = perf_counter() - start
+            print(
+                f"{name:>8} {memoize:>6}: {elapsed:.2f} s, {Memo.hits - hits} hits,"
+                f" {Memo.misses - misses} misses, {Memo.evictions - evictions}"
+                " evictions"
+            )
+
+
+if __name__ == "__main__":
+    main()
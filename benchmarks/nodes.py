@@ -0,0 +1,48 @@
+"""Time and memory to construct AST nodes.
+
+python -m benchmarks.nodes [NODES]
+"""
+
+import sys
+import tracemalloc
+from collections.abc import Callable
+from time import perf_counter
+from typing import Union
+
+from plox.ast import Binary, Block, Call, Expr, Literal, Stmt, Variable
+from plox.tokens import Token, TokenType
+
+_TOKEN = Token(TokenType.PLUS, "+", None, 1)
+_EXPR = Literal(1.0)
+
+_NODES: dict[str, Callable[[], Union[Expr, Stmt]]] = {
+    "Binary": lambda: Binary(_EXPR, _TOKEN, _EXPR),
+    "Call": lambda: Call(_EXPR, _TOKEN, []),
+    "Literal": lambda: Literal(1.0),
+    "Variable": lambda: Variable(_TOKEN),
+    "Block": lambda: Block([]),
+}
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    for name, construct in _NODES.items():
+        start = perf_counter()
+        for _ in range(n):
+            construct()
+        elapsed = perf_counter() - start
+
+        tracemalloc.start()
+        nodes = [construct() for _ in range(n)]
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del nodes
+
+        # Don't count the list's pointer to each node.
+        size = held / n - 8
+        print(f"{name:>8}: {elapsed / n * 1e9:6.0f} ns, {size:5.0f} bytes per node")
+
+
+if __name__ == "__main__":
+    main()
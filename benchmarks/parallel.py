@@ -0,0 +1,41 @@
+"""Parallel scanning and parsing speedup versus number of worker processes.
+
+python -m benchmarks.parallel [DECLARATIONS]
+"""
+
+import os
+import sys
+from time import perf_counter
+
+from plox import parallel
+from plox.parser import Parser
+from plox.scanner import RegexScanner
+
+from .programs import declarations
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    source = declarations(n)
+    cores = os.cpu_count() or 1
+    print(f"{len(source) / 1e6:.1f} MB of source, {n} declarations, {cores} cores")
+
+    start = perf_counter()
+    Parser(RegexScanner(source).scan_tokens()).parse()
+    serial = perf_counter() - start
+    print(f"   serial: {serial:6.2f} s")
+
+    workers = 1
+    while workers <= cores:
+        start = perf_counter()
+        parallel.parse(source, workers)
+        elapsed = perf_counter() - start
+        print(
+            f"{workers:>2} worker{'s' if workers > 1 else ' '}: {elapsed:6.2f} s,"
+            f" {serial / elapsed:4.1f}x"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
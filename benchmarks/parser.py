@@ -0,0 +1,34 @@
+"""Parser throughput, in tokens per second.
+
+python -m benchmarks.parser [DECLARATIONS]
+"""
+
+import sys
+from time import perf_counter
+
+from plox.parser import Parser
+from plox.scanner import RegexScanner
+
+from .programs import declarations, expressions
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    for name, source in [
+        ("declarations", declarations(n)),
+        ("expressions", expressions(n)),
+    ]:
+        # Materialize the tokens first, so that only parsing is timed.
+        tokens = list(RegexScanner(source).scan_tokens())
+        start = perf_counter()
+        Parser(tokens).parse()
+        elapsed = perf_counter() - start
+        print(
+            f"{name:>12}: {len(tokens) / elapsed:10,.0f} tokens/s"
+            f" ({len(tokens)} tokens, {elapsed:.2f} s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
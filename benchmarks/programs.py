@@ -0,0 +1,98 @@
+"""Synthetic Lox programs for benchmarking.
+
+These mimic the large generated scripts plox is used for: many independent
+top-level declarations, each small, with a little of every kind of token.
+"""
+
+
+def declarations(n: int) -> str:
+    """Return a program of n top-level declarations, alternating 'fun' and 'var'."""
+    lines = []
+    for i in range(n):
+        if i % 2:
+            lines.append(f'var v{i} = "value {i}" + "!"; // {i}')
+        else:
+            lines.append(
+                f"fun f{i}(a, b) {{\n"
+                f"  var total = 0;\n"
+                f"  for (var j = 0; j < a; j = j + 1) {{\n"
+                f"    if (j >= b and !(j == {i}.5)) total = total + j * 2;\n"
+                f"  }}\n"
+                f"  return total - {i};\n"
+                f"}}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def expressions(n: int) -> str:
+    """Return a program of n expression-heavy 'var' declarations."""
+    return "".join(
+        f'var e{i} = -a{i} + b * (c - {i}) / d >= e or !f and g(h, {i}) == "s";\n'
+        for i in range(n)
+    )
+
+
+def closures(n: int) -> str:
+    """Return a program that makes and calls n closures over a local variable."""
+    return (
+        "fun counter(start) {\n"
+        "  var count = start;\n"
+        "  fun increment() {\n"
+        "    count = count + 1;\n"
+        "    return count;\n"
+        "  }\n"
+        "  return increment;\n"
+        "}\n"
+        "{\n"
+        "  var total = 0;\n"
+        f"  for (var i = 0; i < {n}; i = i + 1) {{\n"
+        "    var c = counter(i);\n"
+        "    c();\n"
+        "    total = total + c();\n"
+        "  }\n"
+        "  print total;\n"
+        "}\n"
+    )
+
+
+def loops(n: int) -> str:
+    """Return a program of nested loops, n iterations in all, over block locals."""
+    return (
+        "{\n"
+        "  var total = 0;\n"
+        f"  for (var i = 0; i < {n // 10}; i = i + 1) {{\n"
+        "    for (var j = 0; j < 10; j = j + 1) {\n"
+        "      var k = i * j;\n"
+        "      if (k > 4) total = total + k; else total = total - 1;\n"
+        "    }\n"
+        "  }\n"
+        "  print total;\n"
+        "}\n"
+    )
+
+
+def calls(n: int) -> str:
+    """Return a program that calls a small function n times in a loop."""
+    return (
+        "fun add(a, b) {\n"
+        "  return a + b;\n"
+        "}\n"
+        "{\n"
+        "  var total = 0;\n"
+        f"  for (var i = 0; i < {n}; i = i + 1) {{\n"
+        "    total = add(total, i);\n"
+        "  }\n"
+        "  print total;\n"
+        "}\n"
+    )
+
+
+def fib(n: int) -> str:
+    """Return a program that computes the nth Fibonacci number by naive recursion."""
+    return (
+        "fun fib(n) {\n"
+        "  if (n < 2) return n;\n"
+        "  return fib(n - 2) + fib(n - 1);\n"
+        "}\n"
+        f"print fib({n});\n"
+    )
@@ -0,0 +1,39 @@
+"""Time to run closure- and loop-heavy programs with and without resolving them.
+
+Unresolved variables are looked up along the chain of environments, resolved ones
+in the environment found by the resolver.
+
+python -m benchmarks.resolver [ITERATIONS]
+"""
+
+import sys
+from contextlib import redirect_stdout
+from io import StringIO
+from time import perf_counter
+
+from plox.interpreter import Interpreter
+from plox.parser import Parser
+from plox.resolver import resolve
+from plox.scanner import RegexScanner
+
+from .programs import closures, loops
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    for name, source in (("closures", closures(n)), ("loops", loops(n))):
+        for resolving in (False, True):
+            statements = Parser(RegexScanner(source).scan_tokens()).parse()
+            start = perf_counter()
+            if resolving:
+                resolve(statements)
+            with redirect_stdout(StringIO()):
+                Interpreter().interpret(statements)
+            elapsed = perf_counter() - start
+            label = "resolved" if resolving else "unresolved"
+            print(f"{name:>8}, {label:>10}: {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
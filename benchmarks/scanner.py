@@ -0,0 +1,30 @@
+"""Scanner throughput, in tokens per second.
+
+python -m benchmarks.scanner [DECLARATIONS]
+"""
+
+import sys
+from time import perf_counter
+
+from plox.scanner import RegexScanner, Scanner
+
+from .programs import declarations
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    source = declarations(n)
+    print(f"{len(source) / 1e6:.1f} MB of source, {n} declarations")
+
+    for scanner in (Scanner, RegexScanner):
+        start = perf_counter()
+        tokens = scanner(source).scan_tokens()
+        elapsed = perf_counter() - start
+        print(
+            f"{scanner.__name__:>12}: {len(tokens) / elapsed:12,.0f} tokens/s"
+            f" ({elapsed:.2f} s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Memory held by scanned tokens, and while parsing them.
+
+Compares a list of Token objects with a TokenStream, reporting the memory held by
+the tokens once scanned, the peak while scanning and parsing, and the number of
+garbage collections triggered.
+
+    python -m benchmarks.tokens [DECLARATIONS]
+"""
+
+import gc
+import sys
+import tracemalloc
+from collections.abc import Sequence
+from typing import Callable
+
+from plox.parser import Parser
+from plox.scanner import RegexScanner
+from plox.tokens import Token
+
+from .programs import declarations
+
+
+def _collections() -> int:
+    return sum(stats["collections"] for stats in gc.get_stats())
+
+
+def _measure(name: str, scan: Callable[[str], Sequence[Token]], source: str) -> None:
+    gc.collect()
+    collections = _collections()
+    tracemalloc.start()
+
+    tokens = scan(source)
+    held, _ = tracemalloc.get_traced_memory()
+    statements = Parser(tokens).parse()
+    _, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+    collections = _collections() - collections
+    del tokens, statements
+
+    print(
+        f"{name:>12}: {held / 2**20:7.1f} MiB held by tokens,"
+        f" {peak / 2**20:7.1f} MiB peak, {collections:4} GC collections"
+    )
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    source = declarations(n)
+    print(f"{len(source) / 1e6:.1f} MB of source, {n} declarations")
+
+    _measure("list[Token]", lambda s: list(RegexScanner(s).scan_tokens()), source)
+    _measure("TokenStream", lambda s: RegexScanner(s).scan_tokens(), source)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from .closures import compile_expr, compile_stmt
 from .evaluation import evaluate
 from .execution import execute
 from .expressions import (
@@ -15,6 +16,9 @@ from .printer import ast_str
 from .statements import Block, Expression, Function, If, Print, Return, Stmt, Var, While
 
 __all__ = [
+    # .closures
+    "compile_expr",
+    "compile_stmt",
     # .evaluation
     "evaluate",
     # .expressions
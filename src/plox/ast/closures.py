@@ -0,0 +1,467 @@
+"""Compile the AST into nested Python closures.
+
+evaluate and execute dispatch on the type of each node every time it runs. Here each
+node is instead compiled, once, into a closure specialised for it, e.g. for its
+operator or how its variable was resolved, that calls the closures of its children
+directly. Running a statement is then just calling its closure with an environment.
+The closures behave exactly as evaluate and execute do.
+"""
+
+from functools import singledispatch
+from typing import Any, Callable, Optional
+
+from plox.callables import LoxCallable
+from plox.environment import GLOBAL, Environment
+from plox.errors import ExecutionError
+from plox.tokens import TokenType
+
+from .evaluation import (
+    _binary_op_check,
+    _binary_op_error,
+    _binary_op_fn,
+    _divide,
+    _unary_op_error,
+)
+from .execution import Completion, LoxFunction, Returned, TailCall, _stringify
+from .expressions import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Grouping,
+    Literal,
+    Logical,
+    Unary,
+    Variable,
+)
+from .statements import Block, Expression, Function, If, Print, Return, Stmt, Var, While
+
+# Expressions' closures return their values, statements' how they completed, see
+# execute.
+Closure = Callable[[Environment], object]
+StmtClosure = Callable[[Environment], Completion]
+
+
+class CompiledFunction(LoxFunction):
+    """A function whose body is compiled when it is first called.
+
+    Functions declared by the same statement share the compiled body.
+    """
+
+    def __init__(
+        self, declaration: Function, env: Environment, body: list[list[StmtClosure]]
+    ) -> None:
+        super().__init__(declaration, env)
+        # Empty until compiled, then holding the closures of the body's statements.
+        self._body = body
+
+    def _run(self, statements: list[Stmt], env: Environment) -> Completion:
+        if not self._body:
+            self._body.append([compile_stmt(statement) for statement in statements])
+        for closure in self._body[0]:
+            completion = closure(env)
+            if completion is not None:
+                return completion
+        return None
+
+
+@singledispatch
+def _compile_expr(expr: Any) -> Closure:
+    raise TypeError(f"compile_expr does not support {type(expr)}")
+
+
+def compile_expr(expr: Expr) -> Closure:
+    """Compile expr into a closure that evaluates it in an environment."""
+    return _compile_expr(expr)
+
+
+@singledispatch
+def _compile_stmt(stmt: Any) -> StmtClosure:
+    raise TypeError(f"compile_stmt does not support {type(stmt)}")
+
+
+def compile_stmt(stmt: Stmt) -> StmtClosure:
+    """Compile stmt into a closure that executes it in an environment."""
+    return _compile_stmt(stmt)
+
+
+@_compile_expr.register(Assign)
+def _compile_assign(expr: Assign) -> Closure:
+    value = compile_expr(expr.value)
+    name, depth, slot = expr.name, expr.depth, expr.slot
+
+    if depth is None:
+
+        def assign(env: Environment) -> object:
+            v = value(env)
+            env[name] = v
+            return v
+
+        return assign
+
+    if depth == GLOBAL:
+
+        def assign_global(env: Environment) -> object:
+            v = value(env)
+            env.globals[name] = v
+            return v
+
+        return assign_global
+
+    if depth == 0:
+
+        def assign_local(env: Environment) -> object:
+            v = value(env)
+            env.slots[slot] = v
+            return v
+
+        return assign_local
+
+    def assign_enclosing(env: Environment) -> object:
+        v = value(env)
+        env.set_at(depth, slot, v)
+        return v
+
+    return assign_enclosing
+
+
+@_compile_expr.register(Binary)
+def _compile_binary(expr: Binary) -> Closure:
+    left, right = compile_expr(expr.left), compile_expr(expr.right)
+    operator = expr.operator
+    op = _binary_op_fn[operator.kind]
+    message = _binary_op_error(operator)
+
+    # As in evaluate, both operands are evaluated, left first, before either is
+    # checked.
+
+    def binary(env: Environment) -> object:
+        return op(left(env), right(env))
+
+    def plus(env: Environment) -> object:
+        x, y = left(env), right(env)
+        if isinstance(x, float) and isinstance(y, float):
+            return x + y
+        if isinstance(x, str) and isinstance(y, str):
+            return x + y
+        raise ExecutionError(message, operator)
+
+    def numeric(env: Environment) -> object:
+        x, y = left(env), right(env)
+        if isinstance(x, float) and isinstance(y, float):
+            return op(x, y)
+        raise ExecutionError(message, operator)
+
+    def divide(env: Environment) -> object:
+        x, y = left(env), right(env)
+        if isinstance(x, float) and isinstance(y, float):
+            return _divide(x, y)
+        raise ExecutionError(message, operator)
+
+    if operator.kind not in _binary_op_check:
+        return binary
+    if operator.kind == TokenType.PLUS:
+        return plus
+    if operator.kind == TokenType.SLASH:
+        return divide
+    return numeric
+
+
+def _compile_callee_and_arguments(
+    expr: Call,
+) -> Callable[[Environment], tuple[LoxCallable, list[object]]]:
+    callee, paren = compile_expr(expr.callee), expr.paren
+    arguments = [compile_expr(argument) for argument in expr.arguments]
+    # See evaluate.
+    last: Optional[LoxCallable] = None
+
+    def callee_and_arguments(env: Environment) -> tuple[LoxCallable, list[object]]:
+        nonlocal last
+        function = callee(env)
+        if last is not None and function is last:
+            return last, [argument(env) for argument in arguments]
+
+        if not isinstance(function, LoxCallable):
+            raise ExecutionError("Can only call functions and classes.", paren)
+
+        values = [argument(env) for argument in arguments]
+        if len(values) != function.arity:
+            raise ExecutionError(
+                f"Expected {function.arity} arguments but got {len(values)}.", paren
+            )
+
+        last = function
+        return function, values
+
+    return callee_and_arguments
+
+
+@_compile_expr.register(Call)
+def _compile_call(expr: Call) -> Closure:
+    callee_and_arguments = _compile_callee_and_arguments(expr)
+
+    def call(env: Environment) -> object:
+        function, values = callee_and_arguments(env)
+        return function.call(values)
+
+    return call
+
+
+@_compile_expr.register(Grouping)
+def _compile_grouping(expr: Grouping) -> Closure:
+    return compile_expr(expr.expression)
+
+
+@_compile_expr.register(Literal)
+def _compile_literal(expr: Literal) -> Closure:
+    value = expr.value
+
+    def literal(_: Environment) -> object:
+        return value
+
+    return literal
+
+
+@_compile_expr.register(Logical)
+def _compile_logical(expr: Logical) -> Closure:
+    left, right = compile_expr(expr.left), compile_expr(expr.right)
+
+    def logical_or(env: Environment) -> object:
+        x = left(env)
+        if x is not None and x is not False:
+            return x
+        return right(env)
+
+    def logical_and(env: Environment) -> object:
+        x = left(env)
+        if x is None or x is False:
+            return x
+        return right(env)
+
+    return logical_or if expr.operator.kind == TokenType.OR else logical_and
+
+
+@_compile_expr.register(Unary)
+def _compile_unary(expr: Unary) -> Closure:
+    right, operator = compile_expr(expr.right), expr.operator
+
+    def bang(env: Environment) -> object:
+        x = right(env)
+        return x is None or x is False
+
+    def minus(env: Environment) -> object:
+        x = right(env)
+        if isinstance(x, float):
+            return -x
+        raise ExecutionError(_unary_op_error(operator), operator)
+
+    if operator.kind == TokenType.BANG:
+        return bang
+    if operator.kind == TokenType.MINUS:
+        return minus
+    # This is an internal error.
+    raise RuntimeError(f"unexpected Unary operator: {operator.kind}")
+
+
+@_compile_expr.register(Variable)
+def _compile_variable(expr: Variable) -> Closure:
+    name, depth, slot = expr.name, expr.depth, expr.slot
+
+    if depth is None:
+
+        def variable(env: Environment) -> object:
+            return env[name]
+
+        return variable
+
+    if depth == GLOBAL:
+
+        def variable_global(env: Environment) -> object:
+            return env.globals[name]
+
+        return variable_global
+
+    if depth == 0:
+
+        def variable_local(env: Environment) -> object:
+            return env.slots[slot]
+
+        return variable_local
+
+    def variable_enclosing(env: Environment) -> object:
+        return env.get_at(depth, slot)
+
+    return variable_enclosing
+
+
+@_compile_stmt.register(Block)
+def _compile_block(stmt: Block) -> StmtClosure:
+    statements = [compile_stmt(statement) for statement in stmt.statements]
+    size, free = stmt.size, stmt.free
+
+    # See execute.
+    if size is None:
+
+        def block(env: Environment) -> Completion:
+            env = Environment(enclosing=env)
+            for statement in statements:
+                completion = statement(env)
+                if completion is not None:
+                    return completion
+            return None
+
+        return block
+
+    if not size:
+
+        def block_in_enclosing(env: Environment) -> Completion:
+            for statement in statements:
+                completion = statement(env)
+                if completion is not None:
+                    return completion
+            return None
+
+        return block_in_enclosing
+
+    if free is None:
+
+        def block_sized(env: Environment) -> Completion:
+            env = Environment(env, [None] * size)
+            for statement in statements:
+                completion = statement(env)
+                if completion is not None:
+                    return completion
+            return None
+
+        return block_sized
+
+    def block_reusing(env: Environment) -> Completion:
+        env = free.pop().reuse(env) if free else Environment(env, [None] * size)
+        completion = None
+        for statement in statements:
+            completion = statement(env)
+            if completion is not None:
+                break
+        free.append(env)
+        return completion
+
+    return block_reusing
+
+
+@_compile_stmt.register(Expression)
+def _compile_expression(stmt: Expression) -> StmtClosure:
+    expression = compile_expr(stmt.expression)
+
+    def expression_(env: Environment) -> None:
+        expression(env)
+
+    return expression_
+
+
+@_compile_stmt.register(Function)
+def _compile_function(stmt: Function) -> StmtClosure:
+    name, slot = stmt.name, stmt.slot
+    body: list[list[StmtClosure]] = []
+
+    if slot is None:
+
+        def function(env: Environment) -> None:
+            env.define(name, CompiledFunction(stmt, env, body))
+
+        return function
+
+    def function_local(env: Environment) -> None:
+        env.slots[slot] = CompiledFunction(stmt, env, body)
+
+    return function_local
+
+
+@_compile_stmt.register(If)
+def _compile_if(stmt: If) -> StmtClosure:
+    condition = compile_expr(stmt.condition)
+    then_branch = compile_stmt(stmt.then_branch)
+
+    if stmt.else_branch is None:
+
+        def if_then(env: Environment) -> Completion:
+            x = condition(env)
+            if x is not None and x is not False:
+                return then_branch(env)
+            return None
+
+        return if_then
+
+    else_branch = compile_stmt(stmt.else_branch)
+
+    def if_then_else(env: Environment) -> Completion:
+        x = condition(env)
+        if x is not None and x is not False:
+            return then_branch(env)
+        return else_branch(env)
+
+    return if_then_else
+
+
+@_compile_stmt.register(Print)
+def _compile_print(stmt: Print) -> StmtClosure:
+    expression = compile_expr(stmt.expression)
+
+    def print_(env: Environment) -> None:
+        print(_stringify(expression(env)))
+
+    return print_
+
+
+@_compile_stmt.register(Return)
+def _compile_return(stmt: Return) -> StmtClosure:
+    if stmt.call is None:
+        expression = compile_expr(stmt.expression)
+
+        def return_(env: Environment) -> Completion:
+            return Returned(expression(env))
+
+        return return_
+
+    callee_and_arguments = _compile_callee_and_arguments(stmt.call)
+
+    # See execute.
+    def return_call(env: Environment) -> Completion:
+        function, values = callee_and_arguments(env)
+        if isinstance(function, LoxFunction):
+            return TailCall(function, values)
+        return Returned(function.call(values))
+
+    return return_call
+
+
+@_compile_stmt.register(Var)
+def _compile_var(stmt: Var) -> StmtClosure:
+    initializer, name, slot = compile_expr(stmt.initializer), stmt.name, stmt.slot
+
+    if slot is None:
+
+        def var(env: Environment) -> None:
+            env.define(name, initializer(env))
+
+        return var
+
+    def var_local(env: Environment) -> None:
+        env.slots[slot] = initializer(env)
+
+    return var_local
+
+
+@_compile_stmt.register(While)
+def _compile_while(stmt: While) -> StmtClosure:
+    condition, body = compile_expr(stmt.condition), compile_stmt(stmt.body)
+
+    def while_(env: Environment) -> Completion:
+        while True:
+            x = condition(env)
+            if x is None or x is False:
+                return None
+            completion = body(env)
+            if completion is not None:
+                return completion
+
+    return while_
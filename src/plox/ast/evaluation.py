@@ -1,11 +1,11 @@
 from functools import singledispatch
 from math import copysign
-from operator import add, eq, ge, gt, le, lt, mul, ne, neg, sub, truediv
+from operator import add, eq, ge, gt, le, lt, mul, ne, neg, sub
 from typing import Any, Protocol, overload
 
-from plox.environment import Environment
+from plox.callables import LoxCallable
+from plox.environment import GLOBAL, Environment
 from plox.errors import ExecutionError
-from plox.protocols import SupportsCall
 from plox.tokens import Token, TokenType
 
 from .expressions import (
@@ -39,6 +39,17 @@ def _neg(x: object) -> object:
     raise TypeError
 
 
+def _divide(x: float, y: float) -> float:
+    try:
+        return x / y
+    except ZeroDivisionError:
+        if x == 0:
+            return float("nan")
+
+        # Account for y being signed zero.
+        return copysign(float("inf"), x * y)
+
+
 def _truthy(x: object) -> bool:
     if x is None or x is False:
         return False
@@ -70,7 +81,7 @@ _binary_op_fn = {
     TokenType.LESS_EQUAL: le,
     TokenType.MINUS: sub,
     TokenType.PLUS: add,  # This works for strings and numbers
-    TokenType.SLASH: truediv,
+    TokenType.SLASH: _divide,
     TokenType.STAR: mul,
 }
 
@@ -90,6 +101,80 @@ _unary_op_fn = {
     TokenType.MINUS: _neg,
 }
 
+# The functions of the unary operators, for operands already checked.
+_unary_op_quick = {
+    TokenType.BANG: _unary_op_fn[TokenType.BANG],
+    TokenType.MINUS: neg,
+}
+
+
+def _callee_and_arguments(
+    expr: Call, env: Environment
+) -> tuple[LoxCallable, list[object]]:
+    """Evaluate the callee and arguments of expr, checking the callee can be called."""
+    callee = evaluate(expr.callee, env)
+    last = expr.last
+    if last is not None and callee is last:
+        return last, [evaluate(arg, env) for arg in expr.arguments]
+
+    if not isinstance(callee, LoxCallable):
+        raise ExecutionError("Can only call functions and classes.", expr.paren)
+
+    arguments = [evaluate(arg, env) for arg in expr.arguments]
+    if len(arguments) != callee.arity:
+        raise ExecutionError(
+            f"Expected {callee.arity} arguments but got {len(arguments)}.", expr.paren
+        )
+
+    expr.last = callee
+    return callee, arguments
+
+
+def _assign(expr: Assign, env: Environment, value: object) -> object:
+    depth = expr.depth
+    if depth is None:
+        env[expr.name] = value
+    elif depth == GLOBAL:
+        env.globals[expr.name] = value
+    else:
+        env.set_at(depth, expr.slot, value)
+    return value
+
+
+def _binary(expr: Binary, left: object, right: object) -> object:
+    """Apply the operator of expr to its operands, checking them, and quicken expr."""
+    check = _binary_op_check.get(expr.operator.kind, None)
+    if check is not None and not check(left, right):
+        msg = _binary_op_error(expr.operator)
+        raise ExecutionError(msg, expr.operator)
+
+    try:
+        op = _binary_op_fn[expr.operator.kind]
+    except KeyError as e:
+        # This is an internal error.
+        raise RuntimeError(f"unexpected Binary operator: {expr.operator.kind}") from e
+
+    expr.quick = (type(left), type(right), op)
+    return op(left, right)
+
+
+def _unary(expr: Unary, right: object) -> object:
+    """Apply the operator of expr to its operand, checking it, and quicken expr."""
+    try:
+        op = _unary_op_fn[expr.operator.kind]
+    except KeyError as e:
+        # This is an internal error.
+        raise RuntimeError(f"unexpected Unary operator: {expr.operator.kind}") from e
+
+    try:
+        value = op(right)
+    except TypeError:
+        msg = _unary_op_error(expr.operator)
+        raise ExecutionError(msg, expr.operator) from None
+
+    expr.quick = (type(right), _unary_op_quick[expr.operator.kind])
+    return value
+
 
 # mypy's @overload is buggy for @singledispatch. Use of the separate _evaluate here
 # is a workaround https://github.com/python/mypy/issues/8356.
@@ -103,9 +188,7 @@ def _evaluate(expr: Any, _: Environment) -> object:
 @overload
 @_evaluate.register(Assign)
 def evaluate(expr: Assign, env: Environment) -> object:
-    value = evaluate(expr.value, env)
-    env[expr.name] = value
-    return value
+    return _assign(expr, env, evaluate(expr.value, env))
 
 
 @overload
@@ -116,43 +199,20 @@ def evaluate(expr: Binary, env: Environment) -> object:
     left = evaluate(expr.left, env)
     right = evaluate(expr.right, env)
 
-    check = _binary_op_check.get(expr.operator.kind, None)
-    if check is not None and not check(left, right):
-        msg = _binary_op_error(expr.operator)
-        raise ExecutionError(msg, expr.operator)
-
-    try:
-        op = _binary_op_fn[expr.operator.kind]
-    except KeyError as e:
-        # This is an internal error.
-        raise RuntimeError(f"unexpected Binary operator: {expr.operator.kind}") from e
-
-    try:
-        return op(left, right)
-    except ZeroDivisionError:
-        if not (isinstance(left, float) and isinstance(right, float)):
-            raise
-
-        if left == 0:
-            return float("nan")
-
-        # Account for right being signed zero.
-        return copysign(float("inf"), left * right)
+    # The checks depend only on the operands' types, so once they have passed for
+    # these types the operator's function can be called directly. Comparing the
+    # types exactly is quicker than isinstance.
+    quick = expr.quick
+    # pylint: disable-next=unidiomatic-typecheck
+    if quick is not None and type(left) is quick[0] and type(right) is quick[1]:
+        return quick[2](left, right)
+    return _binary(expr, left, right)
 
 
 @overload
 @_evaluate.register(Call)
 def evaluate(expr: Call, env: Environment) -> object:
-    callee = evaluate(expr.callee, env)
-    if not isinstance(callee, SupportsCall):
-        raise ExecutionError("Can only call functions and classes.", expr.paren)
-
-    arguments = [evaluate(arg, env) for arg in expr.arguments]
-    if len(arguments) != callee.arity():
-        raise ExecutionError(
-            f"Expected {callee.arity()} arguments but got {len(arguments)}.", expr.paren
-        )
-
+    callee, arguments = _callee_and_arguments(expr, env)
     return callee.call(arguments)
 
 
@@ -188,23 +248,31 @@ def evaluate(expr: Logical, env: Environment) -> object:
 def evaluate(expr: Unary, env: Environment) -> object:
     right = evaluate(expr.right, env)
 
-    try:
-        op = _unary_op_fn[expr.operator.kind]
-    except KeyError as e:
-        # This is an internal error.
-        raise RuntimeError(f"unexpected Unary operator: {expr.operator.kind}") from e
-
-    try:
-        return op(right)
-    except TypeError:
-        msg = _unary_op_error(expr.operator)
-        raise ExecutionError(msg, expr.operator) from None
+    # See evaluate(Binary).
+    quick = expr.quick
+    # pylint: disable-next=unidiomatic-typecheck
+    if quick is not None and type(right) is quick[0]:
+        return quick[1](right)
+    return _unary(expr, right)
 
 
 @overload
 @_evaluate.register(Variable)
 def evaluate(expr: Variable, env: Environment) -> object:
-    return env[expr.name]
+    depth = expr.depth
+    if depth is None:
+        return env[expr.name]
+    if depth == GLOBAL:
+        globals_ = env.globals
+        cache = expr.cache
+        if cache is not None and cache[0] == globals_.version:
+            globals_.hits += 1
+            return cache[1]
+        globals_.misses += 1
+        value = globals_[expr.name]
+        expr.cache = (globals_.version, value)
+        return value
+    return env.get_at(depth, expr.slot)
 
 
 def evaluate(expr: Expr, env: Environment) -> object:
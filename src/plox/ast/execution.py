@@ -1,9 +1,15 @@
+from __future__ import annotations
+
 from functools import singledispatch
-from typing import Any, overload
+from typing import Any, Optional, Union, overload
 
-from plox.environment import Environment
+from plox.callables import LoxCallable
+from plox.environment import GLOBAL, Environment
+from plox.errors import ExecutionError
+from plox.memo import MISSING, Memo, key
+from plox.tokens import Token
 
-from .evaluation import _truthy, evaluate
+from .evaluation import _callee_and_arguments, _truthy, evaluate
 from .statements import Block, Expression, Function, If, Print, Return, Stmt, Var, While
 
 
@@ -23,30 +29,170 @@ def _stringify(value: object) -> str:
     return text
 
 
-class ReturnException(RuntimeError):
-    def __init__(self, value: object):
-        super().__init__()
+class Returned:
+    """How a statement that executed a return statement completed: with its value."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: object) -> None:
         self.value = value
 
 
-class LoxFunction:
+class TailCall:
+    """How a statement that executed a return statement of a tail call completed.
+
+    The function that executed it returns, for function to be called with arguments in
+    its place.
+    """
+
+    __slots__ = ("function", "arguments")
+
+    def __init__(self, function: LoxFunction, arguments: list[object]) -> None:
+        self.function = function
+        self.arguments = arguments
+
+
+# execute returns None if the statement completed normally, and execution continues
+# with the next statement, or else how it returned from the function.
+Completion = Optional[Union[Returned, TailCall]]
+
+
+# A variable read by calling a function, see LoxFunction.memoized: the environment
+# a function that reads it is declared in, its depth from there (or GLOBAL), slot and
+# name, and the value it had.
+_Dependency = tuple[Environment, int, int, Token, object]
+
+
+def _read(env: Environment, depth: int, slot: int, name: Token) -> object:
+    if depth == GLOBAL:
+        return env.globals[name]
+    return env.get_at(depth, slot)
+
+
+class LoxFunction(LoxCallable):
     def __init__(self, declaration: Function, env: Environment) -> None:
+        super().__init__(len(declaration.parameters))
         self._declaration = declaration
         self._closure = env
-
-    def arity(self) -> int:
-        return len(self._declaration.parameters)
+        # See memoized.
+        self._memo = Memo(declaration.memo_size) if declaration.memo_size else None
+        self._dependencies: Optional[list[_Dependency]] = None
+        self._pure = False
 
     def call(self, arguments: list[object]) -> object:
-        env = Environment(self._closure)
-        for parameter, argument in zip(self._declaration.parameters, arguments):
-            env.define(parameter, argument)
-
-        try:
-            execute(self._declaration.body, env)
-        except ReturnException as ret:
-            return ret.value
-
+        # pylint: disable=protected-access
+        memo = None if self._memo is None else self.memoized()
+        if memo is not None:
+            arguments_key = key(arguments)
+            result = memo.get(arguments_key)
+            if result is not MISSING:
+                return result
+
+        # A tail call in the body is made here, see TailCall, for the callee to run in
+        # this function's place, so that tail recursion runs in constant stack space.
+        function = self
+        while True:
+            # The body shares the parameters' environment, as it shares their scope.
+            statements, env = function.enter(arguments)
+            completion = function._run(statements, env)
+            function.leave(env)
+
+            if not isinstance(completion, TailCall):
+                break
+            function, arguments = completion.function, completion.arguments
+
+        result = None if completion is None else completion.value
+        if memo is not None:
+            memo.put(arguments_key, result)
+        return result
+
+    def memoized(self) -> Optional[Memo]:
+        """Return the memo of this function's results, if its calls are memoized.
+
+        They are if it was declared to be, see Function.memo_size, and it is pure:
+        neither it nor any function it calls is impure, see Function.reads, or a
+        native function, e.g. clock. Which functions those are depends on the values
+        of the variables it reads, so when they change its purity is found again, and
+        the memo cleared.
+        """
+        if self._memo is None:
+            return None
+        if not self._current():
+            self._dependencies, self._pure = self._find_dependencies()
+            self._memo.clear()
+        return self._memo if self._pure else None
+
+    def _current(self) -> bool:
+        if self._dependencies is None:
+            return False
+        for env, depth, slot, name, value in self._dependencies:
+            if _read(env, depth, slot, name) is not value:
+                return False
+        return True
+
+    def _find_dependencies(self) -> tuple[Optional[list[_Dependency]], bool]:
+        """Return the variables read by calling this function, and if it is pure.
+
+        The variables are None if its purity cannot be found yet, as a function it
+        calls is not resolved, e.g. its body is not yet parsed, or not yet defined.
+        """
+        # pylint: disable=protected-access
+        dependencies: list[_Dependency] = []
+        functions = [self]
+        seen = {id(self)}
+        while functions:
+            function = functions.pop()
+            declaration, closure = function._declaration, function._closure
+            if declaration.size is None:
+                return None, False
+            if declaration.reads is None:
+                return dependencies, False
+
+            for depth, slot, name in declaration.reads:
+                try:
+                    value = _read(closure, depth, slot, name)
+                except ExecutionError:
+                    return None, False
+                dependencies.append((closure, depth, slot, name, value))
+                if isinstance(value, LoxFunction):
+                    if id(value) not in seen:
+                        seen.add(id(value))
+                        functions.append(value)
+                elif isinstance(value, LoxCallable):
+                    return dependencies, False
+        return dependencies, True
+
+    def enter(self, arguments: list[object]) -> tuple[list[Stmt], Environment]:
+        """Return the statements of the body, and an environment to run them in.
+
+        The environment defines the parameters as arguments.
+        """
+        declaration = self._declaration
+        # Getting the statements of a lazily parsed body parses, and resolves, them.
+        statements = declaration.body.statements
+        if declaration.size is None:
+            env = Environment(self._closure)
+            for parameter, argument in zip(declaration.parameters, arguments):
+                env.define(parameter, argument)
+        elif declaration.free:
+            env = declaration.free.pop().reuse(self._closure)
+            env.slots[: len(arguments)] = arguments
+        else:
+            # The parameters take the first slots, then the body's variables.
+            slots = arguments + [None] * (declaration.size - len(arguments))
+            env = Environment(self._closure, slots)
+        return statements, env
+
+    def leave(self, env: Environment) -> None:
+        """Finish with env, from enter, once the body has returned."""
+        if self._declaration.free is not None:
+            self._declaration.free.append(env)
+
+    def _run(self, statements: list[Stmt], env: Environment) -> Completion:
+        for statement in statements:
+            completion = execute(statement, env)
+            if completion is not None:
+                return completion
         return None
 
     def __str__(self) -> str:
@@ -58,16 +204,29 @@ class LoxFunction:
 
 
 @singledispatch
-def _execute(stmt: Any, _: Environment) -> None:
+def _execute(stmt: Any, _: Environment) -> Completion:
     raise TypeError(f"execute does not support {type(stmt)}")
 
 
 @overload
 @_execute.register(Block)
-def execute(stmt: Block, env: Environment) -> None:
-    env = Environment(enclosing=env)
+def execute(stmt: Block, env: Environment) -> Completion:
+    # A resolved block with no environment of its own has size 0.
+    if stmt.size is None:
+        env = Environment(enclosing=env)
+    elif stmt.free:
+        env = stmt.free.pop().reuse(env)
+    elif stmt.size:
+        env = Environment(env, [None] * stmt.size)
+    completion = None
     for s in stmt.statements:
-        execute(s, env)
+        completion = execute(s, env)
+        if completion is not None:
+            break
+
+    if stmt.free is not None:
+        stmt.free.append(env)
+    return completion
 
 
 @overload
@@ -80,16 +239,20 @@ def execute(stmt: Expression, env: Environment) -> None:
 @_execute.register(Function)
 def execute(stmt: Function, env: Environment) -> None:
     function = LoxFunction(stmt, env)
-    env.define(stmt.name, function)
+    if stmt.slot is None:
+        env.define(stmt.name, function)
+    else:
+        env.slots[stmt.slot] = function
 
 
 @overload
 @_execute.register(If)
-def execute(stmt: If, env: Environment) -> None:
+def execute(stmt: If, env: Environment) -> Completion:
     if _truthy(evaluate(stmt.condition, env)):
-        execute(stmt.then_branch, env)
-    elif stmt.else_branch is not None:
-        execute(stmt.else_branch, env)
+        return execute(stmt.then_branch, env)
+    if stmt.else_branch is not None:
+        return execute(stmt.else_branch, env)
+    return None
 
 
 @overload
@@ -101,24 +264,35 @@ def execute(stmt: Print, env: Environment) -> None:
 
 @overload
 @_execute.register(Return)
-def execute(stmt: Return, env: Environment) -> None:
-    value = evaluate(stmt.expression, env)
-    raise ReturnException(value)
+def execute(stmt: Return, env: Environment) -> Completion:
+    if stmt.call is None:
+        return Returned(evaluate(stmt.expression, env))
+
+    callee, arguments = _callee_and_arguments(stmt.call, env)
+    if isinstance(callee, LoxFunction):
+        return TailCall(callee, arguments)
+    return Returned(callee.call(arguments))
 
 
 @overload
 @_execute.register(Var)
 def execute(stmt: Var, env: Environment) -> None:
     value = evaluate(stmt.initializer, env)
-    env.define(stmt.name, value)
+    if stmt.slot is None:
+        env.define(stmt.name, value)
+    else:
+        env.slots[stmt.slot] = value
 
 
 @overload
 @_execute.register(While)
-def execute(stmt: While, env: Environment) -> None:
+def execute(stmt: While, env: Environment) -> Completion:
     while _truthy(evaluate(stmt.condition, env)):
-        execute(stmt.body, env)
+        completion = execute(stmt.body, env)
+        if completion is not None:
+            return completion
+    return None
 
 
-def execute(stmt: Stmt, env: Environment) -> None:
+def execute(stmt: Stmt, env: Environment) -> Completion:
     return _execute(stmt, env)
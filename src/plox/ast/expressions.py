@@ -1,57 +1,95 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Union
+from typing import Any, Callable, Final, Optional, Union
 
+from plox.callables import LoxCallable
 from plox.tokens import Token
 
+from .node import Node
 
-@dataclass(frozen=True)
-class Assign:
-    name: Token
-    value: Expr
 
+class Assign(Node):
+    __slots__ = ("name", "value", "depth", "slot")
 
-@dataclass(frozen=True)
-class Binary:
-    left: Expr
-    operator: Token
-    right: Expr
+    def __init__(self, name: Token, value: Expr) -> None:
+        self.name: Final = name
+        self.value: Final = value
+        # Set by the resolver, see Variable.
+        self.depth: Optional[int] = None
+        self.slot = 0
 
 
-@dataclass(frozen=True)
-class Call:
-    callee: Expr
-    paren: Token
-    arguments: list[Expr]
+class Binary(Node):
+    __slots__ = ("left", "operator", "right", "quick")
 
+    def __init__(self, left: Expr, operator: Token, right: Expr) -> None:
+        self.left: Final = left
+        self.operator: Final = operator
+        self.right: Final = right
+        # Set by evaluate to the types of the operands it last succeeded for and the
+        # operator's function, which it calls directly while the types are the same.
+        self.quick: Optional[tuple[type, type, Callable[[Any, Any], object]]] = None
 
-@dataclass(frozen=True)
-class Grouping:
-    expression: Expr
 
+class Call(Node):
+    __slots__ = ("callee", "paren", "arguments", "last")
 
-@dataclass(frozen=True)
-class Literal:
-    value: object
+    def __init__(self, callee: Expr, paren: Token, arguments: list[Expr]) -> None:
+        self.callee: Final = callee
+        self.paren: Final = paren
+        self.arguments: Final = arguments
+        # Set by evaluate to the last callee, which could be called with the number
+        # of arguments, so that the next call of it need not check it again.
+        self.last: Optional[LoxCallable] = None
 
 
-@dataclass(frozen=True)
-class Logical:
-    left: Expr
-    operator: Token
-    right: Expr
+class Grouping(Node):
+    __slots__ = ("expression",)
 
+    def __init__(self, expression: Expr) -> None:
+        self.expression: Final = expression
 
-@dataclass(frozen=True)
-class Unary:
-    operator: Token
-    right: Expr
 
+class Literal(Node):
+    __slots__ = ("value",)
 
-@dataclass(frozen=True)
-class Variable:
-    name: Token
+    def __init__(self, value: object) -> None:
+        self.value: Final = value
+
+
+class Logical(Node):
+    __slots__ = ("left", "operator", "right")
+
+    def __init__(self, left: Expr, operator: Token, right: Expr) -> None:
+        self.left: Final = left
+        self.operator: Final = operator
+        self.right: Final = right
+
+
+class Unary(Node):
+    __slots__ = ("operator", "right", "quick")
+
+    def __init__(self, operator: Token, right: Expr) -> None:
+        self.operator: Final = operator
+        self.right: Final = right
+        # Set by evaluate, see Binary.
+        self.quick: Optional[tuple[type, Callable[[Any], object]]] = None
+
+
+class Variable(Node):
+    __slots__ = ("name", "depth", "slot", "cache")
+
+    def __init__(self, name: Token) -> None:
+        self.name: Final = name
+        # Set by the resolver to the number of environments between the reference and
+        # the declaration, or to GLOBAL. None if unresolved, when the variable is
+        # looked up by name along the environment chain.
+        self.depth: Optional[int] = None
+        # Set by the resolver to the variable's index in Environment.slots, if local.
+        self.slot = 0
+        # Set by evaluate, if global, to the version of the globals it last read the
+        # variable in and the value, which is current while the version is.
+        self.cache: Optional[tuple[int, object]] = None
 
 
 Expr = Union[Assign, Binary, Call, Grouping, Literal, Logical, Unary, Variable]
@@ -0,0 +1,49 @@
+from inspect import signature
+from typing import Any, ClassVar
+
+
+class Node:
+    """Base class of AST nodes.
+
+    Parsing a large script constructs millions of nodes, so they are slotted classes
+    with plain __init__ methods, which are smaller and quicker to construct than
+    frozen dataclasses. Otherwise they behave like frozen dataclasses: nodes of the
+    same class are equal if their fields are, and the fields are Final to mypy, but
+    they are not frozen at run time.
+
+    The fields are the parameters of __init__, which also has a slot for each. Other
+    public slots hold annotations added after parsing, e.g. by the resolver, which
+    are not compared, shown or pickled. A subclass of a node class, e.g. one that
+    computes a field lazily, may only add private slots (named with a leading
+    underscore), and its nodes behave as those of the class it extends.
+    """
+
+    __slots__: ClassVar[tuple[str, ...]] = ()
+
+    _FIELDS: ClassVar[tuple[str, ...]] = ()
+    _CLASS: ClassVar[type["Node"]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if any(not name.startswith("_") for name in cls.__dict__.get("__slots__", ())):
+            cls._FIELDS = tuple(signature(cls.__init__).parameters)[1:]
+            cls._CLASS = cls
+
+    def _fields(self) -> tuple[object, ...]:
+        return tuple(getattr(self, name) for name in self._FIELDS)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Node) or other._CLASS is not self._CLASS:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __hash__(self) -> int:
+        return hash(self._fields())
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._FIELDS)
+        return f"{self._CLASS.__name__}({fields})"
+
+    def __reduce__(self) -> tuple[type["Node"], tuple[object, ...]]:
+        # Pickle as a call to the constructor, as there is no __dict__ to pickle.
+        return self._CLASS, self._fields()
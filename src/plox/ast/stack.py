@@ -0,0 +1,305 @@
+"""Execute statements on an explicit stack, so that Lox recursion is limited by memory.
+
+execute and evaluate recurse in Python for each nested node, several times for each
+Lox call, so a Lox function that recurses a few hundred calls deep raises a Python
+RecursionError. As in plox.stack_parser, each node is instead executed or evaluated
+here by a generator (a "step") that yields the step for a child where execute or
+evaluate would recurse, and is sent back its result. Running the body of a called Lox
+function is a step too. execute keeps the suspended steps on an explicit stack, and
+raises a "Stack overflow." ExecutionError for a call deeper than its maximum depth.
+
+The steps behave exactly as execute and evaluate do.
+"""
+
+from collections.abc import Generator
+from functools import singledispatch
+from typing import Any, TypeVar
+
+from plox.callables import LoxCallable
+from plox.environment import Environment
+from plox.errors import ExecutionError
+from plox.memo import MISSING, key
+from plox.tokens import TokenType
+
+from .evaluation import _assign, _binary, _truthy, _unary, evaluate
+from .execution import Completion, LoxFunction, Returned, TailCall, _stringify
+from .expressions import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Grouping,
+    Literal,
+    Logical,
+    Unary,
+    Variable,
+)
+from .statements import Block, Expression, Function, If, Print, Return, Stmt, Var, While
+
+T = TypeVar("T")
+
+# A step yields the steps it depends on, and is sent each of their results.
+_Step = Generator[Generator[Any, Any, Any], Any, T]
+
+# The default maximum number of Lox calls in progress at once.
+MAX_DEPTH = 100_000
+
+
+class _Calls:
+    __slots__ = ("depth", "max_depth")
+
+    def __init__(self, max_depth: int) -> None:
+        # The number of Lox calls in progress.
+        self.depth = 0
+        self.max_depth = max_depth
+
+
+def execute(stmt: Stmt, env: Environment, max_depth: int = MAX_DEPTH) -> None:
+    """Execute stmt in env, with at most max_depth Lox calls in progress at once."""
+    stack: list[_Step[Any]] = [_execute_step(stmt, env, _Calls(max_depth))]
+    value: Any = None
+
+    while True:
+        try:
+            dependency = stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            if not stack:
+                return
+            value = stop.value
+        else:
+            stack.append(dependency)
+            value = None
+
+
+@singledispatch
+def _evaluate_step(expr: Any, _: Environment, __: _Calls) -> _Step[object]:
+    raise TypeError(f"evaluate does not support {type(expr)}")
+
+
+@singledispatch
+def _execute_step(stmt: Any, _: Environment, __: _Calls) -> _Step[Completion]:
+    raise TypeError(f"execute does not support {type(stmt)}")
+
+
+def _evaluate(expr: Expr, env: Environment, calls: _Calls) -> _Step[object]:
+    return _evaluate_step(expr, env, calls)
+
+
+def _execute(stmt: Stmt, env: Environment, calls: _Calls) -> _Step[Completion]:
+    return _execute_step(stmt, env, calls)
+
+
+def _callee_and_arguments(
+    expr: Call, env: Environment, calls: _Calls
+) -> _Step[tuple[LoxCallable, list[object]]]:
+    callee = yield _evaluate(expr.callee, env, calls)
+    # See evaluate.
+    last = expr.last
+    if last is None or callee is not last:
+        if not isinstance(callee, LoxCallable):
+            raise ExecutionError("Can only call functions and classes.", expr.paren)
+        last = None
+
+    arguments = []
+    for argument in expr.arguments:
+        arguments.append((yield _evaluate(argument, env, calls)))
+    if last is not None:
+        return last, arguments
+
+    if len(arguments) != callee.arity:
+        raise ExecutionError(
+            f"Expected {callee.arity} arguments but got {len(arguments)}.", expr.paren
+        )
+
+    expr.last = callee
+    return callee, arguments
+
+
+def _body(
+    function: LoxFunction, arguments: list[object], calls: _Calls
+) -> _Step[object]:
+    """Run the body of function called with arguments, as LoxFunction.call does."""
+    while True:
+        statements, env = function.enter(arguments)
+        completion = None
+        for statement in statements:
+            completion = yield _execute(statement, env, calls)
+            if completion is not None:
+                break
+        function.leave(env)
+
+        if completion is None:
+            return None
+        if isinstance(completion, Returned):
+            return completion.value
+        function, arguments = completion.function, completion.arguments
+
+
+@_evaluate_step.register(Assign)
+def _assign_step(expr: Assign, env: Environment, calls: _Calls) -> _Step[object]:
+    value = yield _evaluate(expr.value, env, calls)
+    return _assign(expr, env, value)
+
+
+@_evaluate_step.register(Binary)
+def _binary_step(expr: Binary, env: Environment, calls: _Calls) -> _Step[object]:
+    left = yield _evaluate(expr.left, env, calls)
+    right = yield _evaluate(expr.right, env, calls)
+
+    # See evaluate.
+    quick = expr.quick
+    # pylint: disable-next=unidiomatic-typecheck
+    if quick is not None and type(left) is quick[0] and type(right) is quick[1]:
+        return quick[2](left, right)
+    return _binary(expr, left, right)
+
+
+@_evaluate_step.register(Call)
+def _call_step(expr: Call, env: Environment, calls: _Calls) -> _Step[object]:
+    callee, arguments = yield _callee_and_arguments(expr, env, calls)
+    if not isinstance(callee, LoxFunction):
+        return callee.call(arguments)
+
+    # See LoxFunction.call.
+    memo = callee.memoized()
+    if memo is not None:
+        arguments_key = key(arguments)
+        value = memo.get(arguments_key)
+        if value is not MISSING:
+            return value
+
+    if calls.depth == calls.max_depth:
+        raise ExecutionError("Stack overflow.", expr.paren)
+    calls.depth += 1
+    value = yield _body(callee, arguments, calls)
+    calls.depth -= 1
+
+    if memo is not None:
+        memo.put(arguments_key, value)
+    return value
+
+
+@_evaluate_step.register(Grouping)
+def _grouping_step(expr: Grouping, env: Environment, calls: _Calls) -> _Step[object]:
+    return (yield _evaluate(expr.expression, env, calls))
+
+
+@_evaluate_step.register(Literal)
+def _literal_step(expr: Literal, _: Environment, __: _Calls) -> _Step[object]:
+    yield from ()
+    return expr.value
+
+
+@_evaluate_step.register(Logical)
+def _logical_step(expr: Logical, env: Environment, calls: _Calls) -> _Step[object]:
+    left = yield _evaluate(expr.left, env, calls)
+
+    if expr.operator.kind == TokenType.OR:
+        if _truthy(left):
+            return left
+    else:
+        if not _truthy(left):
+            return left
+
+    return (yield _evaluate(expr.right, env, calls))
+
+
+@_evaluate_step.register(Unary)
+def _unary_step(expr: Unary, env: Environment, calls: _Calls) -> _Step[object]:
+    right = yield _evaluate(expr.right, env, calls)
+
+    # See evaluate.
+    quick = expr.quick
+    # pylint: disable-next=unidiomatic-typecheck
+    if quick is not None and type(right) is quick[0]:
+        return quick[1](right)
+    return _unary(expr, right)
+
+
+@_evaluate_step.register(Variable)
+def _variable_step(expr: Variable, env: Environment, _: _Calls) -> _Step[object]:
+    yield from ()
+    # Evaluating a variable does not recurse.
+    return evaluate(expr, env)
+
+
+@_execute_step.register(Block)
+def _block_step(stmt: Block, env: Environment, calls: _Calls) -> _Step[Completion]:
+    # See execute.
+    if stmt.size is None:
+        env = Environment(enclosing=env)
+    elif stmt.free:
+        env = stmt.free.pop().reuse(env)
+    elif stmt.size:
+        env = Environment(env, [None] * stmt.size)
+    completion = None
+    for s in stmt.statements:
+        completion = yield _execute(s, env, calls)
+        if completion is not None:
+            break
+
+    if stmt.free is not None:
+        stmt.free.append(env)
+    return completion
+
+
+@_execute_step.register(Expression)
+def _expression_step(stmt: Expression, env: Environment, calls: _Calls) -> _Step[None]:
+    yield _evaluate(stmt.expression, env, calls)
+
+
+@_execute_step.register(Function)
+def _function_step(stmt: Function, env: Environment, _: _Calls) -> _Step[None]:
+    yield from ()
+    function = LoxFunction(stmt, env)
+    if stmt.slot is None:
+        env.define(stmt.name, function)
+    else:
+        env.slots[stmt.slot] = function
+
+
+@_execute_step.register(If)
+def _if_step(stmt: If, env: Environment, calls: _Calls) -> _Step[Completion]:
+    completion: Completion = None
+    if _truthy((yield _evaluate(stmt.condition, env, calls))):
+        completion = yield _execute(stmt.then_branch, env, calls)
+    elif stmt.else_branch is not None:
+        completion = yield _execute(stmt.else_branch, env, calls)
+    return completion
+
+
+@_execute_step.register(Print)
+def _print_step(stmt: Print, env: Environment, calls: _Calls) -> _Step[None]:
+    value = yield _evaluate(stmt.expression, env, calls)
+    print(_stringify(value))
+
+
+@_execute_step.register(Return)
+def _return_step(stmt: Return, env: Environment, calls: _Calls) -> _Step[Completion]:
+    # See execute.
+    if stmt.call is None:
+        return Returned((yield _evaluate(stmt.expression, env, calls)))
+
+    callee, arguments = yield _callee_and_arguments(stmt.call, env, calls)
+    if isinstance(callee, LoxFunction):
+        return TailCall(callee, arguments)
+    return Returned(callee.call(arguments))
+
+
+@_execute_step.register(Var)
+def _var_step(stmt: Var, env: Environment, calls: _Calls) -> _Step[None]:
+    value = yield _evaluate(stmt.initializer, env, calls)
+    if stmt.slot is None:
+        env.define(stmt.name, value)
+    else:
+        env.slots[stmt.slot] = value
+
+
+@_execute_step.register(While)
+def _while_step(stmt: While, env: Environment, calls: _Calls) -> _Step[Completion]:
+    while _truthy((yield _evaluate(stmt.condition, env, calls))):
+        completion: Completion = yield _execute(stmt.body, env, calls)
+        if completion is not None:
+            return completion
+    return None
@@ -1,58 +1,114 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, Union
+from typing import Final, Optional, Union
 
+from plox.environment import Environment
 from plox.tokens import Token
 
-from .expressions import Expr
-
-
-@dataclass(frozen=True)
-class Block:
-    statements: list[Stmt]
-
-
-@dataclass(frozen=True)
-class Expression:
-    expression: Expr
-
-
-@dataclass(frozen=True)
-class Function:
-    name: Token
-    parameters: list[Token]
-    body: Block
-
-
-@dataclass(frozen=True)
-class If:
-    condition: Expr
-    then_branch: Stmt
-    else_branch: Optional[Stmt]
-
-
-@dataclass(frozen=True)
-class Print:
-    expression: Expr
-
-
-@dataclass(frozen=True)
-class Return:
-    keyword: Token
-    expression: Expr
-
-
-@dataclass(frozen=True)
-class Var:
-    name: Token
-    initializer: Expr
-
-
-@dataclass(frozen=True)
-class While:
-    condition: Expr
-    body: Stmt
+from .expressions import Call, Expr
+from .node import Node
+
+
+class Block(Node):
+    __slots__ = ("statements", "size", "free")
+
+    def __init__(self, statements: list[Stmt]) -> None:
+        self.statements: Final = statements
+        # Set by the resolver to the number of slots in the block's environment, or 0
+        # if it runs in the enclosing environment. None if unresolved, when its
+        # environment stores variables by name.
+        self.size: Optional[int] = None
+        # Set by the resolver, if no function can capture the block's environment, to
+        # a list of environments that are no longer in use, to reuse.
+        self.free: Optional[list[Environment]] = None
+
+
+class Expression(Node):
+    __slots__ = ("expression",)
+
+    def __init__(self, expression: Expr) -> None:
+        self.expression: Final = expression
+
+
+class Function(Node):
+    # pylint: disable=too-many-instance-attributes
+    __slots__ = (
+        "name",
+        "parameters",
+        "body",
+        "slot",
+        "size",
+        "free",
+        "reads",
+        "memo_size",
+    )
+
+    def __init__(self, name: Token, parameters: list[Token], body: Block) -> None:
+        self.name: Final = name
+        self.parameters: Final = parameters
+        self.body: Final = body
+        # Set by the resolver, see Var, and for the environments of calls, see Block.
+        # The body's own size and free list are not used.
+        self.slot: Optional[int] = None
+        self.size: Optional[int] = None
+        self.free: Optional[list[Environment]] = None
+        # Set by the resolver to the variables declared outside the function that the
+        # body reads, as (depth from the environment the function is declared in, or
+        # GLOBAL, slot, name), or to None if the function is impure: the body prints,
+        # declares a function, assigns a variable declared outside it, or calls
+        # anything but one. See LoxFunction.memoized.
+        self.reads: Optional[list[tuple[int, int, Token]]] = None
+        # Set by the resolver to the most results of calls of each function declared
+        # here to memoize, if it is pure, or 0 to memoize none.
+        self.memo_size = 0
+
+
+class If(Node):
+    __slots__ = ("condition", "then_branch", "else_branch")
+
+    def __init__(
+        self, condition: Expr, then_branch: Stmt, else_branch: Optional[Stmt]
+    ) -> None:
+        self.condition: Final = condition
+        self.then_branch: Final = then_branch
+        self.else_branch: Final = else_branch
+
+
+class Print(Node):
+    __slots__ = ("expression",)
+
+    def __init__(self, expression: Expr) -> None:
+        self.expression: Final = expression
+
+
+class Return(Node):
+    __slots__ = ("keyword", "expression", "call")
+
+    def __init__(self, keyword: Token, expression: Expr) -> None:
+        self.keyword: Final = keyword
+        self.expression: Final = expression
+        # Set by the resolver to the expression, if it is a call, which is then a tail
+        # call: nothing is left for the function to do after it but return its value.
+        self.call: Optional[Call] = None
+
+
+class Var(Node):
+    __slots__ = ("name", "initializer", "slot")
+
+    def __init__(self, name: Token, initializer: Expr) -> None:
+        self.name: Final = name
+        self.initializer: Final = initializer
+        # Set by the resolver to the variable's index in Environment.slots, if local.
+        # None if global or unresolved, when the variable is defined by name.
+        self.slot: Optional[int] = None
+
+
+class While(Node):
+    __slots__ = ("condition", "body")
+
+    def __init__(self, condition: Expr, body: Stmt) -> None:
+        self.condition: Final = condition
+        self.body: Final = body
 
 
 Stmt = Union[Block, Expression, Function, If, Print, Return, Var, While]
@@ -1,9 +1,13 @@
 from time import time
 
+from plox.callables import LoxCallable
 
-class Clock:
-    def arity(self) -> int:
-        return 0
+
+class Clock(LoxCallable):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        super().__init__(0)
 
     def call(self, _args: list[object]) -> float:
         return time()
@@ -0,0 +1,138 @@
+"""Bytecode for plox.vm, compiled from the AST by plox.compiler.
+
+Code is a flat array of words: each instruction is an OpCode followed by its operands,
+one word each. Jumps take the absolute index of their target.
+"""
+
+from __future__ import annotations
+
+from array import array
+from enum import IntEnum, unique
+
+
+@unique
+class OpCode(IntEnum):
+    # Operand: the index of the constant.
+    CONSTANT = 0
+    NIL = 1
+    TRUE = 2
+    FALSE = 3
+    POP = 4
+    # Operand: the slot of the local, from the base of the call's stack.
+    GET_LOCAL = 5
+    SET_LOCAL = 6
+    # Operand: the index of the constant that is the global's name.
+    GET_GLOBAL = 7
+    DEFINE_GLOBAL = 8
+    SET_GLOBAL = 9
+    # Operand: the index of the upvalue in the closure.
+    GET_UPVALUE = 10
+    SET_UPVALUE = 11
+    EQUAL = 12
+    NOT_EQUAL = 13
+    GREATER = 14
+    GREATER_EQUAL = 15
+    LESS = 16
+    LESS_EQUAL = 17
+    ADD = 18
+    SUBTRACT = 19
+    MULTIPLY = 20
+    DIVIDE = 21
+    NOT = 22
+    NEGATE = 23
+    PRINT = 24
+    # Operand: the index of the instruction to jump to. The conditional jumps leave
+    # the condition on the stack, except POP_JUMP_IF_FALSE.
+    JUMP = 25
+    JUMP_IF_FALSE = 26
+    JUMP_IF_TRUE = 27
+    POP_JUMP_IF_FALSE = 28
+    # Check that the callee, on the top of the stack, can be called, before its
+    # arguments are evaluated, as the tree walker does.
+    CALLABLE = 29
+    # Operand: the number of arguments, above the callee on the stack.
+    CALL = 30
+    # Operands: the index of the constant that is the function's Code, then two for
+    # each upvalue, whether it captures a local of the enclosing call (1) or one of
+    # its upvalues (0), and the local's slot or the upvalue's index.
+    CLOSURE = 31
+    CLOSE_UPVALUE = 32
+    RETURN = 33
+
+
+# The number of operands each instruction takes, other than CLOSURE's upvalues.
+OPERANDS = {
+    OpCode.CONSTANT: 1,
+    OpCode.GET_LOCAL: 1,
+    OpCode.SET_LOCAL: 1,
+    OpCode.GET_GLOBAL: 1,
+    OpCode.DEFINE_GLOBAL: 1,
+    OpCode.SET_GLOBAL: 1,
+    OpCode.GET_UPVALUE: 1,
+    OpCode.SET_UPVALUE: 1,
+    OpCode.JUMP: 1,
+    OpCode.JUMP_IF_FALSE: 1,
+    OpCode.JUMP_IF_TRUE: 1,
+    OpCode.POP_JUMP_IF_FALSE: 1,
+    OpCode.CALL: 1,
+    OpCode.CLOSURE: 1,
+}
+
+
+class Code:
+    """The compiled body of a function, or of a script."""
+
+    __slots__ = ("name", "arity", "upvalues", "code", "constants", "lines", "_indexes")
+
+    def __init__(self, name: str, arity: int = 0) -> None:
+        # The function's name, or "script".
+        self.name = name
+        self.arity = arity
+        # The number of upvalues a closure of the function captures.
+        self.upvalues = 0
+        self.code = array("I")
+        self.constants: list[object] = []
+        self._indexes: dict[tuple[type, str], int] = {}
+        # The line of the source each word of code was compiled from.
+        self.lines = array("I")
+
+    def emit(self, line: int, *words: int) -> int:
+        """Append words, compiled from line, returning the index of the first."""
+        index = len(self.code)
+        self.code.extend(words)
+        self.lines.extend([line] * len(words))
+        return index
+
+    def constant(self, value: object) -> int:
+        """Return the index of value in the constants, adding it if new."""
+        if isinstance(value, Code):
+            self.constants.append(value)
+            return len(self.constants) - 1
+        # By repr too, so that 0.0 and -0.0 are kept apart.
+        key = (type(value), repr(value))
+        if key not in self._indexes:
+            self._indexes[key] = len(self.constants)
+            self.constants.append(value)
+        return self._indexes[key]
+
+    def __str__(self) -> str:
+        return f"<fn {self.name}>"
+
+
+def disassemble(code: Code) -> list[str]:
+    """Return a line for each instruction of code, e.g. "3 GET_LOCAL 1"."""
+    lines = []
+    i = 0
+    words = code.code
+    while i < len(words):
+        op = OpCode(words[i])
+        n = OPERANDS.get(op, 0)
+        operands = list(words[i + 1 : i + 1 + n])
+        if op == OpCode.CLOSURE:
+            function = code.constants[operands[0]]
+            assert isinstance(function, Code)
+            n += 2 * function.upvalues
+            operands = list(words[i + 1 : i + 1 + n])
+        lines.append(" ".join(str(x) for x in [code.lines[i], op.name, *operands]))
+        i += 1 + n
+    return lines
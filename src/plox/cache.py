@@ -0,0 +1,121 @@
+"""Cache parsed scripts on disk, as Python caches bytecode in __pycache__.
+
+The statements parsed from dir/script.lox are pickled to
+dir/__loxcache__/script.loxc, after a header of a magic number, the version of the
+cache format, the plox version, whether function bodies were parsed lazily, and the
+SHA-256 of the script's source. A cache file is only used if its header matches the
+versions running and the source being run, so editing a script, upgrading plox or
+changing the classes of the statements invalidates it.
+
+Cache files are written to a temporary file and then renamed over any existing
+file, so concurrent writers cannot corrupt them and readers never see a partial
+file. Failing to read or write a cache is never an error: the script is parsed.
+"""
+
+import gc
+import hashlib
+import os
+import pickle
+from contextlib import suppress
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Optional
+
+from plox.ast import Stmt
+from plox.tokens import Source
+
+CACHE_DIR = "__loxcache__"
+SUFFIX = ".loxc"
+
+# Bump whenever the pickled statements change shape, e.g. a node class gains, loses or
+# renames an attribute, so that files cached by other versions of plox, even with
+# the same version number, are not loaded.
+FORMAT_VERSION = 1
+
+_MAGIC = b"LOXC"
+
+try:
+    _VERSION = version("plox").encode()
+except PackageNotFoundError:  # pragma: no cover
+    _VERSION = b"unknown"
+
+
+def cache_path(path: Path) -> Path:
+    return path.parent / CACHE_DIR / (path.stem + SUFFIX)
+
+
+def _header(source: Source, lazy: bool) -> bytes:
+    if isinstance(source, str):
+        source = source.encode()
+    digest = hashlib.sha256(source).digest()
+    return (
+        _MAGIC
+        + bytes([FORMAT_VERSION, len(_VERSION)])
+        + _VERSION
+        + bytes([lazy])
+        + digest
+    )
+
+
+def load(path: Path, source: Source, lazy: bool = False) -> Optional[list[Stmt]]:
+    """Return the statements cached for the script at path, if source is current.
+
+    Statements are cached separately for lazy parsing, which defers syntax errors.
+    """
+    try:
+        data = cache_path(path).read_bytes()
+    except OSError:
+        return None
+
+    header = _header(source, lazy)
+    if not data.startswith(header):
+        return None
+
+    # Unpickling allocates an object per node and token, and so would trigger many
+    # full garbage collections, which dominate the time taken. Statements contain
+    # no reference cycles, so there is nothing for them to collect.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        statements: list[Stmt] = pickle.loads(data[len(header) :])
+    except Exception:  # pylint: disable=broad-exception-caught
+        # e.g. an AST class has changed without FORMAT_VERSION being bumped.
+        return None
+    finally:
+        if enabled:
+            gc.enable()
+    return statements
+
+
+def dump(
+    path: Path, source: Source, statements: list[Stmt], lazy: bool = False
+) -> None:
+    """Cache the statements parsed from source, the script at path."""
+    try:
+        data = pickle.dumps(statements, pickle.HIGHEST_PROTOCOL)
+    except RecursionError:
+        # The statements are nested too deeply to pickle, so parse them each time.
+        return
+
+    target = cache_path(path)
+    try:
+        target.parent.mkdir(exist_ok=True)
+        f = NamedTemporaryFile(  # pylint: disable=consider-using-with
+            "wb", dir=target.parent, prefix=target.name, suffix=".tmp", delete=False
+        )
+    except OSError:
+        # e.g. the script's directory is read-only.
+        return
+
+    try:
+        with f:
+            f.write(_header(source, lazy))
+            f.write(data)
+        # Temporary files are private to their owner. As in __pycache__, anyone who
+        # can read the script may read its cache.
+        os.chmod(f.name, path.stat().st_mode & 0o666)
+        os.replace(f.name, target)
+    except OSError:
+        with suppress(OSError):
+            os.unlink(f.name)
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+
+
+class LoxCallable(ABC):
+    """Base class of the values Lox can call: its functions, and natives like clock.
+
+    Whether a value can be called is checked on every call, and isinstance of a class
+    is much quicker than of a runtime checkable protocol, which checks the value's
+    attributes.
+    """
+
+    __slots__ = ("arity",)
+
+    def __init__(self, arity: int) -> None:
+        # The number of arguments it must be called with.
+        self.arity = arity
+
+    @abstractmethod
+    def call(self, arguments: list[object]) -> object:
+        """Return the result of calling it with arguments, arity of them."""
@@ -1,20 +1,158 @@
 import argparse
+import sys
+from functools import partial
 from pathlib import Path
+from typing import Callable
 
+from plox import cache
+from plox.ast import stack
+from plox.interpreter import (
+    ClosureInterpreter,
+    Interpreter,
+    StackInterpreter,
+    TranspilingInterpreter,
+    VMInterpreter,
+)
 from plox.lox import Lox
+from plox.parser import Parser
+from plox.protocols import SupportsScanTokens
+from plox.scanner import RegexScanner, Scanner
+from plox.stack_parser import StackParser
+from plox.tokens import Source
+
+_SCANNERS: dict[str, Callable[[Source], SupportsScanTokens]] = {
+    "regex": RegexScanner,
+    "reference": Scanner,
+}
+
+_PARSERS: dict[str, type[Parser]] = {
+    "recursive": Parser,
+    "stack": StackParser,
+}
+
+_ENGINES: dict[str, Callable[[], Interpreter]] = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "stack": StackInterpreter,
+    "python": TranspilingInterpreter,
+    "vm": VMInterpreter,
+}
+
+
+def _engine(name: str, max_depth: int) -> Callable[[], Interpreter]:
+    if name == "stack":
+        return partial(StackInterpreter, max_depth)
+    if name == "vm":
+        return partial(VMInterpreter, max_depth)
+    return _ENGINES[name]
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(
         "plox", formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
-    parser.add_argument("script", metavar="FILE", nargs="?", help="Lox script to run")
+    parser.add_argument(
+        "script", metavar="FILE", nargs="?", help="Lox script to run, or - for stdin"
+    )
+    parser.add_argument(
+        "--compile",
+        metavar="FILE",
+        nargs="+",
+        help=f"parse these Lox scripts, without running them, and cache them in"
+        f" {cache.CACHE_DIR}",
+    )
+    parser.add_argument(
+        "--scanner",
+        choices=_SCANNERS,
+        default="regex",
+        help="scanner implementation",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=_PARSERS,
+        default="recursive",
+        help="parser implementation: 'stack' handles arbitrarily deep nesting",
+    )
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="only parse function bodies when the functions are first called, so"
+        " that syntax errors in them are only then reported",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="scan and parse the script across this many processes, with the regex"
+        " scanner (ignored with --stream)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="run each top-level declaration as soon as it is parsed, instead of"
+        " first parsing the whole script and reporting all of its syntax errors",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=_ENGINES,
+        default="tree",
+        help="how to run the parsed script: walk the tree, first compile it into"
+        " closures, walk the tree on an explicit stack, transpile it into Python or"
+        " compile it into bytecode for a VM (the last two parsing lazy function"
+        " bodies when they are declared)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=stack.MAX_DEPTH,
+        help="the most Lox calls in progress at once, with --engine stack or vm,"
+        " beyond which a stack overflow is reported",
+    )
+    parser.add_argument(
+        "--memoize",
+        type=int,
+        default=0,
+        metavar="N",
+        help="cache up to N results of each pure function's calls, with --engine"
+        " tree, closure or stack: of functions that only call pure functions, and"
+        " neither print, declare functions nor assign variables declared outside them",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="caching",
+        action="store_false",
+        help=f"neither load scripts from nor save them to {cache.CACHE_DIR}",
+    )
 
     args = parser.parse_args()
 
-    lox = Lox()
-    if args.script is None:
-        lox.run_prompt()
+    if args.compile is not None:
+        if args.script is not None:
+            parser.error("argument --compile: cannot also run a script")
+        compiler = Lox(
+            scanner=_SCANNERS[args.scanner],
+            workers=args.jobs,
+            parser=_PARSERS[args.parser],
+            lazy=args.lazy,
+        )
+        for script in args.compile:
+            compiler.compile_file(Path(script))
         return
 
-    lox.run_file(Path(args.script))
+    lox = Lox(
+        scanner=_SCANNERS[args.scanner],
+        streaming=args.stream,
+        workers=args.jobs,
+        parser=_PARSERS[args.parser],
+        caching=args.caching,
+        lazy=args.lazy,
+        engine=_engine(args.engine, args.max_depth),
+        memoize=args.memoize,
+    )
+    if args.script is None:
+        lox.run_prompt()
+    elif args.script == "-":
+        lox.run_lines(sys.stdin)
+    else:
+        lox.run_file(Path(args.script))
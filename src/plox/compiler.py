@@ -0,0 +1,352 @@
+"""Compile the AST into bytecode for plox.vm, as clox does.
+
+Local variables, the arguments and the temporaries of expressions live on the VM's
+stack. The compiler resolves each variable itself: to the slot of a local of the
+enclosing function, to an upvalue of the function's closure, for a local of a function
+it is nested in, or else to a global, by name. A block's locals are popped at its end,
+and the upvalues that captured them closed, so that closures declared in the block,
+e.g. in each iteration of a loop, capture their own variables.
+
+The statements must have been resolved without error, as the compiler reports no
+errors of its own. Lazily parsed function bodies are parsed, and their syntax errors
+reported, when the function declaration is compiled.
+"""
+
+from collections.abc import Iterable
+from functools import singledispatch
+from typing import Any, Optional
+
+from plox.ast import (
+    Assign,
+    Binary,
+    Block,
+    Call,
+    Expr,
+    Expression,
+    Function,
+    Grouping,
+    If,
+    Literal,
+    Logical,
+    Print,
+    Return,
+    Stmt,
+    Unary,
+    Var,
+    Variable,
+    While,
+)
+from plox.bytecode import Code, OpCode
+from plox.tokens import Token, TokenType
+
+_BINARY_OPS = {
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.STAR: OpCode.MULTIPLY,
+}
+
+
+class _Local:
+    __slots__ = ("name", "depth", "captured")
+
+    def __init__(self, name: str, depth: int) -> None:
+        self.name = name
+        # The depth of the block scope the local is declared in.
+        self.depth = depth
+        # Whether a closure captures the local, which must then be closed, not popped.
+        self.captured = False
+
+
+class _Compiler:
+    """Compiles the body of one function, or of the script."""
+
+    def __init__(self, code: Code, enclosing: Optional["_Compiler"] = None) -> None:
+        self.code = code
+        self.enclosing = enclosing
+        # The locals in scope, by slot. Slot 0 holds the function being called.
+        self.locals = [_Local("", 0)]
+        # The upvalues of the function's closures: whether each captures a local of
+        # the enclosing function, and the local's slot or the enclosing upvalue's index.
+        self.upvalues: list[tuple[bool, int]] = []
+        # The number of blocks the statement being compiled is in.
+        self.depth = 0
+        # The line of the token compiled last, e.g. an operator, that the instructions
+        # compiled from it are on.
+        self.line = 0
+
+    def emit(self, *words: int) -> int:
+        return self.code.emit(self.line, *words)
+
+    def jump(self, op: OpCode) -> int:
+        """Emit a jump, returning the index of its target, to be set by land."""
+        return self.emit(op, 0) + 1
+
+    def land(self, jump: int) -> None:
+        """Set the target of the jump to the next instruction emitted."""
+        self.code.code[jump] = len(self.code.code)
+
+    def begin_scope(self) -> None:
+        self.depth += 1
+
+    def end_scope(self) -> None:
+        self.depth -= 1
+        while self.locals[-1].depth > self.depth:
+            local = self.locals.pop()
+            self.emit(OpCode.CLOSE_UPVALUE if local.captured else OpCode.POP)
+
+    def declare(self, name: Token) -> None:
+        """Declare the local name, whose value is on the top of the stack."""
+        self.locals.append(_Local(name.lexeme, self.depth))
+
+    def resolve_local(self, lexeme: str) -> int:
+        for slot in range(len(self.locals) - 1, 0, -1):
+            if self.locals[slot].name == lexeme:
+                return slot
+        return -1
+
+    def resolve_upvalue(self, lexeme: str) -> int:
+        if self.enclosing is None:
+            return -1
+
+        slot = self.enclosing.resolve_local(lexeme)
+        if slot != -1:
+            self.enclosing.locals[slot].captured = True
+            return self.add_upvalue(True, slot)
+
+        index = self.enclosing.resolve_upvalue(lexeme)
+        if index != -1:
+            return self.add_upvalue(False, index)
+        return -1
+
+    def add_upvalue(self, local: bool, index: int) -> int:
+        upvalue = (local, index)
+        if upvalue not in self.upvalues:
+            self.upvalues.append(upvalue)
+            self.code.upvalues += 1
+        return self.upvalues.index(upvalue)
+
+    def variable(self, name: Token, get: bool) -> None:
+        """Emit an instruction to get, or else set, the variable name."""
+        self.line = name.lno
+        slot = self.resolve_local(name.lexeme)
+        if slot != -1:
+            self.emit(OpCode.GET_LOCAL if get else OpCode.SET_LOCAL, slot)
+            return
+        index = self.resolve_upvalue(name.lexeme)
+        if index != -1:
+            self.emit(OpCode.GET_UPVALUE if get else OpCode.SET_UPVALUE, index)
+            return
+        constant = self.code.constant(name.lexeme)
+        self.emit(OpCode.GET_GLOBAL if get else OpCode.SET_GLOBAL, constant)
+
+    def is_safe(self, expr: Expr) -> bool:
+        """Return whether evaluating expr can have no effect, not even an error."""
+        while isinstance(expr, Grouping):
+            expr = expr.expression
+        if isinstance(expr, Literal):
+            return True
+        if isinstance(expr, Variable):
+            lexeme = expr.name.lexeme
+            return (
+                self.resolve_local(lexeme) != -1 or self.resolve_upvalue(lexeme) != -1
+            )
+        return False
+
+
+def compile_script(statements: Iterable[Stmt]) -> Code:
+    """Compile resolved statements into the Code of a script, to run with plox.vm."""
+    compiler = _Compiler(Code("script"))
+    for statement in statements:
+        compile_stmt(statement, compiler)
+    compiler.emit(OpCode.NIL)
+    compiler.emit(OpCode.RETURN)
+    return compiler.code
+
+
+@singledispatch
+def _compile_expr(expr: Any, _: _Compiler) -> None:
+    raise TypeError(f"compile_expr does not support {type(expr)}")
+
+
+def compile_expr(expr: Expr, compiler: _Compiler) -> None:
+    _compile_expr(expr, compiler)
+
+
+@singledispatch
+def _compile_stmt(stmt: Any, _: _Compiler) -> None:
+    raise TypeError(f"compile_stmt does not support {type(stmt)}")
+
+
+def compile_stmt(stmt: Stmt, compiler: _Compiler) -> None:
+    _compile_stmt(stmt, compiler)
+
+
+@_compile_expr.register(Assign)
+def _compile_assign(expr: Assign, compiler: _Compiler) -> None:
+    compile_expr(expr.value, compiler)
+    compiler.variable(expr.name, get=False)
+
+
+@_compile_expr.register(Binary)
+def _compile_binary(expr: Binary, compiler: _Compiler) -> None:
+    compile_expr(expr.left, compiler)
+    compile_expr(expr.right, compiler)
+    compiler.line = expr.operator.lno
+    compiler.emit(_BINARY_OPS[expr.operator.kind])
+
+
+@_compile_expr.register(Call)
+def _compile_call(expr: Call, compiler: _Compiler) -> None:
+    compile_expr(expr.callee, compiler)
+    # The callee is checked before the arguments are evaluated, unless that could
+    # make no difference.
+    if not all(compiler.is_safe(argument) for argument in expr.arguments):
+        compiler.line = expr.paren.lno
+        compiler.emit(OpCode.CALLABLE)
+    for argument in expr.arguments:
+        compile_expr(argument, compiler)
+    compiler.line = expr.paren.lno
+    compiler.emit(OpCode.CALL, len(expr.arguments))
+
+
+@_compile_expr.register(Grouping)
+def _compile_grouping(expr: Grouping, compiler: _Compiler) -> None:
+    compile_expr(expr.expression, compiler)
+
+
+@_compile_expr.register(Literal)
+def _compile_literal(expr: Literal, compiler: _Compiler) -> None:
+    if expr.value is None:
+        compiler.emit(OpCode.NIL)
+    elif expr.value is True:
+        compiler.emit(OpCode.TRUE)
+    elif expr.value is False:
+        compiler.emit(OpCode.FALSE)
+    else:
+        compiler.emit(OpCode.CONSTANT, compiler.code.constant(expr.value))
+
+
+@_compile_expr.register(Logical)
+def _compile_logical(expr: Logical, compiler: _Compiler) -> None:
+    compile_expr(expr.left, compiler)
+    if expr.operator.kind == TokenType.OR:
+        end = compiler.jump(OpCode.JUMP_IF_TRUE)
+    else:
+        end = compiler.jump(OpCode.JUMP_IF_FALSE)
+    compiler.emit(OpCode.POP)
+    compile_expr(expr.right, compiler)
+    compiler.land(end)
+
+
+@_compile_expr.register(Unary)
+def _compile_unary(expr: Unary, compiler: _Compiler) -> None:
+    compile_expr(expr.right, compiler)
+    compiler.line = expr.operator.lno
+    if expr.operator.kind == TokenType.BANG:
+        compiler.emit(OpCode.NOT)
+    elif expr.operator.kind == TokenType.MINUS:
+        compiler.emit(OpCode.NEGATE)
+    else:
+        # This is an internal error.
+        raise RuntimeError(f"unexpected Unary operator: {expr.operator.kind}")
+
+
+@_compile_expr.register(Variable)
+def _compile_variable(expr: Variable, compiler: _Compiler) -> None:
+    compiler.variable(expr.name, get=True)
+
+
+@_compile_stmt.register(Block)
+def _compile_block(stmt: Block, compiler: _Compiler) -> None:
+    compiler.begin_scope()
+    for statement in stmt.statements:
+        compile_stmt(statement, compiler)
+    compiler.end_scope()
+
+
+@_compile_stmt.register(Expression)
+def _compile_expression(stmt: Expression, compiler: _Compiler) -> None:
+    compile_expr(stmt.expression, compiler)
+    compiler.emit(OpCode.POP)
+
+
+@_compile_stmt.register(Function)
+def _compile_function(stmt: Function, compiler: _Compiler) -> None:
+    compiler.line = stmt.name.lno
+    # A local function is declared before its body is compiled, so that it can call
+    # itself.
+    if compiler.depth:
+        compiler.declare(stmt.name)
+
+    function = _Compiler(Code(stmt.name.lexeme, len(stmt.parameters)), compiler)
+    function.line = stmt.name.lno
+    function.begin_scope()
+    for parameter in stmt.parameters:
+        function.declare(parameter)
+    for statement in stmt.body.statements:
+        compile_stmt(statement, function)
+    function.emit(OpCode.NIL)
+    function.emit(OpCode.RETURN)
+
+    compiler.line = stmt.name.lno
+    upvalues = [word for local, index in function.upvalues for word in (local, index)]
+    compiler.emit(OpCode.CLOSURE, compiler.code.constant(function.code), *upvalues)
+    if not compiler.depth:
+        compiler.emit(OpCode.DEFINE_GLOBAL, compiler.code.constant(stmt.name.lexeme))
+
+
+@_compile_stmt.register(If)
+def _compile_if(stmt: If, compiler: _Compiler) -> None:
+    compile_expr(stmt.condition, compiler)
+    otherwise = compiler.jump(OpCode.POP_JUMP_IF_FALSE)
+    compile_stmt(stmt.then_branch, compiler)
+    if stmt.else_branch is None:
+        compiler.land(otherwise)
+        return
+
+    end = compiler.jump(OpCode.JUMP)
+    compiler.land(otherwise)
+    compile_stmt(stmt.else_branch, compiler)
+    compiler.land(end)
+
+
+@_compile_stmt.register(Print)
+def _compile_print(stmt: Print, compiler: _Compiler) -> None:
+    compile_expr(stmt.expression, compiler)
+    compiler.emit(OpCode.PRINT)
+
+
+@_compile_stmt.register(Return)
+def _compile_return(stmt: Return, compiler: _Compiler) -> None:
+    compile_expr(stmt.expression, compiler)
+    compiler.line = stmt.keyword.lno
+    compiler.emit(OpCode.RETURN)
+
+
+@_compile_stmt.register(Var)
+def _compile_var(stmt: Var, compiler: _Compiler) -> None:
+    compiler.line = stmt.name.lno
+    compile_expr(stmt.initializer, compiler)
+    compiler.line = stmt.name.lno
+    if compiler.depth:
+        # The initializer's value, on the stack, is the local's.
+        compiler.declare(stmt.name)
+    else:
+        compiler.emit(OpCode.DEFINE_GLOBAL, compiler.code.constant(stmt.name.lexeme))
+
+
+@_compile_stmt.register(While)
+def _compile_while(stmt: While, compiler: _Compiler) -> None:
+    start = len(compiler.code.code)
+    compile_expr(stmt.condition, compiler)
+    end = compiler.jump(OpCode.POP_JUMP_IF_FALSE)
+    compile_stmt(stmt.body, compiler)
+    compiler.emit(OpCode.JUMP, start)
+    compiler.land(end)
@@ -1,24 +1,68 @@
 from __future__ import annotations
 
-from typing import Optional
+from itertools import count
+from typing import ClassVar, Final, Optional
 
 from plox.errors import ExecutionError
 from plox.tokens import Token
 
+# The depth of a variable reference that the resolver found no local declaration for,
+# which is looked up by name in the globals.
+GLOBAL: Final = -1
+
+# The versions of environments' variables by name, unique across environments.
+_versions = count()
+
 
 class Environment:
-    def __init__(self, enclosing: Optional[Environment] = None) -> None:
+    __slots__ = (
+        "_enclosing",
+        "_globals",
+        "_values",
+        "slots",
+        "version",
+        "hits",
+        "misses",
+    )
+
+    # The number of environments created, and reused from the free lists of blocks and
+    # functions whose environments cannot be captured. See reuse.
+    created: ClassVar[int] = 0
+    reused: ClassVar[int] = 0
+
+    def __init__(
+        self,
+        enclosing: Optional[Environment] = None,
+        slots: Optional[list[object]] = None,
+    ) -> None:
+        Environment.created += 1
         self._enclosing: Optional[Environment] = enclosing
-        self._values: dict[str, object] = {}
+        self._globals: Environment = self if enclosing is None else enclosing._globals
+        # The local variables of resolved code, by the slots the resolver gave them,
+        # or else the variables (globals, or locals of unresolved code) by name.
+        if slots is None:
+            self.slots: list[object] = []
+            self._values: dict[str, object] = {}
+            # Changed whenever a variable is defined or assigned by name, so that a
+            # value read in one version is still current while the version is.
+            self.version = next(_versions)
+            # Of the globals: the number of times resolved variables read them from
+            # their caches, and read them from here, see plox.ast.Variable.
+            self.hits = 0
+            self.misses = 0
+        else:
+            self.slots = slots
 
     @classmethod
     def from_globals(cls, dct: dict[str, object]) -> Environment:
         self = cls()
         self._values = dict(dct.items())
+        self.version = next(_versions)
         return self
 
     def define(self, name: Token, value: object) -> None:
         self._values[name.lexeme] = value
+        self.version = next(_versions)
 
     def __getitem__(self, name: Token) -> object:
         try:
@@ -34,6 +78,7 @@ class Environment:
     def __setitem__(self, name: Token, value: object) -> None:
         if name.lexeme in self._values:
             self._values[name.lexeme] = value
+            self.version = next(_versions)
             return
 
         if self._enclosing is not None:
@@ -41,3 +86,34 @@ class Environment:
             return
 
         raise ExecutionError(f"Undefined variable '{name.lexeme}'.", name)
+
+    def reuse(self, enclosing: Environment) -> Environment:
+        """Return this environment, no longer in use, as one enclosed by enclosing.
+
+        Its slots keep their old values, to be overwritten as the variables are
+        defined.
+        """
+        Environment.reused += 1
+        self._enclosing = enclosing
+        self._globals = enclosing.globals
+        return self
+
+    @property
+    def globals(self) -> Environment:
+        return self._globals
+
+    def get_at(self, depth: int, slot: int) -> object:
+        """Get the local variable in slot of the environment depth levels up."""
+        return self._ancestor(depth).slots[slot]
+
+    def set_at(self, depth: int, slot: int, value: object) -> None:
+        """Set the local variable in slot of the environment depth levels up."""
+        self._ancestor(depth).slots[slot] = value
+
+    def _ancestor(self, depth: int) -> Environment:
+        # pylint: disable=protected-access
+        env = self
+        for _ in range(depth):
+            assert env._enclosing is not None
+            env = env._enclosing
+        return env
@@ -17,6 +17,13 @@ class ParserError(Exception):
         self.token = token
 
 
+class ResolverError(Exception):
+    # pylint: disable=super-init-not-called
+    def __init__(self, message: str, token: Token) -> None:
+        self.message = message
+        self.token = token
+
+
 class ExecutionError(Exception):
     # pylint: disable=super-init-not-called
     def __init__(self, message: str, token: Token) -> None:
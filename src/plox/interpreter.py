@@ -1,17 +1,69 @@
-from plox.ast import Stmt, execute
+from collections.abc import Iterable
+
+from plox import transpiler
+from plox.ast import Stmt, compile_stmt, execute, stack
 from plox.builtins import Clock
+from plox.compiler import compile_script
 from plox.environment import Environment
 from plox.errors import ExecutionError, report
+from plox.vm import VM
+
+
+def _builtins() -> dict[str, object]:
+    return {"clock": Clock()}
 
 
 class Interpreter:
     def __init__(self) -> None:
-        self._env = Environment.from_globals({"clock": Clock()})
+        self._env = Environment.from_globals(_builtins())
 
-    def interpret(self, statements: list[Stmt]) -> None:
+    def interpret(self, statements: Iterable[Stmt]) -> None:
         for statement in statements:
             try:
-                execute(statement, self._env)
+                self._execute(statement)
             except ExecutionError as e:
                 report(e.token.lno, "", e.message)
                 raise
+
+    def _execute(self, statement: Stmt) -> None:
+        execute(statement, self._env)
+
+
+class ClosureInterpreter(Interpreter):
+    """Run each statement by compiling it into closures, see plox.ast.closures."""
+
+    def _execute(self, statement: Stmt) -> None:
+        compile_stmt(statement)(self._env)
+
+
+class StackInterpreter(Interpreter):
+    """Run each statement on an explicit stack, see plox.ast.stack."""
+
+    def __init__(self, max_depth: int = stack.MAX_DEPTH) -> None:
+        super().__init__()
+        self._max_depth = max_depth
+
+    def _execute(self, statement: Stmt) -> None:
+        stack.execute(statement, self._env, self._max_depth)
+
+
+class TranspilingInterpreter(Interpreter):
+    """Run each statement by transpiling it into Python, see plox.transpiler."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._namespace = transpiler.namespace(_builtins())
+
+    def _execute(self, statement: Stmt) -> None:
+        transpiler.run((statement,), self._namespace)
+
+
+class VMInterpreter(Interpreter):
+    """Run each statement by compiling it into bytecode, see plox.vm."""
+
+    def __init__(self, max_depth: int = stack.MAX_DEPTH) -> None:
+        super().__init__()
+        self._vm = VM(_builtins(), max_depth)
+
+    def _execute(self, statement: Stmt) -> None:
+        self._vm.run(compile_script((statement,)))
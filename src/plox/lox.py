@@ -1,29 +1,141 @@
 import sys
+from collections.abc import Iterable, Iterator
+from contextlib import closing, contextmanager, nullcontext
 from pathlib import Path
+from typing import Callable, ContextManager
 
-from plox.errors import ExecutionError, ParserError, ScannerError
+from plox import cache, parallel
+from plox.ast import Stmt
+from plox.errors import ExecutionError, ParserError, ResolverError, ScannerError
 from plox.interpreter import Interpreter
 from plox.parser import Parser
-from plox.scanner import Scanner
+from plox.protocols import SupportsScanTokens
+from plox.resolver import Resolver, resolve
+from plox.scanner import RegexScanner, mapped_source, scan_lines
+from plox.tokens import Source
+
+
+def _resolved(statements: Iterable[Stmt], memoize: int) -> Iterator[Stmt]:
+    """Resolve each statement as it arrives, before it is run."""
+    resolver = Resolver(memoize=memoize)
+    for statement in statements:
+        resolver.resolve((statement,))
+        yield statement
+
+
+@contextmanager
+def _exit_on_error() -> Iterator[None]:
+    try:
+        yield
+    except (ParserError, ResolverError, ScannerError):
+        sys.exit(65)
+    except ExecutionError:
+        sys.exit(70)
 
 
 class Lox:
-    def __init__(self) -> None:
-        self._interpreter = Interpreter()
+    # pylint: disable=too-many-instance-attributes
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        scanner: Callable[[Source], SupportsScanTokens] = RegexScanner,
+        *,
+        streaming: bool = False,
+        workers: int = 1,
+        parser: type[Parser] = Parser,
+        caching: bool = True,
+        lazy: bool = False,
+        engine: Callable[[], Interpreter] = Interpreter,
+        memoize: int = 0,
+    ) -> None:
+        self._interpreter = engine()
+        self._scanner = scanner
+        # Execute each top-level declaration as soon as it is parsed, rather than
+        # only after parsing (and reporting every error in) the whole script.
+        self._streaming = streaming
+        # Scan and parse (but not stream) scripts across this many processes.
+        self._workers = workers
+        self._parser = parser
+        # Load (non-streamed) scripts from, and save them to, __loxcache__.
+        self._caching = caching
+        # Only parse function bodies when the functions are first called.
+        self._lazy = lazy
+        # Memoize up to this many results of each pure function's calls, with the
+        # engines that run LoxFunctions, see LoxFunction.memoized.
+        self._memoize = memoize
 
-    def run(self, source: str) -> None:
-        tokens = Scanner(source).scan_tokens()
-        statements = Parser(tokens).parse()
-        self._interpreter.interpret(statements)
+    def run(self, source: Source) -> None:
+        if self._streaming:
+            # Close the tokens even after an error, so that they stop holding source,
+            # e.g. so that mapped_source can unmap it at once.
+            with closing(self._scanner(source).iter_tokens()) as tokens:
+                statements = self._parser(tokens, self._lazy).declarations()
+                self._interpreter.interpret(_resolved(statements, self._memoize))
+        else:
+            self._run(self._parse(source))
 
     def run_file(self, path: Path) -> None:
-        source = path.read_text()
-        try:
-            self.run(source)
-        except (ParserError, ScannerError):
-            sys.exit(65)
-        except ExecutionError:
-            sys.exit(70)
+        with _exit_on_error():
+            if self._streaming:
+                with mapped_source(path) as source:
+                    self.run(source)
+            else:
+                # Only keep the file mapped for as long as its tokens are needed.
+                with self._source(path) as source:
+                    statements = self._load(path, source)
+                self._run(statements)
+
+    def compile_file(self, path: Path) -> None:
+        """Parse the script at path and cache its statements, without running it."""
+        with _exit_on_error():
+            with self._source(path) as source:
+                statements = self._parse(source)
+                # Cached unresolved, as by run_file, since loading resolves them.
+                cache.dump(path, source, statements, self._lazy)
+            # Report the errors running the script would.
+            resolve(statements)
+
+    def _run(self, statements: list[Stmt]) -> None:
+        resolve(statements, self._memoize)
+        self._interpreter.interpret(statements)
+
+    def _source(self, path: Path) -> ContextManager[Source]:
+        if self._lazy:
+            # Lazily parsed function bodies need their tokens, and so the source,
+            # for as long as the functions might be called.
+            return nullcontext(path.read_text(encoding="utf-8"))
+        return mapped_source(path)
+
+    def run_lines(self, lines: Iterable[str]) -> None:
+        """Run a script that arrives a line at a time, e.g. piped to stdin.
+
+        When streaming, each line is scanned as it arrives (with the regex scanner,
+        whichever scanner was chosen), so output starts before the script ends.
+        """
+        with _exit_on_error():
+            if self._streaming:
+                tokens = scan_lines(lines)
+                statements = self._parser(tokens, self._lazy).declarations()
+                self._interpreter.interpret(_resolved(statements, self._memoize))
+            else:
+                self.run("".join(lines))
+
+    def _load(self, path: Path, source: Source) -> list[Stmt]:
+        """Parse source, the script at path, or load its statements from the cache."""
+        if not self._caching:
+            return self._parse(source)
+
+        statements = cache.load(path, source, self._lazy)
+        if statements is None:
+            statements = self._parse(source)
+            cache.dump(path, source, statements, self._lazy)
+        return statements
+
+    def _parse(self, source: Source) -> list[Stmt]:
+        if self._workers > 1:
+            return parallel.parse(source, self._workers, self._parser, self._lazy)
+        tokens = self._scanner(source).scan_tokens()
+        return self._parser(tokens, self._lazy).parse()
 
     def run_prompt(self) -> None:
         while True:
@@ -39,5 +151,5 @@ class Lox:
 
             try:
                 self.run(source_line)
-            except (ExecutionError, ParserError, ScannerError):
+            except (ExecutionError, ParserError, ResolverError, ScannerError):
                 pass
@@ -0,0 +1,64 @@
+"""Memoize the results of calls of pure Lox functions, see LoxFunction.memoized."""
+
+from collections import OrderedDict
+from math import copysign
+from typing import ClassVar, Final
+
+# What Memo.get returns for arguments whose result it does not have.
+MISSING: Final = object()
+
+
+def key(arguments: list[object]) -> tuple[object, ...]:
+    """Return a key for arguments, equal only to keys of arguments Lox treats alike.
+
+    Python's == holds between arguments a function may treat differently: true and 1,
+    which print differently, and 0 and -0, e.g. 1 / -0 is -inf. So each argument is
+    keyed with its type, or if a number, its sign.
+    """
+    return tuple(
+        (a, copysign(1.0, a)) if isinstance(a, float) else (a, type(a))
+        for a in arguments
+    )
+
+
+class Memo:
+    """A pure function's results, by the keys of the arguments it returned them for.
+
+    At most maxsize are kept, the least recently used being evicted to make room.
+    """
+
+    __slots__ = ("maxsize", "_results")
+
+    # Across all functions, the number of calls whose results were found, and not
+    # found, and the number of results evicted.
+    hits: ClassVar[int] = 0
+    misses: ClassVar[int] = 0
+    evictions: ClassVar[int] = 0
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._results: OrderedDict[tuple[object, ...], object] = OrderedDict()
+
+    def get(self, arguments: tuple[object, ...]) -> object:
+        """Return the result for the key arguments, or MISSING if there is none."""
+        try:
+            result = self._results[arguments]
+        except KeyError:
+            Memo.misses += 1
+            return MISSING
+        self._results.move_to_end(arguments)
+        Memo.hits += 1
+        return result
+
+    def put(self, arguments: tuple[object, ...], result: object) -> None:
+        """Remember result for the key arguments."""
+        self._results[arguments] = result
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+            Memo.evictions += 1
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    def __len__(self) -> int:
+        return len(self._results)
@@ -0,0 +1,112 @@
+"""Scan and parse large scripts in parallel, across processes.
+
+A script is split into chunks at the start of top-level 'fun' and 'var'
+declarations, and each chunk is scanned and parsed in a separate process. In a
+valid script, a 'fun' or 'var' keyword outside of any braces or parentheses can
+only start a top-level declaration, so the chunks parse to exactly the statements
+of the whole script. If any chunk fails to scan or parse, the whole script is
+instead scanned and parsed serially, so that errors are reported exactly as they
+would be otherwise.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr
+from io import StringIO
+from typing import Any, Optional
+
+from plox.ast import Stmt
+from plox.errors import ParserError, ScannerError
+from plox.parser import Parser
+from plox.scanner import RegexScanner
+from plox.tokens import Source
+
+# Only what is needed to track nesting depth; strings and comments are matched so
+# that braces, parentheses and keywords inside them are skipped.
+_STRUCTURE_RE = re.compile(
+    r'"[^"]*"|//[^\n]*|(?P<open>[{(])|(?P<close>[)}])|(?P<declaration>\b(?:fun|var)\b)'
+)
+_BINARY_STRUCTURE_RE = re.compile(_STRUCTURE_RE.pattern.encode())
+
+# Aim for a few chunks per worker, so that work is balanced between them.
+_CHUNKS_PER_WORKER = 4
+
+
+def _count_newlines(source: Source, start: int, end: int) -> int:
+    if isinstance(source, str):
+        return source.count("\n", start, end)
+    return bytes(source[start:end]).count(b"\n")
+
+
+def split(source: Source, n: int) -> list[tuple[int, int]]:
+    """Split source into at most n chunks of roughly equal size.
+
+    Return the start offset and starting line number of each chunk. Each chunk
+    after the first starts with a top-level 'fun' or 'var' keyword.
+    """
+    pattern: "re.Pattern[Any]" = (
+        _STRUCTURE_RE if isinstance(source, str) else _BINARY_STRUCTURE_RE
+    )
+    size = len(source) // n
+    chunks = [(0, 1)]
+    lno = 1
+    depth = 0
+    for m in pattern.finditer(source):
+        group = m.lastgroup
+        if group == "open":
+            depth += 1
+        elif group == "close":
+            depth -= 1
+        elif group == "declaration" and depth == 0:
+            pos = m.start()
+            if pos >= size * len(chunks):
+                start, _ = chunks[-1]
+                lno += _count_newlines(source, start, pos)
+                chunks.append((pos, lno))
+
+    return chunks
+
+
+def _parse_chunk(
+    parser: type[Parser], lazy: bool, chunk: Source, lno: int
+) -> Optional[list[Stmt]]:
+    # Errors are reported when the script is parsed again, serially.
+    with redirect_stderr(StringIO()):
+        try:
+            return parser(RegexScanner(chunk, lno).scan_tokens(), lazy).parse()
+        except (ParserError, ScannerError):
+            return None
+
+
+def parse(
+    source: Source, workers: int, parser: type[Parser] = Parser, lazy: bool = False
+) -> list[Stmt]:
+    """Scan and parse source across workers processes."""
+    chunks = split(source, workers * _CHUNKS_PER_WORKER)
+    if len(chunks) == 1:
+        return parser(RegexScanner(source).scan_tokens(), lazy).parse()
+
+    ends = [start for start, _ in chunks[1:]] + [len(source)]
+    parts: list[Source] = [source[start:end] for (start, _), end in zip(chunks, ends)]
+    if isinstance(source, memoryview):
+        # A memoryview cannot be sent to another process, but its bytes can.
+        parts = [source[start:end].tobytes() for (start, _), end in zip(chunks, ends)]
+
+    with ProcessPoolExecutor(workers) as executor:
+        results = list(
+            executor.map(
+                _parse_chunk,
+                [parser] * len(chunks),
+                [lazy] * len(chunks),
+                parts,
+                [lno for _, lno in chunks],
+            )
+        )
+
+    statements = []
+    for result in results:
+        if result is None:
+            return parser(RegexScanner(source).scan_tokens(), lazy).parse()
+        statements.extend(result)
+
+    return statements
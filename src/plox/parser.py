@@ -1,4 +1,6 @@
-from typing import Optional, Union
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from enum import IntEnum
+from typing import Any, ClassVar, Optional, Union
 
 from plox.ast import (
     Assign,
@@ -21,7 +23,25 @@ from plox.ast import (
     While,
 )
 from plox.errors import ParserError, report
-from plox.tokens import Token, TokenType
+from plox.tokens import Token, TokenStream, TokenType
+
+
+class _Precedence(IntEnum):
+    """Binding powers of the expression grammar, from loosest to tightest."""
+
+    ASSIGNMENT = 1
+    OR = 2
+    AND = 3
+    EQUALITY = 4
+    COMPARISON = 5
+    TERM = 6
+    FACTOR = 7
+    UNARY = 8
+    CALL = 9
+
+
+_PrefixRule = Callable[["Parser", Token], Expr]
+_InfixRule = Callable[["Parser", Expr, Token, int], Expr]
 
 
 def _report(e: ParserError) -> None:
@@ -30,26 +50,143 @@ def _report(e: ParserError) -> None:
     report(t.lno, where, e.message)
 
 
+def _for_loop(
+    initializer: Union[None, Expression, Var],
+    condition: Expr,
+    increment: Optional[Expression],
+    body: Stmt,
+) -> Union[Block, While]:
+    """Desugar a for loop into a while loop."""
+    if increment is not None:
+        body = Block([body, increment])
+    loop: Union[Block, While] = While(condition, body)
+
+    if initializer is not None:
+        loop = Block([initializer, loop])
+
+    return loop
+
+
+class LazyBlock(Block):
+    """A function body that is only parsed when its statements are first needed.
+
+    The body is parsed from tokens[start], the token after its '{', and syntax errors
+    in it are reported, and raised, at that point. So are errors raised by the
+    on_parse callback, e.g. the resolver's.
+    """
+
+    __slots__ = ("_tokens", "_start", "_parser", "_on_parse")
+
+    # pylint: disable-next=super-init-not-called
+    def __init__(
+        self, tokens: Sequence[Token], start: int, parser: type["Parser"]
+    ) -> None:
+        # statements is left unset, so that getting it calls __getattr__.
+        self.size = None
+        self.free = None
+        self._tokens: Optional[Sequence[Token]] = tokens
+        self._start = start
+        self._parser = parser
+        self._on_parse: Optional[Callable[[list[Stmt]], None]] = None
+
+    @property
+    def parsed(self) -> bool:
+        return self._tokens is None
+
+    def on_parse(self, callback: Callable[[list[Stmt]], None]) -> None:
+        """Call callback with the statements when they are parsed."""
+        self._on_parse = callback
+
+    def __getattr__(self, name: str) -> Any:
+        if name != "statements" or self._tokens is None:
+            raise AttributeError(name)
+        statements = self._parser(self._tokens, lazy=True).parse_block(self._start)
+        if self._on_parse is not None:
+            self._on_parse(statements)
+        # Set the slot, so that this is not called again, and release the tokens.
+        object.__setattr__(self, "statements", statements)
+        self._tokens = None
+        self._on_parse = None
+        return statements
+
+    def __reduce__(self) -> tuple[type[Block], tuple[object, ...]]:
+        if self._tokens is None:
+            return Block, (self.statements,)
+        return LazyBlock, (self._tokens, self._start, self._parser)
+
+
+def _block_end(tokens: Sequence[Token], start: int) -> int:
+    if isinstance(tokens, TokenStream):
+        return tokens.block_end(start)
+
+    depth = 0
+    for i in range(start, len(tokens)):
+        kind = tokens[i].kind
+        if kind == TokenType.LEFT_BRACE:
+            depth += 1
+        elif kind == TokenType.RIGHT_BRACE:
+            if depth == 0:
+                return i
+            depth -= 1
+    return len(tokens) - 1
+
+
 class Parser:
-    def __init__(self, tokens: list[Token]) -> None:
+    def __init__(self, tokens: Iterable[Token], lazy: bool = False) -> None:
         self._exc: Optional[ParserError] = None
-        self._tokens = tokens
-        self._current = 0
+        # Tokens are consumed strictly in order, and only the current and previous
+        # tokens are kept, so that e.g. a TokenStream need only materialise each
+        # Token once. The current token is only taken from tokens when it is first
+        # needed, so a declaration is complete as soon as its last token is consumed.
+        self._tokens = iter(tokens)
+        self._current: Optional[Token] = None
+        self._prev: Optional[Token] = None
+        # Only find the end of each function body, leaving it to be parsed if the
+        # function is called. See LazyBlock. Bodies can be skipped without creating
+        # their tokens if tokens can be indexed, so track the index of the next.
+        self._lazy = lazy
+        self._sequence: Optional[Sequence[Token]] = (
+            tokens if isinstance(tokens, Sequence) else None
+        )
+        self._position = 0
+
+    def parse_block(self, start: int) -> list[Stmt]:
+        """Parse the statements of the block whose body starts at tokens[start]."""
+        self._seek(start)
+        return self._block_statement().statements
 
     def parse(self) -> list[Stmt]:
-        statements = []
+        return list(self.declarations())
+
+    def declarations(self) -> Iterator[Stmt]:
+        """Yield each top-level declaration as soon as it is parsed.
+
+        After the first error no more declarations are yielded, but parsing continues
+        so that other errors are reported, and the first error is raised at the end.
+        """
         while not self._at_end():
             try:
-                statements.append(self._declaration())
+                declaration = self._declaration()
             except ParserError:
                 # Continue parsing so we can report other errors to the user.
                 self._synchronize()
+                continue
+            except RecursionError:
+                # The declaration is nested too deeply to parse on the Python stack
+                # (StackParser can parse it). There is no sensible place to resume, and
+                # tokens may come from a generator that the RecursionError finished.
+                self._error("Too much nesting.", self._previous())
+                # The error is raised outside this handler, so that it does not keep
+                # the RecursionError as its context, whose frames may hold slices of
+                # the source, e.g. of a file that mapped_source is about to unmap.
+                break
+
+            if self._exc is None:
+                yield declaration
 
         if self._exc is not None:
             raise self._exc
 
-        return statements
-
     def _declaration(self) -> Stmt:
         if self._match(TokenType.FUN):
             return self._function_declaration("function")
@@ -58,6 +195,12 @@ class Parser:
         return self._statement()
 
     def _function_declaration(self, kind: str) -> Function:
+        name, parameters = self._function_header(kind)
+        body = self._lazy_block() if self._lazy else self._block_statement()
+        return Function(name, parameters, body)
+
+    def _function_header(self, kind: str) -> tuple[Token, list[Token]]:
+        """Parse a function's name and parameters, up to and including its '{'."""
         name = self._consume(TokenType.IDENTIFIER, f"Expect {kind} name.")
         parameters: list[Token] = []
 
@@ -85,9 +228,7 @@ class Parser:
         self._consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
 
         self._consume(TokenType.LEFT_BRACE, f"Expect '{{' before {kind} body.")
-        body = self._block_statement()
-
-        return Function(name, parameters, body)
+        return name, parameters
 
     def _variable_declaration(self) -> Var:
         name = self._consume(TokenType.IDENTIFIER, "Expect a variable name.")
@@ -116,6 +257,13 @@ class Parser:
         return self._expression_statement()
 
     def _for_statement(self) -> Union[Block, While]:
+        initializer, condition, increment = self._for_clauses()
+        body = self._statement()
+        return _for_loop(initializer, condition, increment, body)
+
+    def _for_clauses(
+        self,
+    ) -> tuple[Union[None, Expression, Var], Expr, Optional[Expression]]:
         self._consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
 
         initializer: Union[None, Expression, Var]
@@ -138,15 +286,7 @@ class Parser:
         )
         self._consume(TokenType.RIGHT_PAREN, "Expect ')' after for clauses.")
 
-        body = self._statement()
-        if increment is not None:
-            body = Block([body, increment])
-        body = While(condition, body)
-
-        if initializer is not None:
-            body = Block([initializer, body])
-
-        return body
+        return initializer, condition, increment
 
     def _if_statement(self) -> If:
         self._consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
@@ -190,135 +330,111 @@ class Parser:
         self._consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
         return Block(statements)
 
+    def _lazy_block(self) -> LazyBlock:
+        tokens: Sequence[Token]
+        if self._sequence is None:
+            tokens, start = self._skip_block(), 0
+        else:
+            tokens, start = self._sequence, self._position
+            self._seek(_block_end(tokens, start))
+
+        self._consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
+        return LazyBlock(tokens, start, type(self))
+
+    def _skip_block(self) -> list[Token]:
+        """Consume the tokens of a block's body, up to its '}', and return them all."""
+        tokens = []
+        depth = 0
+        while not self._at_end():
+            token = self._peek()
+            if token.kind == TokenType.LEFT_BRACE:
+                depth += 1
+            elif token.kind == TokenType.RIGHT_BRACE:
+                if depth == 0:
+                    break
+                depth -= 1
+            tokens.append(self._advance())
+        tokens.append(self._peek())
+        return tokens
+
     def _expression_statement(self) -> Expression:
         expr = self._expression()
         self._consume(TokenType.SEMICOLON, "Expect ';' after expression.")
         return Expression(expr)
 
     def _expression(self) -> Expr:
-        return self._assignment()
-
-    def _assignment(self) -> Expr:
-        expr = self._or()
-
-        if self._match(TokenType.EQUAL):
-            equals = self._previous()
-            value = self._assignment()
-
-            if isinstance(expr, Variable):
-                return Assign(expr.name, value)
-
-            # The parser is not in a confused state, so we do not need to raise and
-            # trigger a _synchronize().
-            self._error("Invalid assignment target.", equals)
-
-        return expr
-
-    def _or(self) -> Expr:
-        expr = self._and()
-
-        while self._match(TokenType.OR):
-            op = self._previous()
-            rhs = self._and()
-            expr = Logical(expr, op, rhs)
-
-        return expr
-
-    def _and(self) -> Expr:
-        expr = self._equality()
-
-        while self._match(TokenType.AND):
-            op = self._previous()
-            rhs = self._equality()
-            expr = Logical(expr, op, rhs)
-
-        return expr
-
-    def _equality(self) -> Expr:
-        expr = self._comparison()
-
-        while self._match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            op = self._previous()
-            rhs = self._comparison()
-            expr = Binary(expr, op, rhs)
-
-        return expr
-
-    def _comparison(self) -> Expr:
-        expr = self._term()
-
-        while self._match(
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-        ):
-            op = self._previous()
-            rhs = self._term()
-            expr = Binary(expr, op, rhs)
-
-        return expr
-
-    def _term(self) -> Expr:
-        expr = self._factor()
-
-        while self._match(TokenType.MINUS, TokenType.PLUS):
-            op = self._previous()
-            rhs = self._factor()
-            expr = Binary(expr, op, rhs)
-
-        return expr
+        return self._parse_precedence(_Precedence.ASSIGNMENT)
+
+    def _parse_precedence(self, precedence: int) -> Expr:
+        """Parse an expression whose operators bind at least as tightly as precedence.
+
+        This is a Pratt parser: the current token selects a prefix rule, and then each
+        following token with an infix rule of high enough precedence extends the
+        expression parsed so far.
+        """
+        token = self._peek()
+        prefix = self._PREFIX_RULES.get(token.kind)
+        if prefix is None:
+            raise self._error("Expect expression.", token)
+        self._advance()
+        expr = prefix(self, token)
 
-    def _factor(self) -> Expr:
-        expr = self._unary()
+        while True:
+            token = self._peek()
+            rule = self._INFIX_RULES.get(token.kind)
+            if rule is None or rule[0] < precedence:
+                return expr
+            self._advance()
+            expr = rule[1](self, expr, token, rule[0])
 
-        while self._match(TokenType.SLASH, TokenType.STAR):
-            op = self._previous()
-            rhs = self._unary()
-            expr = Binary(expr, op, rhs)
+    def _literal(self, token: Token) -> Expr:
+        if token.kind == TokenType.TRUE:
+            return Literal(True)
+        if token.kind == TokenType.FALSE:
+            return Literal(False)
+        if token.kind == TokenType.NIL:
+            return Literal(None)
+        return Literal(token.literal)
 
-        return expr
+    def _variable(self, token: Token) -> Expr:
+        return Variable(token)
 
-    def _unary(self) -> Expr:
-        if self._match(TokenType.BANG, TokenType.MINUS):
-            op = self._previous()
-            rhs = self._unary()
-            return Unary(op, rhs)
+    def _grouping(self, _: Token) -> Expr:
+        expr = self._expression()
+        self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return Grouping(expr)
 
-        return self._call()
+    def _unary(self, op: Token) -> Expr:
+        rhs = self._parse_precedence(_Precedence.UNARY)
+        return Unary(op, rhs)
 
-    def _call(self) -> Expr:
-        expr = self._primary()
+    def _assignment(self, expr: Expr, equals: Token, precedence: int) -> Expr:
+        # Assignment is right-associative, so the value may itself be an assignment.
+        value = self._parse_precedence(precedence)
 
-        while self._match(TokenType.LEFT_PAREN):
-            expr = self._finish_call(expr)
+        if isinstance(expr, Variable):
+            return Assign(expr.name, value)
 
+        # The parser is not in a confused state, so we do not need to raise and
+        # trigger a _synchronize().
+        self._error("Invalid assignment target.", equals)
         return expr
 
-    def _primary(self) -> Expr:
-        if self._match(TokenType.TRUE):
-            return Literal(True)
-        if self._match(TokenType.FALSE):
-            return Literal(False)
-        if self._match(TokenType.NIL):
-            return Literal(None)
-
-        if self._match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self._previous().literal)
+    def _logical(self, expr: Expr, op: Token, precedence: int) -> Expr:
+        rhs = self._parse_precedence(precedence + 1)
+        return Logical(expr, op, rhs)
 
-        if self._match(TokenType.IDENTIFIER):
-            return Variable(self._previous())
+    def _binary(self, expr: Expr, op: Token, precedence: int) -> Expr:
+        rhs = self._parse_precedence(precedence + 1)
+        return Binary(expr, op, rhs)
 
-        if self._match(TokenType.LEFT_PAREN):
-            expr = self._expression()
-            self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
-
-        raise self._error("Expect expression.", self._peek())
+    def _call(self, expr: Expr, _: Token, __: int) -> Expr:
+        return self._finish_call(expr)
 
     def _advance(self) -> Token:
         if not self._at_end():
-            self._current += 1
+            self._prev = self._peek()
+            self._current = None
         return self._previous()
 
     def _at_end(self) -> bool:
@@ -353,6 +469,9 @@ class Parser:
             while self._match(TokenType.COMMA):
                 arguments.append(self._expression())
 
+        return self._end_call(callee, arguments)
+
+    def _end_call(self, callee: Expr, arguments: list[Expr]) -> Call:
         if len(arguments) > 255:
             # The parser isn't confused, so we don't need to raise.
             # The reference jlox does this in-loop above, which seems to be
@@ -366,17 +485,32 @@ class Parser:
         return Call(callee, paren, arguments)
 
     def _match(self, *args: TokenType) -> bool:
-        if any(self._check(kind) for kind in args):
+        kind = self._peek().kind
+        if kind in args and kind != TokenType.EOF:
             self._advance()
             return True
         return False
 
     def _peek(self) -> Token:
-        return self._tokens[self._current]
+        if self._current is None:
+            self._current = next(self._tokens)
+            self._position += 1
+        return self._current
+
+    def _seek(self, position: int) -> None:
+        """Continue from the token at position, when tokens can be indexed."""
+        tokens = self._sequence
+        assert tokens is not None
+        if isinstance(tokens, TokenStream):
+            self._tokens = tokens.iter_from(position)
+        else:
+            self._tokens = (tokens[i] for i in range(position, len(tokens)))
+        self._position = position
+        self._current = None
 
     def _previous(self) -> Token:
-        assert self._current > 0
-        return self._tokens[self._current - 1]
+        assert self._prev is not None
+        return self._prev
 
     def _synchronize(self) -> None:
         self._advance()
@@ -398,3 +532,33 @@ class Parser:
                 return
 
             self._advance()
+
+    # The rules refer to the functions above, so must come after them.
+    _PREFIX_RULES: ClassVar[dict[TokenType, _PrefixRule]] = {
+        TokenType.TRUE: _literal,
+        TokenType.FALSE: _literal,
+        TokenType.NIL: _literal,
+        TokenType.NUMBER: _literal,
+        TokenType.STRING: _literal,
+        TokenType.IDENTIFIER: _variable,
+        TokenType.LEFT_PAREN: _grouping,
+        TokenType.BANG: _unary,
+        TokenType.MINUS: _unary,
+    }
+
+    _INFIX_RULES: ClassVar[dict[TokenType, tuple[int, _InfixRule]]] = {
+        TokenType.EQUAL: (_Precedence.ASSIGNMENT, _assignment),
+        TokenType.OR: (_Precedence.OR, _logical),
+        TokenType.AND: (_Precedence.AND, _logical),
+        TokenType.BANG_EQUAL: (_Precedence.EQUALITY, _binary),
+        TokenType.EQUAL_EQUAL: (_Precedence.EQUALITY, _binary),
+        TokenType.GREATER: (_Precedence.COMPARISON, _binary),
+        TokenType.GREATER_EQUAL: (_Precedence.COMPARISON, _binary),
+        TokenType.LESS: (_Precedence.COMPARISON, _binary),
+        TokenType.LESS_EQUAL: (_Precedence.COMPARISON, _binary),
+        TokenType.MINUS: (_Precedence.TERM, _binary),
+        TokenType.PLUS: (_Precedence.TERM, _binary),
+        TokenType.SLASH: (_Precedence.FACTOR, _binary),
+        TokenType.STAR: (_Precedence.FACTOR, _binary),
+        TokenType.LEFT_PAREN: (_Precedence.CALL, _call),
+    }
@@ -1,8 +1,10 @@
-from typing import Protocol, runtime_checkable
+from collections.abc import Generator, Sequence
+from typing import Protocol
 
+from plox.tokens import Token
 
-@runtime_checkable
-class SupportsCall(Protocol):
-    def arity(self) -> int: ...
 
-    def call(self, arguments: list[object]) -> object: ...
+class SupportsScanTokens(Protocol):
+    def scan_tokens(self) -> Sequence[Token]: ...
+
+    def iter_tokens(self) -> Generator[Token, None, None]: ...
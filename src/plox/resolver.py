@@ -0,0 +1,403 @@
+"""Resolve each variable reference to the scope that declares it.
+
+The resolver runs between parsing and interpreting. It decides which environments
+the interpreter creates: one for each call, shared by the parameters and the body,
+and one for each block that declares variables that a function declared in the block
+could capture (or that is not in a function or another block). Each local variable
+gets a slot in an environment. The resolver sets the depth of each Variable and
+Assign, the number of environments between the reference and the declaration (or
+GLOBAL if there is no local declaration), and the slot, the size of each
+environment, the call each Return returns the value of, if any, and the variables
+each pure function reads that are declared outside it, so that its calls can be
+memoized. Errors that can be found without running the script, e.g. reading a local
+variable in its own initializer, are reported and raised.
+
+Nodes are resolved in order from a stack, rather than by recursion, so that the
+resolver can handle any tree the parser can build, and a tree is either resolved
+completely or not at all. Each node's handler returns the work to push: its children,
+and actions to take after them, such as closing a scope.
+"""
+
+from collections.abc import Callable, Iterable, Sequence
+from functools import partial, singledispatch
+from typing import Any, NamedTuple, Optional, Union
+
+from plox.ast import (
+    Assign,
+    Binary,
+    Block,
+    Call,
+    Expr,
+    Expression,
+    Function,
+    Grouping,
+    If,
+    Literal,
+    Logical,
+    Print,
+    Return,
+    Stmt,
+    Unary,
+    Var,
+    Variable,
+    While,
+)
+from plox.ast.node import Node
+from plox.environment import GLOBAL
+from plox.errors import ResolverError, report
+from plox.parser import LazyBlock
+from plox.tokens import Token
+
+
+class _Scope(NamedTuple):
+    # Maps each name declared in the scope to its slot.
+    slots: dict[str, int]
+    # The index in Resolver.environments of the environment that holds the slots.
+    environment: int
+
+
+_Work = Union[Expr, Stmt, Callable[[], None]]
+
+
+class _Purity:
+    """What the resolver notes to find which functions are pure, see Function.reads."""
+
+    __slots__ = ("memoize", "function", "callees")
+
+    def __init__(self, memoize: int) -> None:
+        # See Function.memo_size.
+        self.memoize = memoize
+        # The function whose body is being resolved, if any, and the index in
+        # Resolver.environments of the environment of its calls.
+        self.function: Optional[tuple[Function, int]] = None
+        # The ids of the variables that the function's body calls.
+        self.callees: set[int] = set()
+
+
+class Resolver:
+    def __init__(
+        self,
+        scopes: Optional[list[_Scope]] = None,
+        environments: Optional[list[int]] = None,
+        in_function: bool = False,
+        memoize: int = 0,
+    ):
+        self._exc: Optional[ResolverError] = None
+        # The local scopes enclosing the node being resolved, innermost last. The
+        # global scope is not tracked.
+        self.scopes: list[_Scope] = [] if scopes is None else scopes
+        # The number of slots in each environment that the interpreter creates for
+        # the enclosing scopes, outermost first. Scopes may share an environment.
+        self.environments: list[int] = [] if environments is None else environments
+        self.in_function = in_function
+        # The name of the local variable whose initializer is being resolved.
+        self.initializing: Optional[str] = None
+        # The ids of blocks that contain function declarations, see _capturing.
+        self.capturing: set[int] = set()
+        self.purity = _Purity(memoize)
+
+    def resolve(
+        self, statements: Iterable[Stmt], function: Optional[Function] = None
+    ) -> None:
+        """Resolve statements, reporting every error and raising the first.
+
+        If statements are the body of function, they are resolved in its scope, which
+        must be innermost.
+        """
+        statements = list(statements)
+        self.capturing |= _capturing(statements, function)
+        if function is not None:
+            function.reads = []
+            self.purity.function = (function, len(self.environments) - 1)
+        stack: list[_Work] = list(reversed(statements))
+        while stack:
+            work = stack.pop()
+            if isinstance(work, Node):
+                stack.extend(reversed(_resolve(work, self)))
+            else:
+                work()
+
+        if self._exc is not None:
+            raise self._exc
+
+    def begin_scope(self, new_environment: bool) -> None:
+        """Begin a scope, in a new environment or the innermost one."""
+        if new_environment:
+            self.environments.append(0)
+        self.scopes.append(_Scope({}, len(self.environments) - 1))
+
+    def end_scope(self) -> None:
+        self.scopes.pop()
+
+    def end_environment(self, node: Union[Block, Function]) -> None:
+        """End the scope that began the innermost environment, node's."""
+        self.scopes.pop()
+        node.size = self.environments.pop()
+        if id(node) not in self.capturing:
+            node.free = []
+
+    def end_function(
+        self,
+        stmt: Function,
+        in_function: bool,
+        function: Optional[tuple[Function, int]],
+    ) -> None:
+        self.end_environment(stmt)
+        self.in_function = in_function
+        self.purity.function = function
+
+    def end_initializer(self) -> None:
+        self.initializing = None
+
+    def declare(self, name: Token) -> Optional[int]:
+        """Declare name in the innermost scope, returning its slot if local."""
+        if not self.scopes:
+            return None
+        slots, environment = self.scopes[-1]
+        if name.lexeme in slots:
+            self.error("Already a variable with this name in this scope.", name)
+            return slots[name.lexeme]
+        slot = slots[name.lexeme] = self.environments[environment]
+        self.environments[environment] += 1
+        return slot
+
+    def resolve_local(self, expr: Union[Assign, Variable]) -> None:
+        lexeme = expr.name.lexeme
+        for slots, environment in reversed(self.scopes):
+            if lexeme in slots:
+                expr.depth = len(self.environments) - 1 - environment
+                expr.slot = slots[lexeme]
+                self._access(expr, environment)
+                return
+        expr.depth = GLOBAL
+        self._access(expr, GLOBAL)
+
+    def _access(self, expr: Union[Assign, Variable], environment: int) -> None:
+        """Note expr's access of a variable in environment's slots, or the globals."""
+        if self.purity.function is None:
+            return
+        function, own = self.purity.function
+        if environment >= own:
+            # A local variable, e.g. a parameter, may hold an impure function.
+            if id(expr) in self.purity.callees:
+                self.impure()
+        elif isinstance(expr, Assign):
+            self.impure()
+        elif function.reads is not None:
+            # The globals are not in environments, GLOBAL being before the first.
+            depth = GLOBAL if environment == GLOBAL else own - 1 - environment
+            function.reads.append((depth, expr.slot, expr.name))
+
+    def impure(self) -> None:
+        """Note that the function whose body is being resolved, if any, is impure."""
+        if self.purity.function is not None:
+            self.purity.function[0].reads = None
+
+    def resolve_later(self, stmt: Function) -> None:
+        """Resolve the lazily parsed body of stmt, in the current scopes, once parsed.
+
+        The function's own scope, and environment, must be innermost.
+        """
+        scopes = _copy(self.scopes)
+        environments = list(self.environments)
+
+        def callback(statements: list[Stmt]) -> None:
+            # Copy the scopes again, in case an error means this is called again.
+            resolver = Resolver(
+                _copy(scopes), list(environments), True, self.purity.memoize
+            )
+            resolver.resolve(statements, stmt)
+            resolver.end_environment(stmt)
+
+        assert isinstance(stmt.body, LazyBlock)
+        stmt.body.on_parse(callback)
+
+    def error(self, message: str, token: Token) -> None:
+        report(token.lno, f"at '{token.lexeme}'", message)
+        if self._exc is None:
+            self._exc = ResolverError(message, token)
+
+
+def _copy(scopes: list[_Scope]) -> list[_Scope]:
+    return [_Scope(dict(slots), environment) for slots, environment in scopes]
+
+
+def _capturing(statements: list[Stmt], function: Optional[Function] = None) -> set[int]:
+    """Return the ids of the blocks in statements that contain function declarations.
+
+    If statements are the body of function, function's id is included if they do.
+    Only a function declared in a block or function can capture its environment, e.g.
+    that of a particular iteration of a loop or call. Function bodies in statements
+    are not searched.
+    """
+    capturing: set[int] = set()
+    # The blocks (or function) enclosing the statement, innermost last.
+    blocks: list[Union[Block, Function]] = [] if function is None else [function]
+    # None marks the end of the innermost block.
+    stack: list[Optional[Stmt]] = list(reversed(statements))
+    while stack:
+        stmt = stack.pop()
+        if stmt is None:
+            blocks.pop()
+        elif isinstance(stmt, Block):
+            blocks.append(stmt)
+            stack.append(None)
+            stack.extend(reversed(stmt.statements))
+        elif isinstance(stmt, Function):
+            # Each enclosing block's enclosing blocks are already marked if it is.
+            for block in reversed(blocks):
+                if id(block) in capturing:
+                    break
+                capturing.add(id(block))
+        elif isinstance(stmt, If):
+            if stmt.else_branch is not None:
+                stack.append(stmt.else_branch)
+            stack.append(stmt.then_branch)
+        elif isinstance(stmt, While):
+            stack.append(stmt.body)
+    return capturing
+
+
+def resolve(statements: Iterable[Stmt], memoize: int = 0) -> None:
+    Resolver(memoize=memoize).resolve(statements)
+
+
+@singledispatch
+def _resolve(node: Any, _: Resolver) -> Sequence[_Work]:
+    raise TypeError(f"resolve does not support {type(node)}")
+
+
+@_resolve.register(Block)
+def _resolve_block(stmt: Block, resolver: Resolver) -> Sequence[_Work]:
+    # A block that declares nothing needs neither a scope nor an environment, and one
+    # whose variables no function can capture can keep them in the environment of
+    # the enclosing block or call, if any.
+    if not any(isinstance(s, (Function, Var)) for s in stmt.statements):
+        stmt.size = 0
+        return stmt.statements
+    if resolver.environments and id(stmt) not in resolver.capturing:
+        stmt.size = 0
+        resolver.begin_scope(new_environment=False)
+        return [*stmt.statements, resolver.end_scope]
+    resolver.begin_scope(new_environment=True)
+    return [*stmt.statements, partial(resolver.end_environment, stmt)]
+
+
+@_resolve.register(Expression)
+def _resolve_expression(stmt: Expression, _: Resolver) -> Sequence[_Work]:
+    return (stmt.expression,)
+
+
+@_resolve.register(Function)
+def _resolve_function(stmt: Function, resolver: Resolver) -> Sequence[_Work]:
+    stmt.slot = resolver.declare(stmt.name)
+    stmt.memo_size = resolver.purity.memoize
+    # Each call of the enclosing function would declare a new function.
+    resolver.impure()
+    stmt.reads = []
+
+    resolver.begin_scope(new_environment=True)
+    for parameter in stmt.parameters:
+        resolver.declare(parameter)
+
+    body = stmt.body
+    if isinstance(body, LazyBlock) and not body.parsed:
+        resolver.resolve_later(stmt)
+        resolver.scopes.pop()
+        resolver.environments.pop()
+        return ()
+
+    resolver.capturing |= _capturing(body.statements, stmt)
+    in_function, resolver.in_function = resolver.in_function, True
+    function = resolver.purity.function
+    resolver.purity.function = (stmt, len(resolver.environments) - 1)
+    return [
+        *body.statements,
+        partial(resolver.end_function, stmt, in_function, function),
+    ]
+
+
+@_resolve.register(If)
+def _resolve_if(stmt: If, _: Resolver) -> Sequence[_Work]:
+    if stmt.else_branch is None:
+        return (stmt.condition, stmt.then_branch)
+    return (stmt.condition, stmt.then_branch, stmt.else_branch)
+
+
+@_resolve.register(Print)
+def _resolve_print(stmt: Print, resolver: Resolver) -> Sequence[_Work]:
+    resolver.impure()
+    return (stmt.expression,)
+
+
+@_resolve.register(Return)
+def _resolve_return(stmt: Return, resolver: Resolver) -> Sequence[_Work]:
+    if not resolver.in_function:
+        resolver.error("Can't return from top-level code.", stmt.keyword)
+    expression = stmt.expression
+    while isinstance(expression, Grouping):
+        expression = expression.expression
+    if isinstance(expression, Call):
+        stmt.call = expression
+    return (stmt.expression,)
+
+
+@_resolve.register(Var)
+def _resolve_var(stmt: Var, resolver: Resolver) -> Sequence[_Work]:
+    stmt.slot = resolver.declare(stmt.name)
+    if stmt.slot is None:
+        return (stmt.initializer,)
+    resolver.initializing = stmt.name.lexeme
+    return (stmt.initializer, resolver.end_initializer)
+
+
+@_resolve.register(While)
+def _resolve_while(stmt: While, _: Resolver) -> Sequence[_Work]:
+    return (stmt.condition, stmt.body)
+
+
+@_resolve.register(Assign)
+def _resolve_assign(expr: Assign, resolver: Resolver) -> Sequence[_Work]:
+    resolver.resolve_local(expr)
+    return (expr.value,)
+
+
+@_resolve.register(Binary)
+@_resolve.register(Logical)
+def _resolve_binary(expr: Union[Binary, Logical], _: Resolver) -> Sequence[_Work]:
+    return (expr.left, expr.right)
+
+
+@_resolve.register(Call)
+def _resolve_call(expr: Call, resolver: Resolver) -> Sequence[_Work]:
+    callee = expr.callee
+    while isinstance(callee, Grouping):
+        callee = callee.expression
+    if not isinstance(callee, Variable):
+        resolver.impure()
+    elif resolver.purity.function is not None:
+        resolver.purity.callees.add(id(callee))
+    return [expr.callee, *expr.arguments]
+
+
+@_resolve.register(Grouping)
+def _resolve_grouping(expr: Grouping, _: Resolver) -> Sequence[_Work]:
+    return (expr.expression,)
+
+
+@_resolve.register(Literal)
+def _resolve_literal(_: Literal, __: Resolver) -> Sequence[_Work]:
+    return ()
+
+
+@_resolve.register(Unary)
+def _resolve_unary(expr: Unary, _: Resolver) -> Sequence[_Work]:
+    return (expr.right,)
+
+
+@_resolve.register(Variable)
+def _resolve_variable(expr: Variable, resolver: Resolver) -> Sequence[_Work]:
+    if expr.name.lexeme == resolver.initializing:
+        resolver.error("Can't read local variable in its own initializer.", expr.name)
+    resolver.resolve_local(expr)
+    return ()
@@ -1,5 +1,13 @@
+import re
+from collections.abc import Generator, Iterable, Iterator
+from contextlib import contextmanager
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from sys import intern
+from typing import Any, NamedTuple
+
 from plox.errors import ScannerError, report
-from plox.tokens import Token, TokenType
+from plox.tokens import Source, Token, TokenStream, TokenType
 
 _KEYWORDS = {
     "and": TokenType.AND,
@@ -20,6 +28,70 @@ _KEYWORDS = {
     "while": TokenType.WHILE,
 }
 
+_OPERATORS = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "/": TokenType.SLASH,
+    "*": TokenType.STAR,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+}
+
+# Each match is a (possibly empty) run of whitespace followed by exactly one token,
+# comment or error; which of the groups after the whitespace is non-empty identifies
+# which. Trailing whitespace is consumed by a final empty match at the end of the
+# source. Character classes are spelled out, rather than using \s, \d or \w, to
+# match exactly what Scanner accepts.
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<WHITESPACE>[ \t\r\n]*)
+    (?:
+        (?P<IDENTIFIER>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<OPERATOR>[!=<>]=?|[(){},.\-+;*]|/(?!/))
+      | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+      | (?P<STRING>"[^"]*")
+      | (?P<COMMENT>//[^\n]*)
+      | (?P<UNTERMINATED>")
+      | (?P<ERROR>[^ \t\r\n])
+      | \Z
+    )
+    """,
+    re.VERBOSE,
+)
+
+
+class _Lexicon(NamedTuple):
+    # Any rather than AnyStr, because generic NamedTuples require Python 3.11.
+    pattern: "re.Pattern[Any]"
+    keywords: dict[Any, TokenType]
+    operators: dict[Any, TokenType]
+    newline: Any
+
+
+_TEXT_LEXICON = _Lexicon(_TOKEN_RE, _KEYWORDS, _OPERATORS, "\n")
+# For scanning UTF-8 encoded source directly. Every token other than a string is
+# ASCII, and no byte of a multi-byte UTF-8 sequence is ASCII, so the same pattern
+# applies.
+_BINARY_LEXICON = _Lexicon(
+    re.compile(_TOKEN_RE.pattern.encode(), _TOKEN_RE.flags & ~re.UNICODE),
+    {k.encode(): v for k, v in _KEYWORDS.items()},
+    {k.encode(): v for k, v in _OPERATORS.items()},
+    b"\n",
+)
+
 
 def _is_alpha(char: str) -> bool:
     return "a" <= char <= "z" or "A" <= char <= "Z" or char == "_"
@@ -37,7 +109,16 @@ def _is_digit(char: str) -> bool:
 
 
 class Scanner:
-    def __init__(self, source: str) -> None:
+    """Scan source into tokens, a character at a time.
+
+    Identifiers' lexemes are interned, so that each name is one string, rather than
+    one per token, and looking one up in a dict keyed by the same name, e.g. of an
+    environment's variables, finds the key by identity rather than comparing it.
+    """
+
+    def __init__(self, source: Source) -> None:
+        if not isinstance(source, str):
+            source = str(source, "utf-8")
         self._source = source
         self._tokens: list[Token] = []
 
@@ -46,6 +127,10 @@ class Scanner:
         self._lno = 1
 
     def scan_tokens(self) -> list[Token]:
+        return list(self.iter_tokens())
+
+    def iter_tokens(self) -> Generator[Token, None, None]:
+        """Yield tokens as they are scanned, rather than after scanning all of them."""
         while not self._at_end():
             self._start = self._current
             try:
@@ -54,9 +139,10 @@ class Scanner:
                 report(e.lno, "", e.message)
                 raise
 
-        self._tokens.append(Token(TokenType.EOF, "", None, self._lno))
+            yield from self._tokens
+            self._tokens.clear()
 
-        return list(self._tokens)
+        yield Token(TokenType.EOF, "", None, self._lno)
 
     def _add_token(self, kind: TokenType, literal: object = None) -> None:
         text = self._source[self._start : self._current]
@@ -72,8 +158,13 @@ class Scanner:
             self._advance()
 
         text = self._source[self._start : self._current]
-        kind = _KEYWORDS.get(text, TokenType.IDENTIFIER)
-        self._add_token(kind)
+        kind = _KEYWORDS.get(text)
+        if kind is None:
+            self._tokens.append(
+                Token(TokenType.IDENTIFIER, intern(text), None, self._lno)
+            )
+        else:
+            self._add_token(kind)
 
     def _at_end(self) -> bool:
         return self._current >= len(self._source)
@@ -194,3 +285,197 @@ class Scanner:
         # Trim the quotes.
         value = self._source[self._start + 1 : self._current - 1]
         self._add_token(TokenType.STRING, value)
+
+
+class _UnterminatedString(ScannerError):
+    def __init__(self, message: str, lno: int, pos: int) -> None:
+        super().__init__(message, lno)
+        self.pos = pos
+
+
+def _char_at(source: Source, pos: int) -> str:
+    if isinstance(source, str):
+        return source[pos]
+    # A UTF-8 encoded character is at most four bytes.
+    return str(bytes(source[pos : pos + 4]), "utf-8", "replace")[0]
+
+
+def _count_newlines(source: Source, start: int) -> int:
+    if isinstance(source, str):
+        return source.count("\n", start)
+    return bytes(source[start:]).count(b"\n")
+
+
+def _lexeme(kind: TokenType, source: Source, start: int, end: int) -> str:
+    """Return the lexeme of the token of kind at source[start:end], as Scanner does."""
+    lexeme = source[start:end]
+    if not isinstance(lexeme, str):
+        lexeme = str(lexeme, "utf-8")
+    if kind == TokenType.IDENTIFIER:
+        return intern(lexeme)
+    return lexeme
+
+
+def _scan(
+    source: Source, lno: int = 1
+) -> Iterator[tuple[TokenType, int, int, int, object]]:
+    """Yield the (kind, start, end, line, literal) of each token in source.
+
+    The final token is always EOF. An unterminated string raises _UnterminatedString,
+    which also records where the string starts.
+    """
+    # pylint: disable=too-many-locals
+    text = isinstance(source, str)
+    pattern, keywords, operators, newline = _TEXT_LEXICON if text else _BINARY_LEXICON
+
+    pos = 0
+    for m in pattern.finditer(source):
+        whitespace, ident, op, number, string, comment, unterminated, error = m.groups()
+        if whitespace:
+            lno += whitespace.count(newline)
+            pos += len(whitespace)
+
+        # Ordered by how common each token is in typical source.
+        if ident:
+            end = pos + len(ident)
+            yield keywords.get(ident, TokenType.IDENTIFIER), pos, end, lno, None
+        elif op:
+            end = pos + len(op)
+            yield operators[op], pos, end, lno, None
+        elif number:
+            end = pos + len(number)
+            yield TokenType.NUMBER, pos, end, lno, float(number)
+        elif string:
+            # Allow for multi-line strings. As for Scanner, the token's line is that
+            # of the closing '"'.
+            end = pos + len(string)
+            lno += string.count(newline)
+            value = string[1:-1] if text else str(string[1:-1], "utf-8")
+            yield TokenType.STRING, pos, end, lno, value
+        elif comment:
+            end = pos + len(comment)
+        elif unterminated:
+            # The string runs to the end of the source.
+            lno += _count_newlines(source, pos)
+            raise _UnterminatedString("Unterminated string.", lno, pos)
+        elif error:
+            char = _char_at(source, pos)
+            raise ScannerError(f"Unexpected character: {char}.", lno)
+        else:
+            # Only whitespace remained.
+            break
+        pos = end
+
+    yield TokenType.EOF, pos, pos, lno, None
+
+
+@contextmanager
+def mapped_source(path: Path) -> Iterator[Source]:
+    """Memory-map the UTF-8 encoded source at path, for RegexScanner to scan in place.
+
+    The source is only valid inside the with block. Empty files, and files that
+    cannot be mapped (e.g. pipes), are read into memory instead.
+
+    Leaving the block never raises, so it never hides an exception raised in it: if
+    anything still holds part of the source, e.g. a suspended token iterator, or the
+    traceback of that exception, the file is unmapped once that is garbage collected.
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap(f.fileno(), 0, access=ACCESS_READ)
+        except (OSError, ValueError):
+            mapped = None
+
+        if mapped is None:
+            yield f.read()
+            return
+
+        view = memoryview(mapped)
+        try:
+            yield view
+        finally:
+            try:
+                view.release()
+                mapped.close()
+            except BufferError:
+                pass
+
+
+class RegexScanner:
+    """A drop-in replacement for Scanner built on a single compiled regex.
+
+    Whitespace, comments, identifiers, numbers and strings are each consumed by one
+    match of _TOKEN_RE, rather than one Python method call per character. The tokens,
+    and the line numbers of any ScannerError, are identical to Scanner's, but are
+    returned as a compact TokenStream rather than a list of Token objects.
+
+    The source may also be a UTF-8 encoded buffer, such as from mapped_source, which
+    is scanned without first decoding it. Only the literal values of strings are
+    decoded while scanning; lexemes are decoded as each Token is materialized.
+    """
+
+    def __init__(self, source: Source, lno: int = 1) -> None:
+        self._source = source
+        # The line number of the start of source, e.g. if it is part of a script.
+        self._lno = lno
+
+    def scan_tokens(self) -> TokenStream:
+        tokens = TokenStream(self._source)
+        append = tokens.append
+        try:
+            for kind, start, end, lno, literal in _scan(self._source, self._lno):
+                append(kind, start, end, lno, literal)
+        except ScannerError as e:
+            report(e.lno, "", e.message)
+            raise
+
+        return tokens
+
+    def iter_tokens(self) -> Generator[Token, None, None]:
+        """Yield tokens as they are scanned, rather than after scanning all of them."""
+        return _reporting_errors(self._iter_tokens())
+
+    def _iter_tokens(self) -> Iterator[Token]:
+        source = self._source
+        for kind, start, end, lno, literal in _scan(source, self._lno):
+            yield Token(kind, _lexeme(kind, source, start, end), literal, lno)
+
+
+def _reporting_errors(tokens: Iterator[Token]) -> Generator[Token, None, None]:
+    try:
+        yield from tokens
+    except ScannerError as e:
+        report(e.lno, "", e.message)
+        raise
+
+
+def scan_lines(lines: Iterable[str]) -> Iterator[Token]:
+    """Yield the tokens of source that arrives a line at a time, e.g. from a pipe.
+
+    Each line is scanned as soon as it arrives. Only a string that spans lines is
+    held back until its closing '"' arrives.
+    """
+    return _reporting_errors(_scan_lines(lines))
+
+
+def _scan_lines(lines: Iterable[str]) -> Iterator[Token]:
+    pending = ""
+    lno = 1
+    for line in lines:
+        pending += line
+        try:
+            for kind, start, end, token_lno, literal in _scan(pending, lno):
+                if kind == TokenType.EOF:
+                    lno = token_lno
+                else:
+                    lexeme = _lexeme(kind, pending, start, end)
+                    yield Token(kind, lexeme, literal, token_lno)
+        except _UnterminatedString as e:
+            # The closing '"' may be on a later line.
+            lno += pending.count("\n", 0, e.pos)
+            pending = pending[e.pos :]
+        else:
+            pending = ""
+
+    for kind, start, end, token_lno, literal in _scan(pending, lno):
+        yield Token(kind, _lexeme(kind, pending, start, end), literal, token_lno)
@@ -0,0 +1,221 @@
+"""A parser for arbitrarily deeply nested code.
+
+Parser recurses once per level of nesting, so it fails on, e.g., generated code that
+nests thousands of parenthesised expressions or blocks. StackParser parses the same
+language into the same trees, with nesting depth limited only by memory.
+
+Each grammar rule that can nest is written here as a generator (a "step") that yields
+the step for a sub-rule where Parser would call it, and is sent back its result. _run
+keeps the suspended steps on an explicit stack. Rules that cannot nest are inherited.
+"""
+
+from collections.abc import Callable, Generator
+from typing import Any, ClassVar, Optional, TypeVar
+
+from plox.ast import (
+    Assign,
+    Binary,
+    Block,
+    Expr,
+    Function,
+    Grouping,
+    If,
+    Logical,
+    Stmt,
+    Unary,
+    Variable,
+    While,
+)
+from plox.parser import Parser, _for_loop, _Precedence
+from plox.tokens import Token, TokenType
+
+T = TypeVar("T")
+
+# A step yields the steps it depends on, and is sent each of their results.
+_Step = Generator[Generator[Any, Any, Any], Any, T]
+_PrefixStep = Callable[["StackParser", Token], _Step[Expr]]
+_InfixStep = Callable[["StackParser", Expr, Token, int], _Step[Expr]]
+
+
+def _run(step: _Step[T]) -> T:
+    stack: list[_Step[Any]] = [step]
+    value: Any = None
+    exc: Optional[Exception] = None
+
+    while True:
+        try:
+            if exc is None:
+                dependency = stack[-1].send(value)
+            else:
+                dependency = stack[-1].throw(exc)
+        except StopIteration as stop:
+            stack.pop()
+            if not stack:
+                return stop.value  # type: ignore[no-any-return]
+            value, exc = stop.value, None
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Unwind the step that raised, and raise in the step that depends on it.
+            stack.pop()
+            if not stack:
+                raise
+            value, exc = None, e
+        else:
+            stack.append(dependency)
+            value, exc = None, None
+
+
+class StackParser(Parser):
+    def _declaration(self) -> Stmt:
+        return _run(self._declaration_step())
+
+    def _expression(self) -> Expr:
+        return _run(self._precedence_step(_Precedence.ASSIGNMENT))
+
+    def _declaration_step(self) -> _Step[Stmt]:
+        declaration: Stmt
+        if self._match(TokenType.FUN):
+            declaration = yield self._function_declaration_step("function")
+        elif self._match(TokenType.VAR):
+            declaration = self._variable_declaration()
+        else:
+            declaration = yield self._statement_step()
+        return declaration
+
+    def _function_declaration_step(self, kind: str) -> _Step[Function]:
+        name, parameters = self._function_header(kind)
+        body = self._lazy_block() if self._lazy else (yield self._block_step())
+        return Function(name, parameters, body)
+
+    def _statement_step(self) -> _Step[Stmt]:
+        statement: Stmt
+        if self._match(TokenType.FOR):
+            initializer, condition, increment = self._for_clauses()
+            body = yield self._statement_step()
+            statement = _for_loop(initializer, condition, increment, body)
+        elif self._match(TokenType.IF):
+            statement = yield self._if_step()
+        elif self._match(TokenType.PRINT):
+            statement = self._print_statement()
+        elif self._match(TokenType.RETURN):
+            statement = self._return_statement()
+        elif self._match(TokenType.WHILE):
+            statement = yield self._while_step()
+        elif self._match(TokenType.LEFT_BRACE):
+            statement = yield self._block_step()
+        else:
+            statement = self._expression_statement()
+        return statement
+
+    def _if_step(self) -> _Step[If]:
+        self._consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
+        condition = self._expression()
+        self._consume(TokenType.RIGHT_PAREN, "Expect ')' after if condition.")
+
+        then_branch = yield self._statement_step()
+        else_branch = (
+            (yield self._statement_step()) if self._match(TokenType.ELSE) else None
+        )
+
+        return If(condition, then_branch, else_branch)
+
+    def _while_step(self) -> _Step[While]:
+        self._consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
+        condition = self._expression()
+        self._consume(TokenType.RIGHT_PAREN, "Expect ')' after condition.")
+
+        body = yield self._statement_step()
+
+        return While(condition, body)
+
+    def _block_step(self) -> _Step[Block]:
+        statements = []
+
+        while not self._check(TokenType.RIGHT_BRACE) and not self._at_end():
+            statements.append((yield self._declaration_step()))
+
+        self._consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
+        return Block(statements)
+
+    def _precedence_step(self, precedence: int) -> _Step[Expr]:
+        token = self._peek()
+        prefix = self._PREFIX_RULES.get(token.kind)
+        if prefix is None:
+            raise self._error("Expect expression.", token)
+        self._advance()
+        prefix_step = self._PREFIX_STEPS.get(token.kind)
+        if prefix_step is None:
+            expr = prefix(self, token)
+        else:
+            expr = yield prefix_step(self, token)
+
+        while True:
+            token = self._peek()
+            rule = self._INFIX_STEPS.get(token.kind)
+            if rule is None or rule[0] < precedence:
+                return expr
+            self._advance()
+            expr = yield rule[1](self, expr, token, rule[0])
+
+    def _grouping_step(self, _: Token) -> _Step[Expr]:
+        expr = yield self._precedence_step(_Precedence.ASSIGNMENT)
+        self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return Grouping(expr)
+
+    def _unary_step(self, op: Token) -> _Step[Expr]:
+        rhs = yield self._precedence_step(_Precedence.UNARY)
+        return Unary(op, rhs)
+
+    def _assignment_step(
+        self, expr: Expr, equals: Token, precedence: int
+    ) -> _Step[Expr]:
+        value = yield self._precedence_step(precedence)
+
+        if isinstance(expr, Variable):
+            return Assign(expr.name, value)
+
+        self._error("Invalid assignment target.", equals)
+        return expr
+
+    def _logical_step(self, expr: Expr, op: Token, precedence: int) -> _Step[Expr]:
+        rhs = yield self._precedence_step(precedence + 1)
+        return Logical(expr, op, rhs)
+
+    def _binary_step(self, expr: Expr, op: Token, precedence: int) -> _Step[Expr]:
+        rhs = yield self._precedence_step(precedence + 1)
+        return Binary(expr, op, rhs)
+
+    def _call_step(self, expr: Expr, _: Token, __: int) -> _Step[Expr]:
+        arguments: list[Expr] = []
+
+        # Account for the zero-argument case.
+        if not self._check(TokenType.RIGHT_PAREN):
+            arguments.append((yield self._precedence_step(_Precedence.ASSIGNMENT)))
+
+            while self._match(TokenType.COMMA):
+                arguments.append((yield self._precedence_step(_Precedence.ASSIGNMENT)))
+
+        return self._end_call(expr, arguments)
+
+    # Only nesting prefix rules have steps: the others are Parser's _PREFIX_RULES.
+    _PREFIX_STEPS: ClassVar[dict[TokenType, _PrefixStep]] = {
+        TokenType.LEFT_PAREN: _grouping_step,
+        TokenType.BANG: _unary_step,
+        TokenType.MINUS: _unary_step,
+    }
+
+    _INFIX_STEPS: ClassVar[dict[TokenType, tuple[int, _InfixStep]]] = {
+        TokenType.EQUAL: (_Precedence.ASSIGNMENT, _assignment_step),
+        TokenType.OR: (_Precedence.OR, _logical_step),
+        TokenType.AND: (_Precedence.AND, _logical_step),
+        TokenType.BANG_EQUAL: (_Precedence.EQUALITY, _binary_step),
+        TokenType.EQUAL_EQUAL: (_Precedence.EQUALITY, _binary_step),
+        TokenType.GREATER: (_Precedence.COMPARISON, _binary_step),
+        TokenType.GREATER_EQUAL: (_Precedence.COMPARISON, _binary_step),
+        TokenType.LESS: (_Precedence.COMPARISON, _binary_step),
+        TokenType.LESS_EQUAL: (_Precedence.COMPARISON, _binary_step),
+        TokenType.MINUS: (_Precedence.TERM, _binary_step),
+        TokenType.PLUS: (_Precedence.TERM, _binary_step),
+        TokenType.SLASH: (_Precedence.FACTOR, _binary_step),
+        TokenType.STAR: (_Precedence.FACTOR, _binary_step),
+        TokenType.LEFT_PAREN: (_Precedence.CALL, _call_step),
+    }
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import re
+from array import array
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass
 from enum import Enum, auto, unique
+from sys import intern
+from typing import Union, overload
 
 
 @unique
@@ -64,3 +69,133 @@ class Token:
 
     def __str__(self) -> str:
         return f"{self.kind} {self.lexeme} {self.literal}"
+
+    def __reduce__(self) -> tuple[type["Token"], tuple[TokenType, str, object, int]]:
+        # Pickle as a call to the constructor, rather than the default of an empty
+        # instance and a dict of its fields, which is larger and slower to load.
+        return Token, (self.kind, self.lexeme, self.literal, self.lno)
+
+
+# Scanner source: text, or UTF-8 encoded bytes.
+Source = Union[str, bytes, memoryview]
+
+_KINDS = {kind.value: kind for kind in TokenType}
+_IDENTIFIER = TokenType.IDENTIFIER.value
+
+# Matches the kind of each brace token, in an array of token kinds.
+_BRACES_RE = re.compile(
+    b"["
+    + re.escape(bytes([TokenType.LEFT_BRACE.value, TokenType.RIGHT_BRACE.value]))
+    + b"]"
+)
+
+
+class TokenStream(Sequence[Token]):
+    """A compact sequence of the tokens scanned from some source.
+
+    Tokens are stored column-wise, in arrays of token kinds, lexeme start offsets,
+    lexeme lengths and line numbers, with the few literal values in a side table.
+    Token objects, and their lexemes, are only created as they are accessed. A
+    TokenStream compares equal to any sequence of equal tokens.
+
+    Offsets index into the source, so for encoded source they are byte offsets, and
+    lexemes are decoded as they are accessed. Identifiers' lexemes are interned, see
+    Scanner.
+    """
+
+    def __init__(self, source: Source) -> None:
+        self._source = source
+        self._kinds = array("B")
+        self._starts = array("Q")
+        self._lengths = array("I")
+        self._lnos = array("I")
+        self._literals: dict[int, object] = {}
+
+    def append(
+        self, kind: TokenType, start: int, end: int, lno: int, literal: object = None
+    ) -> None:
+        if literal is not None:
+            self._literals[len(self._kinds)] = literal
+        self._kinds.append(kind.value)
+        self._starts.append(start)
+        self._lengths.append(end - start)
+        self._lnos.append(lno)
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    @overload
+    def __getitem__(self, index: int) -> Token: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Token]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Token, list[Token]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        kind, start = self._kinds[index], self._starts[index]
+        lexeme = self._lexeme(start, start + self._lengths[index])
+        return Token(
+            _KINDS[kind],
+            intern(lexeme) if kind == _IDENTIFIER else lexeme,
+            self._literals.get(index),
+            self._lnos[index],
+        )
+
+    def __iter__(self) -> Iterator[Token]:
+        return self.iter_from(0)
+
+    def iter_from(self, index: int) -> Iterator[Token]:
+        """Iterate over the tokens from the one at index."""
+        source = self._source
+        if not isinstance(source, str):
+            for i in range(index, len(self)):
+                yield self[i]
+            return
+
+        literals = self._literals
+        arrays = [self._kinds, self._starts, self._lengths, self._lnos]
+        if index:
+            # Slices of memoryviews, unlike those of arrays, are not copies.
+            columns = zip(*(memoryview(a)[index:] for a in arrays))
+        else:
+            columns = zip(*arrays)
+        for i, (kind, start, length, lno) in enumerate(columns, index):
+            lexeme = source[start : start + length]
+            if kind == _IDENTIFIER:
+                lexeme = intern(lexeme)
+            yield Token(_KINDS[kind], lexeme, literals.get(i), lno)
+
+    def block_end(self, index: int) -> int:
+        """Return the index of the '}' that closes a block whose body starts at index.
+
+        Returns the index of the last token if there is no such '}'.
+        """
+        depth = 0
+        for m in _BRACES_RE.finditer(self._kinds, index):
+            if m[0][0] == TokenType.LEFT_BRACE.value:
+                depth += 1
+            elif depth == 0:
+                return m.start()
+            else:
+                depth -= 1
+        return len(self) - 1
+
+    def _lexeme(self, start: int, end: int) -> str:
+        lexeme = self._source[start:end]
+        if isinstance(lexeme, str):
+            return lexeme
+        return str(lexeme, "utf-8")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"TokenStream({list(self)!r})"
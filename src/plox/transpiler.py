@@ -0,0 +1,723 @@
+"""Transpile resolved Lox statements into a Python module, and run it.
+
+Each Lox function becomes a Python function, so that calls, closures and local
+variables run as CPython's own. Lox globals are the module's globals. Each block whose
+variables are in an environment of their own (see plox.resolver) becomes a Python
+function, called where the block is, so that functions declared in it, e.g. in each
+iteration of a loop, capture their own variables. Other blocks are inlined. Each
+variable's Python name is unique to its environment and slot, as Python has no
+block scope.
+
+Operators, truthiness and calls keep Lox semantics by checking the types of their
+operands inline, falling back to the helpers below to raise an ExecutionError with
+the token of the failed operation. Where the types are known from the expression,
+e.g. numeric literals or the results of comparisons, the checks are skipped.
+
+Generated nodes carry the Lox line numbers of their tokens, so that errors Python
+raises, i.e. a NameError for an undefined global, map to the Lox line they are on.
+
+Statements must be resolved. Lazily parsed function bodies are parsed, and their
+syntax errors reported, when the function declaration is transpiled.
+"""
+
+import ast
+import re
+from collections.abc import Iterable
+from functools import partial, singledispatch
+from types import FunctionType
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from plox.ast import (
+    Assign,
+    Binary,
+    Block,
+    Call,
+    Expr,
+    Expression,
+    Function,
+    Grouping,
+    If,
+    Literal,
+    Logical,
+    Print,
+    Return,
+    Stmt,
+    Unary,
+    Var,
+    Variable,
+    While,
+)
+from plox.ast.evaluation import _binary_op_error, _divide, _unary_op_error
+from plox.ast.execution import _stringify
+from plox.callables import LoxCallable
+from plox.environment import GLOBAL
+from plox.errors import ExecutionError
+from plox.tokens import Token, TokenType
+
+# The file name of the generated code, in tracebacks.
+FILENAME = "<lox>"
+
+_BINARY_OPS: dict[TokenType, Union[ast.operator, ast.cmpop]] = {
+    TokenType.BANG_EQUAL: ast.NotEq(),
+    TokenType.EQUAL_EQUAL: ast.Eq(),
+    TokenType.GREATER: ast.Gt(),
+    TokenType.GREATER_EQUAL: ast.GtE(),
+    TokenType.LESS: ast.Lt(),
+    TokenType.LESS_EQUAL: ast.LtE(),
+    TokenType.MINUS: ast.Sub(),
+    TokenType.PLUS: ast.Add(),
+    TokenType.SLASH: ast.Div(),
+    TokenType.STAR: ast.Mult(),
+}
+
+_COMPARISONS = {
+    TokenType.BANG_EQUAL,
+    TokenType.EQUAL_EQUAL,
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+}
+
+
+# Helpers, and Lox globals, that generated code refers to by name.
+
+
+def _lexeme(name: str) -> str:
+    # See _Transpiler.local and _global.
+    if name.startswith("g_"):
+        return name[2:]
+    return name.split("_", 2)[2]
+
+
+def _stringify_value(value: object) -> str:
+    if isinstance(value, FunctionType):
+        return f"<fn {_lexeme(value.__name__)}>"
+    return _stringify(value)
+
+
+def _binary_error(operator: Token) -> object:
+    raise ExecutionError(_binary_op_error(operator), operator)
+
+
+def _unary_error(operator: Token) -> object:
+    raise ExecutionError(_unary_op_error(operator), operator)
+
+
+def _callable(callee: object, paren: Token, count: int) -> Callable[..., object]:
+    """Return a function that calls callee with count arguments.
+
+    Raise if callee is not callable, or return a function that raises, once the
+    arguments are evaluated, if callee does not take count arguments.
+    """
+    if isinstance(callee, FunctionType):
+        arity = callee.__code__.co_argcount
+        function: Callable[..., object] = callee
+    elif isinstance(callee, LoxCallable):
+        arity = callee.arity
+        function = partial(_call_native, callee)
+    else:
+        raise ExecutionError("Can only call functions and classes.", paren)
+
+    if count != arity:
+        message = f"Expected {arity} arguments but got {count}."
+
+        def wrong_arity(*_: object) -> object:
+            raise ExecutionError(message, paren)
+
+        return wrong_arity
+    return function
+
+
+def _call_native(callee: LoxCallable, *arguments: object) -> object:
+    return callee.call(list(arguments))
+
+
+_HELPERS: dict[str, object] = {
+    "_binary_error": _binary_error,
+    "_callable": _callable,
+    "_divide": _divide,
+    "_function": FunctionType,
+    "_plus_types": (float, str),
+    "_stringify": _stringify_value,
+    "_unary_error": _unary_error,
+}
+
+
+def _global(lexeme: str) -> str:
+    return f"g_{lexeme}"
+
+
+def namespace(globals_: dict[str, object]) -> dict[str, object]:
+    """Return a namespace to run transpiled statements in, with the Lox globals_."""
+    dct: dict[str, object] = dict(_HELPERS)
+    # The tokens of the operations that might fail, see _Transpiler.token.
+    dct["_tokens"] = []
+    for name, value in globals_.items():
+        dct[_global(name)] = value
+    return dct
+
+
+def run(statements: Iterable[Stmt], namespace_: dict[str, object]) -> None:
+    """Transpile statements and run them in namespace_, see namespace.
+
+    Python limits what the other engines do not: loops nest at most 20 deep, and
+    calls, which are never tail calls, at most as deep as the recursion limit. Beyond
+    those an ExecutionError is raised.
+    """
+    tokens = namespace_["_tokens"]
+    assert isinstance(tokens, list)
+    try:
+        code = compile(transpile(statements, tokens), FILENAME, "exec")
+    except SyntaxError as e:
+        # "too many statically nested blocks"
+        token = Token(TokenType.WHILE, "while", None, e.lineno or 0)
+        raise ExecutionError("Too much nesting.", token) from None
+    try:
+        exec(code, namespace_)  # pylint: disable=exec-used
+    except NameError as e:
+        raise _undefined(e) from None
+    except RecursionError as e:
+        token = Token(TokenType.RIGHT_PAREN, ")", None, _lno(e))
+        raise ExecutionError("Stack overflow.", token) from None
+
+
+def _undefined(e: NameError) -> Exception:
+    """Return the ExecutionError for e, raised reading or assigning a Lox global."""
+    # NameError.name is only set from Python 3.10.
+    name = getattr(e, "name", None)
+    if name is None:
+        match = re.search(r"'(\w+)'", str(e))
+        name = match and match.group(1)
+    if not isinstance(name, str) or not name.startswith("g_"):
+        return e
+
+    token = Token(TokenType.IDENTIFIER, _lexeme(name), None, _lno(e))
+    return ExecutionError(f"Undefined variable '{token.lexeme}'.", token)
+
+
+def _lno(e: Exception) -> int:
+    """Return the Lox line of the innermost generated code that e was raised in."""
+    lno = 0
+    tb = e.__traceback__
+    while tb is not None:
+        if tb.tb_frame.f_code.co_filename == FILENAME:
+            lno = tb.tb_lineno
+        tb = tb.tb_next
+    return lno
+
+
+# Transpiling.
+
+
+class _Scope:
+    """A Python function, or the module, that the transpiled statements are in."""
+
+    def __init__(self, level: int, block: bool) -> None:
+        # The index of the environment the function stands for, -1 for the module.
+        self.level = level
+        # Whether the function is a block's, so that returns are wrapped in a tuple.
+        self.block = block
+        # Whether the block's statements return.
+        self.returns = False
+        self.globals: set[str] = set()
+        self.nonlocals: set[str] = set()
+
+    def declarations(self) -> list[ast.stmt]:
+        declarations: list[ast.stmt] = []
+        if self.globals:
+            declarations.append(ast.Global(names=sorted(self.globals)))
+        if self.nonlocals:
+            declarations.append(ast.Nonlocal(names=sorted(self.nonlocals)))
+        return declarations
+
+
+class _Transpiler:
+    def __init__(self, tokens: list[Token]) -> None:
+        self.tokens = tokens
+        # The innermost function last.
+        self.scopes: list[_Scope] = [_Scope(-1, block=False)]
+        self.temps = 0
+        self.blocks = 0
+
+    @property
+    def scope(self) -> _Scope:
+        return self.scopes[-1]
+
+    def temp(self) -> str:
+        self.temps += 1
+        return f"_t{self.temps}"
+
+    def once(self, expr: ast.expr) -> tuple[ast.expr, ast.expr]:
+        """Return expressions to evaluate expr, and then to use its value again.
+
+        Unless expr is a constant, it is evaluated into a temporary.
+        """
+        if isinstance(expr, ast.Constant):
+            return expr, expr
+        temp = self.temp()
+        return ast.NamedExpr(target=_store(temp), value=expr), _load(temp)
+
+    def token(self, token: Token) -> ast.expr:
+        """Return an expression for token, to pass to a helper that might raise."""
+        self.tokens.append(token)
+        return ast.Subscript(
+            value=_load("_tokens"), slice=ast.Constant(len(self.tokens) - 1), ctx=_LOAD
+        )
+
+    def local(self, lexeme: str, depth: int, slot: int) -> str:
+        """Return the Python name of the local variable in slot, depth levels up."""
+        return f"l{self.scope.level - depth}_{slot}_{lexeme}"
+
+    def variable(self, name: Token, depth: Optional[int], slot: int) -> str:
+        if depth is None:
+            raise ValueError(f"unresolved variable '{name.lexeme}' (line {name.lno})")
+        if depth == GLOBAL:
+            return _global(name.lexeme)
+        return self.local(name.lexeme, depth, slot)
+
+    def assign(self, expr: Assign, value: ast.expr) -> ast.NamedExpr:
+        name = self.variable(expr.name, expr.depth, expr.slot)
+        if expr.depth == GLOBAL:
+            # Assigning an undefined global is an error, so read it (after the value).
+            if self.scope.level >= 0:
+                self.scope.globals.add(name)
+            value = ast.Subscript(
+                value=ast.Tuple(elts=[value, _load(name, expr.name)], ctx=_LOAD),
+                slice=ast.Constant(0),
+                ctx=_LOAD,
+            )
+        elif expr.depth:
+            self.scope.nonlocals.add(name)
+        return _at(
+            ast.NamedExpr(target=_store(name, expr.name), value=value), expr.name
+        )
+
+    def declare(self, name: Token, slot: Optional[int]) -> str:
+        if slot is None:
+            if self.scope.level >= 0:
+                raise ValueError(f"unresolved declaration of '{name.lexeme}'")
+            return _global(name.lexeme)
+        return self.local(name.lexeme, 0, slot)
+
+    def truthy(self, expr: Expr) -> ast.expr:
+        """Return a Python condition that is true if expr is truthy in Lox."""
+        test = transpile_expr(expr, self)
+        if _kind(expr) is bool:
+            return test
+        return self.is_truthy(test)[0]
+
+    def is_truthy(self, expr: ast.expr) -> tuple[ast.expr, ast.expr]:
+        """Return whether expr is truthy in Lox, and then an expression for it."""
+        if isinstance(expr, ast.Constant):
+            truthy = expr.value is not None and expr.value is not False
+            return ast.Constant(truthy), expr
+        first, value = self.once(expr)
+        return (
+            ast.BoolOp(
+                op=ast.And(), values=[_is_not(first, None), _is_not(value, False)]
+            ),
+            value,
+        )
+
+    def body(self, statements: Iterable[Stmt]) -> list[ast.stmt]:
+        body = [s for statement in statements for s in transpile_stmt(statement, self)]
+        return body or [ast.Pass()]
+
+    def function(
+        self,
+        name: str,
+        parameters: list[str],
+        body: list[ast.stmt],
+        token: Optional[Token] = None,
+    ) -> ast.stmt:
+        """Return the definition of a function, ending the innermost scope.
+
+        The definition is on the line of token, if any, or else of its parent.
+        """
+        body = self.scopes.pop().declarations() + body
+        # Parsed, rather than built, as the fields of FunctionDef vary with Python.
+        definition = ast.parse(f"def {name}({', '.join(parameters)}): pass").body[0]
+        assert isinstance(definition, ast.FunctionDef)
+        definition.body = body
+        if token is not None:
+            return _at(definition, token)
+        for attribute in ("lineno", "end_lineno", "col_offset", "end_col_offset"):
+            delattr(definition, attribute)
+        return definition
+
+
+_Node = TypeVar("_Node", bound=Union[ast.expr, ast.stmt])
+
+_LOAD = ast.Load()
+_STORE = ast.Store()
+
+
+def _at(node: _Node, token: Token) -> _Node:
+    """Set the location of node to the line of token."""
+    node.lineno = node.end_lineno = token.lno
+    node.col_offset = node.end_col_offset = 0
+    return node
+
+
+def _load(name: str, token: Optional[Token] = None) -> ast.expr:
+    node = ast.Name(id=name, ctx=_LOAD)
+    return node if token is None else _at(node, token)
+
+
+def _store(name: str, token: Optional[Token] = None) -> ast.Name:
+    node = ast.Name(id=name, ctx=_STORE)
+    return node if token is None else _at(node, token)
+
+
+def _call_helper(name: str, *arguments: ast.expr) -> ast.expr:
+    return ast.Call(func=_load(name), args=list(arguments), keywords=[])
+
+
+def _is_not(expr: ast.expr, value: Optional[bool]) -> ast.expr:
+    return ast.Compare(left=expr, ops=[ast.IsNot()], comparators=[ast.Constant(value)])
+
+
+def _type(expr: ast.expr) -> ast.expr:
+    return _call_helper("type", expr)
+
+
+def _kind(expr: Expr) -> Optional[type]:
+    """Return the type expr always has, if known without running it."""
+    while isinstance(expr, (Assign, Grouping)):
+        expr = expr.value if isinstance(expr, Assign) else expr.expression
+    if isinstance(expr, Literal):
+        return type(expr.value)
+    if isinstance(expr, Unary):
+        return bool if expr.operator.kind == TokenType.BANG else float
+    if isinstance(expr, (Binary, Logical)):
+        return _operation_kind(expr)
+    return None
+
+
+def _operation_kind(expr: Union[Binary, Logical]) -> Optional[type]:
+    kind = expr.operator.kind
+    if kind in _COMPARISONS:
+        return bool
+    if kind not in (TokenType.AND, TokenType.OR, TokenType.PLUS):
+        return float
+    left, right = _kind(expr.left), _kind(expr.right)
+    if kind == TokenType.PLUS and left not in (float, str):
+        return None
+    return left if left is right else None
+
+
+def transpile(statements: Iterable[Stmt], tokens: list[Token]) -> ast.Module:
+    """Transpile resolved statements into a Python module.
+
+    The module refers to the helpers and tokens of a namespace, see namespace, and
+    appends the tokens it refers to to tokens, the namespace's.
+    """
+    transpiler = _Transpiler(tokens)
+    module = ast.Module(body=transpiler.body(statements), type_ignores=[])
+    return ast.fix_missing_locations(module)
+
+
+@singledispatch
+def _transpile_expr(expr: Any, _: _Transpiler) -> ast.expr:
+    raise TypeError(f"transpile_expr does not support {type(expr)}")
+
+
+def transpile_expr(expr: Expr, transpiler: _Transpiler) -> ast.expr:
+    return _transpile_expr(expr, transpiler)
+
+
+@singledispatch
+def _transpile_stmt(stmt: Any, _: _Transpiler) -> list[ast.stmt]:
+    raise TypeError(f"transpile_stmt does not support {type(stmt)}")
+
+
+def transpile_stmt(stmt: Stmt, transpiler: _Transpiler) -> list[ast.stmt]:
+    return _transpile_stmt(stmt, transpiler)
+
+
+@_transpile_expr.register(Assign)
+def _transpile_assign(expr: Assign, transpiler: _Transpiler) -> ast.expr:
+    return transpiler.assign(expr, transpile_expr(expr.value, transpiler))
+
+
+@_transpile_expr.register(Binary)
+def _transpile_binary(expr: Binary, transpiler: _Transpiler) -> ast.expr:
+    operator = expr.operator
+    left = transpile_expr(expr.left, transpiler)
+    right = transpile_expr(expr.right, transpiler)
+
+    if operator.kind in (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL):
+        return _at(_binary_op(operator.kind, left, right, checked=True), operator)
+
+    allowed = (float, str) if operator.kind == TokenType.PLUS else (float,)
+    kinds = (_kind(expr.left), _kind(expr.right))
+    if kinds[0] in allowed and kinds[0] == kinds[1]:
+        return _at(_binary_op(operator.kind, left, right, checked=True), operator)
+
+    # Both operands are evaluated, left first, before either is checked.
+    first_left, left = transpiler.once(left)
+    first_right, right = transpiler.once(right)
+    return _at(
+        ast.IfExp(
+            test=_binary_check(first_left, first_right, kinds, allowed),
+            body=_binary_op(operator.kind, left, right, checked=False),
+            orelse=_call_helper("_binary_error", transpiler.token(operator)),
+        ),
+        operator,
+    )
+
+
+def _binary_op(
+    kind: TokenType, left: ast.expr, right: ast.expr, checked: bool
+) -> ast.expr:
+    """Return the operation on left and right, each evaluated once unless checked."""
+    op = _BINARY_OPS[kind]
+    if kind == TokenType.SLASH:
+        if isinstance(right, ast.Constant) and right.value:
+            return ast.BinOp(left=left, op=ast.Div(), right=right)
+        if checked:
+            return _call_helper("_divide", left, right)
+        return ast.IfExp(
+            test=right,
+            body=ast.BinOp(left=left, op=ast.Div(), right=right),
+            orelse=_call_helper("_divide", left, right),
+        )
+    if isinstance(op, ast.cmpop):
+        return ast.Compare(left=left, ops=[op], comparators=[right])
+    return ast.BinOp(left=left, op=op, right=right)
+
+
+def _binary_check(
+    left: ast.expr,
+    right: ast.expr,
+    kinds: tuple[Optional[type], Optional[type]],
+    allowed: tuple[type, ...],
+) -> ast.expr:
+    """Return whether the types of left and right, of kinds, are allowed."""
+    # A constant operand's type is what the other's must be, else both must be of the
+    # same, allowed, type.
+    if isinstance(left, ast.Constant) and kinds[0] in allowed:
+        return ast.Compare(
+            left=_type(right),
+            ops=[ast.Is()],
+            comparators=[_load(type(left.value).__name__)],
+        )
+    if isinstance(right, ast.Constant) and kinds[1] in allowed:
+        return ast.Compare(
+            left=_type(left),
+            ops=[ast.Is()],
+            comparators=[_load(type(right.value).__name__)],
+        )
+
+    known = {kind for kind in kinds if kind is not None}
+    if len(known) == 1 and known <= set(allowed):
+        required: ast.expr = _load(known.pop().__name__)
+        op: ast.cmpop = ast.Is()
+    elif len(allowed) == 1:
+        required, op = _load("float"), ast.Is()
+    else:
+        required, op = _load("_plus_types"), ast.In()
+    return ast.Compare(
+        left=_type(left), ops=[ast.Is(), op], comparators=[_type(right), required]
+    )
+
+
+@_transpile_expr.register(Call)
+def _transpile_call(expr: Call, transpiler: _Transpiler) -> ast.expr:
+    callee = transpile_expr(expr.callee, transpiler)
+    arguments = [transpile_expr(argument, transpiler) for argument in expr.arguments]
+
+    # Lox functions of the right arity are called directly, anything else through
+    # what _callable returns for it, which checks the callee before the arguments are
+    # evaluated, and their number after, as evaluate does.
+    first, callee = transpiler.once(callee)
+    check = ast.BoolOp(
+        op=ast.And(),
+        values=[
+            ast.Compare(
+                left=_type(first),
+                ops=[ast.Is()],
+                comparators=[_load("_function")],
+            ),
+            ast.Compare(
+                left=ast.Attribute(
+                    value=ast.Attribute(value=callee, attr="__code__", ctx=_LOAD),
+                    attr="co_argcount",
+                    ctx=_LOAD,
+                ),
+                ops=[ast.Eq()],
+                comparators=[ast.Constant(len(arguments))],
+            ),
+        ],
+    )
+    checked = _call_helper(
+        "_callable",
+        callee,
+        transpiler.token(expr.paren),
+        ast.Constant(len(arguments)),
+    )
+    function = ast.IfExp(test=check, body=callee, orelse=checked)
+    return _at(ast.Call(func=function, args=arguments, keywords=[]), expr.paren)
+
+
+@_transpile_expr.register(Grouping)
+def _transpile_grouping(expr: Grouping, transpiler: _Transpiler) -> ast.expr:
+    return transpile_expr(expr.expression, transpiler)
+
+
+@_transpile_expr.register(Literal)
+def _transpile_literal(expr: Literal, _: _Transpiler) -> ast.expr:
+    value = expr.value
+    assert value is None or isinstance(value, (bool, float, str))
+    return ast.Constant(value)
+
+
+@_transpile_expr.register(Logical)
+def _transpile_logical(expr: Logical, transpiler: _Transpiler) -> ast.expr:
+    left = transpile_expr(expr.left, transpiler)
+    right = transpile_expr(expr.right, transpiler)
+    is_or = expr.operator.kind == TokenType.OR
+
+    if _kind(expr.left) is bool:
+        op = ast.Or() if is_or else ast.And()
+        return ast.BoolOp(op=op, values=[left, right])
+
+    truthy, left = transpiler.is_truthy(left)
+    if is_or:
+        return ast.IfExp(test=truthy, body=left, orelse=right)
+    return ast.IfExp(test=truthy, body=right, orelse=left)
+
+
+@_transpile_expr.register(Unary)
+def _transpile_unary(expr: Unary, transpiler: _Transpiler) -> ast.expr:
+    operator = expr.operator
+    right = transpile_expr(expr.right, transpiler)
+
+    if operator.kind == TokenType.BANG:
+        if _kind(expr.right) is bool:
+            return ast.UnaryOp(op=ast.Not(), operand=right)
+        return ast.UnaryOp(op=ast.Not(), operand=transpiler.is_truthy(right)[0])
+
+    if operator.kind != TokenType.MINUS:
+        # This is an internal error.
+        raise RuntimeError(f"unexpected Unary operator: {operator.kind}")
+    if isinstance(right, ast.Constant) and isinstance(right.value, float):
+        return ast.Constant(-right.value)
+    if _kind(expr.right) is float:
+        return _at(ast.UnaryOp(op=ast.USub(), operand=right), operator)
+
+    first, right = transpiler.once(right)
+    return _at(
+        ast.IfExp(
+            test=ast.Compare(
+                left=_type(first), ops=[ast.Is()], comparators=[_load("float")]
+            ),
+            body=ast.UnaryOp(op=ast.USub(), operand=right),
+            orelse=_call_helper("_unary_error", transpiler.token(operator)),
+        ),
+        operator,
+    )
+
+
+@_transpile_expr.register(Variable)
+def _transpile_variable(expr: Variable, transpiler: _Transpiler) -> ast.expr:
+    return _load(transpiler.variable(expr.name, expr.depth, expr.slot), expr.name)
+
+
+@_transpile_stmt.register(Block)
+def _transpile_block(stmt: Block, transpiler: _Transpiler) -> list[ast.stmt]:
+    if stmt.size is None:
+        raise ValueError("unresolved block")
+    # A block without an environment of its own has no scope Python needs to know of.
+    if not stmt.size:
+        return [
+            s
+            for statement in stmt.statements
+            for s in transpile_stmt(statement, transpiler)
+        ]
+
+    scope = transpiler.scope
+    transpiler.blocks += 1
+    name = f"_block{transpiler.blocks}"
+    transpiler.scopes.append(_Scope(scope.level + 1, block=True))
+    body = transpiler.body(stmt.statements)
+    returns = transpiler.scope.returns
+    definition = transpiler.function(name, [], body)
+    call = _call_helper(name)
+    if not returns:
+        return [definition, ast.Expr(value=call)]
+
+    # The block returned a value, in a tuple, that its enclosing function returns.
+    first, value = transpiler.once(call)
+    if scope.block:
+        scope.returns = True
+    else:
+        value = ast.Subscript(value=value, slice=ast.Constant(0), ctx=_LOAD)
+    return [
+        definition,
+        ast.If(
+            test=_is_not(first, None),
+            body=[ast.Return(value=value)],
+            orelse=[],
+        ),
+    ]
+
+
+@_transpile_stmt.register(Expression)
+def _transpile_expression(stmt: Expression, transpiler: _Transpiler) -> list[ast.stmt]:
+    return [ast.Expr(value=transpile_expr(stmt.expression, transpiler))]
+
+
+@_transpile_stmt.register(Function)
+def _transpile_function(stmt: Function, transpiler: _Transpiler) -> list[ast.stmt]:
+    name = transpiler.declare(stmt.name, stmt.slot)
+    transpiler.scopes.append(_Scope(transpiler.scope.level + 1, block=False))
+    parameters = [
+        transpiler.local(parameter.lexeme, 0, slot)
+        for slot, parameter in enumerate(stmt.parameters)
+    ]
+    body = transpiler.body(stmt.body.statements)
+    return [transpiler.function(name, parameters, body, stmt.name)]
+
+
+@_transpile_stmt.register(If)
+def _transpile_if(stmt: If, transpiler: _Transpiler) -> list[ast.stmt]:
+    test = transpiler.truthy(stmt.condition)
+    body = transpiler.body((stmt.then_branch,))
+    orelse = [] if stmt.else_branch is None else transpiler.body((stmt.else_branch,))
+    return [ast.If(test=test, body=body, orelse=orelse)]
+
+
+@_transpile_stmt.register(Print)
+def _transpile_print(stmt: Print, transpiler: _Transpiler) -> list[ast.stmt]:
+    value = _call_helper("_stringify", transpile_expr(stmt.expression, transpiler))
+    return [ast.Expr(value=_call_helper("print", value))]
+
+
+@_transpile_stmt.register(Return)
+def _transpile_return(stmt: Return, transpiler: _Transpiler) -> list[ast.stmt]:
+    value = transpile_expr(stmt.expression, transpiler)
+    scope = transpiler.scope
+    if scope.block:
+        scope.returns = True
+        value = ast.Tuple(elts=[value], ctx=_LOAD)
+    return [_at(ast.Return(value=value), stmt.keyword)]
+
+
+@_transpile_stmt.register(Var)
+def _transpile_var(stmt: Var, transpiler: _Transpiler) -> list[ast.stmt]:
+    value = transpile_expr(stmt.initializer, transpiler)
+    target = _store(transpiler.declare(stmt.name, stmt.slot), stmt.name)
+    return [_at(ast.Assign(targets=[target], value=value), stmt.name)]
+
+
+@_transpile_stmt.register(While)
+def _transpile_while(stmt: While, transpiler: _Transpiler) -> list[ast.stmt]:
+    test = transpiler.truthy(stmt.condition)
+    body = transpiler.body((stmt.body,))
+    loop = ast.While(test=test, body=body, orelse=[])
+    # At its condition's line, if known, e.g. for the SyntaxError of too many nested
+    # loops.
+    located = (node for node in ast.walk(test) if hasattr(node, "lineno"))
+    return [ast.copy_location(loop, next(located, test))]
@@ -0,0 +1,341 @@
+"""Run bytecode compiled by plox.compiler on a stack-based VM, as clox does.
+
+Each call pushes a frame, rather than recursing in Python, and the instructions of all
+calls are dispatched by one loop. Errors are raised as ExecutionErrors with a token
+rebuilt from the instruction and its line, equal to that the tree walker raises with.
+"""
+
+from typing import Callable
+
+from plox.ast import stack as stack_engine
+from plox.ast.evaluation import _binary_op_error, _divide, _unary_op_error
+from plox.ast.execution import _stringify
+from plox.bytecode import Code, OpCode
+from plox.callables import LoxCallable
+from plox.errors import ExecutionError
+from plox.tokens import Token, TokenType
+
+
+class Upvalue:
+    """A variable captured by a closure: the local in cells[index].
+
+    While the local is on the stack, cells is the stack. Once the local goes out of
+    scope, the upvalue is closed, and cells holds just its value.
+    """
+
+    __slots__ = ("cells", "index")
+
+    def __init__(self, cells: list[object], index: int) -> None:
+        self.cells = cells
+        self.index = index
+
+    def close(self) -> None:
+        self.cells = [self.cells[self.index]]
+        self.index = 0
+
+
+class Closure:
+    __slots__ = ("code", "upvalues")
+
+    def __init__(self, code: Code, upvalues: list[Upvalue]) -> None:
+        self.code = code
+        self.upvalues = upvalues
+
+    def __str__(self) -> str:
+        return str(self.code)
+
+
+# The opcodes as ints, which compare faster than OpCode members.
+_CONSTANT = int(OpCode.CONSTANT)
+_NIL = int(OpCode.NIL)
+_TRUE = int(OpCode.TRUE)
+_FALSE = int(OpCode.FALSE)
+_POP = int(OpCode.POP)
+_GET_LOCAL = int(OpCode.GET_LOCAL)
+_SET_LOCAL = int(OpCode.SET_LOCAL)
+_GET_GLOBAL = int(OpCode.GET_GLOBAL)
+_DEFINE_GLOBAL = int(OpCode.DEFINE_GLOBAL)
+_SET_GLOBAL = int(OpCode.SET_GLOBAL)
+_GET_UPVALUE = int(OpCode.GET_UPVALUE)
+_SET_UPVALUE = int(OpCode.SET_UPVALUE)
+_EQUAL = int(OpCode.EQUAL)
+_NOT_EQUAL = int(OpCode.NOT_EQUAL)
+_GREATER = int(OpCode.GREATER)
+_GREATER_EQUAL = int(OpCode.GREATER_EQUAL)
+_LESS = int(OpCode.LESS)
+_LESS_EQUAL = int(OpCode.LESS_EQUAL)
+_ADD = int(OpCode.ADD)
+_SUBTRACT = int(OpCode.SUBTRACT)
+_MULTIPLY = int(OpCode.MULTIPLY)
+_DIVIDE = int(OpCode.DIVIDE)
+_NOT = int(OpCode.NOT)
+_NEGATE = int(OpCode.NEGATE)
+_PRINT = int(OpCode.PRINT)
+_JUMP = int(OpCode.JUMP)
+_JUMP_IF_FALSE = int(OpCode.JUMP_IF_FALSE)
+_JUMP_IF_TRUE = int(OpCode.JUMP_IF_TRUE)
+_POP_JUMP_IF_FALSE = int(OpCode.POP_JUMP_IF_FALSE)
+_CALLABLE = int(OpCode.CALLABLE)
+_CALL = int(OpCode.CALL)
+_CLOSURE = int(OpCode.CLOSURE)
+_CLOSE_UPVALUE = int(OpCode.CLOSE_UPVALUE)
+_RETURN = int(OpCode.RETURN)
+
+# The tokens of the operators, by opcode, for errors.
+_OPERATORS = {
+    _GREATER: (TokenType.GREATER, ">"),
+    _GREATER_EQUAL: (TokenType.GREATER_EQUAL, ">="),
+    _LESS: (TokenType.LESS, "<"),
+    _LESS_EQUAL: (TokenType.LESS_EQUAL, "<="),
+    _ADD: (TokenType.PLUS, "+"),
+    _SUBTRACT: (TokenType.MINUS, "-"),
+    _MULTIPLY: (TokenType.STAR, "*"),
+    _DIVIDE: (TokenType.SLASH, "/"),
+    _NEGATE: (TokenType.MINUS, "-"),
+}
+
+_COMPARISONS: dict[int, Callable[[float, float], bool]] = {
+    _GREATER: float.__gt__,
+    _GREATER_EQUAL: float.__ge__,
+    _LESS: float.__lt__,
+    _LESS_EQUAL: float.__le__,
+}
+
+_ARITHMETIC: dict[int, Callable[[float, float], float]] = {
+    _SUBTRACT: float.__sub__,
+    _MULTIPLY: float.__mul__,
+    _DIVIDE: _divide,
+}
+
+
+def _operator(op: int, line: int) -> Token:
+    kind, lexeme = _OPERATORS[op]
+    return Token(kind, lexeme, None, line)
+
+
+def _binary_error(op: int, line: int) -> ExecutionError:
+    operator = _operator(op, line)
+    return ExecutionError(_binary_op_error(operator), operator)
+
+
+def _call_error(message: str, line: int) -> ExecutionError:
+    return ExecutionError(message, Token(TokenType.RIGHT_PAREN, ")", None, line))
+
+
+def _undefined(name: str, line: int) -> ExecutionError:
+    token = Token(TokenType.IDENTIFIER, name, None, line)
+    return ExecutionError(f"Undefined variable '{name}'.", token)
+
+
+class VM:
+    def __init__(
+        self, globals_: dict[str, object], max_depth: int = stack_engine.MAX_DEPTH
+    ) -> None:
+        self.globals = dict(globals_)
+        # The most calls in progress at once, beyond which a stack overflow is raised
+        # rather than the frames growing until memory runs out, as clox's FRAMES_MAX.
+        self.max_depth = max_depth
+
+    # pylint: disable-next=too-many-branches,too-many-locals,too-many-statements
+    def run(self, script: Code) -> None:
+        """Run the Code of a script, see plox.compiler.compile_script."""
+        globals_ = self.globals
+        max_depth = self.max_depth
+        closure = Closure(script, [])
+        stack: list[object] = [closure]
+        # The closure, instruction index and stack base of each call that called
+        # another, the current one last.
+        frames: list[tuple[Closure, int, int]] = []
+        # The upvalues of locals still on the stack, by ascending index.
+        open_upvalues: list[Upvalue] = []
+
+        function = closure.code
+        code, constants = function.code, function.constants
+        upvalues = closure.upvalues
+        ip = base = 0
+
+        while True:
+            op = code[ip]
+            ip += 1
+
+            if op == _GET_LOCAL:
+                stack.append(stack[base + code[ip]])
+                ip += 1
+            elif op == _CONSTANT:
+                stack.append(constants[code[ip]])
+                ip += 1
+            elif op == _POP_JUMP_IF_FALSE:
+                value = stack.pop()
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif op in _COMPARISONS:
+                right = stack.pop()
+                left = stack[-1]
+                if not isinstance(left, float) or not isinstance(right, float):
+                    raise _binary_error(op, function.lines[ip - 1])
+                stack[-1] = _COMPARISONS[op](left, right)
+            elif op == _ADD:
+                right = stack.pop()
+                left = stack[-1]
+                if (not isinstance(left, float) or not isinstance(right, float)) and (
+                    not isinstance(left, str) or not isinstance(right, str)
+                ):
+                    raise _binary_error(op, function.lines[ip - 1])
+                stack[-1] = left + right  # type: ignore[operator]
+            elif op in _ARITHMETIC:
+                right = stack.pop()
+                left = stack[-1]
+                if not isinstance(left, float) or not isinstance(right, float):
+                    raise _binary_error(op, function.lines[ip - 1])
+                stack[-1] = _ARITHMETIC[op](left, right)
+            elif op == _GET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                try:
+                    stack.append(globals_[name])  # type: ignore[index]
+                except KeyError:
+                    raise _undefined(str(name), function.lines[ip - 1]) from None
+            elif op == _SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+            elif op == _POP:
+                stack.pop()
+            elif op == _JUMP:
+                ip = code[ip]
+            elif op == _CALL:
+                count = code[ip]
+                ip += 1
+                callee = stack[-1 - count]
+                if isinstance(callee, Closure):
+                    if count != callee.code.arity:
+                        raise _call_error(
+                            f"Expected {callee.code.arity} arguments but got {count}.",
+                            function.lines[ip - 1],
+                        )
+                    if len(frames) == max_depth:
+                        raise _call_error("Stack overflow.", function.lines[ip - 1])
+                    frames.append((closure, ip, base))
+                    closure, function = callee, callee.code
+                    code, constants = function.code, function.constants
+                    upvalues = callee.upvalues
+                    ip, base = 0, len(stack) - count - 1
+                elif isinstance(callee, LoxCallable):
+                    if count != callee.arity:
+                        raise _call_error(
+                            f"Expected {callee.arity} arguments but got {count}.",
+                            function.lines[ip - 1],
+                        )
+                    arguments = stack[len(stack) - count :]
+                    del stack[len(stack) - count - 1 :]
+                    stack.append(callee.call(arguments))
+                else:
+                    raise _call_error(
+                        "Can only call functions and classes.", function.lines[ip - 1]
+                    )
+            elif op == _RETURN:
+                value = stack.pop()
+                while open_upvalues and open_upvalues[-1].index >= base:
+                    open_upvalues.pop().close()
+                del stack[base:]
+                if not frames:
+                    return
+                stack.append(value)
+                closure, ip, base = frames.pop()
+                function = closure.code
+                code, constants = function.code, function.constants
+                upvalues = closure.upvalues
+            elif op == _GET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                stack.append(upvalue.cells[upvalue.index])
+                ip += 1
+            elif op == _SET_UPVALUE:
+                upvalue = upvalues[code[ip]]
+                upvalue.cells[upvalue.index] = stack[-1]
+                ip += 1
+            elif op == _EQUAL:
+                right = stack.pop()
+                stack[-1] = stack[-1] == right
+            elif op == _NOT_EQUAL:
+                right = stack.pop()
+                stack[-1] = stack[-1] != right
+            elif op == _NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == _NEGATE:
+                value = stack[-1]
+                if isinstance(value, float):
+                    stack[-1] = -value
+                else:
+                    operator = _operator(op, function.lines[ip - 1])
+                    raise ExecutionError(_unary_op_error(operator), operator)
+            elif op == _NIL:
+                stack.append(None)
+            elif op == _TRUE:
+                stack.append(True)
+            elif op == _FALSE:
+                stack.append(False)
+            elif op == _JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = code[ip]
+                else:
+                    ip += 1
+            elif op == _JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 1
+                else:
+                    ip = code[ip]
+            elif op == _CALLABLE:
+                callee = stack[-1]
+                if not isinstance(callee, (Closure, LoxCallable)):
+                    raise _call_error(
+                        "Can only call functions and classes.", function.lines[ip - 1]
+                    )
+            elif op == _PRINT:
+                print(_stringify(stack.pop()))
+            elif op == _SET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in globals_:
+                    raise _undefined(str(name), function.lines[ip - 1])
+                globals_[name] = stack[-1]
+            elif op == _DEFINE_GLOBAL:
+                globals_[constants[code[ip]]] = stack.pop()  # type: ignore[index]
+                ip += 1
+            elif op == _CLOSURE:
+                nested = constants[code[ip]]
+                assert isinstance(nested, Code)
+                ip += 1
+                captured = []
+                for _ in range(nested.upvalues):
+                    if code[ip]:
+                        captured.append(
+                            _capture(open_upvalues, stack, base + code[ip + 1])
+                        )
+                    else:
+                        captured.append(upvalues[code[ip + 1]])
+                    ip += 2
+                stack.append(Closure(nested, captured))
+            elif op == _CLOSE_UPVALUE:
+                index = len(stack) - 1
+                while open_upvalues and open_upvalues[-1].index >= index:
+                    open_upvalues.pop().close()
+                stack.pop()
+            else:
+                # This is an internal error.
+                raise RuntimeError(f"unexpected opcode: {op}")
+
+
+def _capture(open_upvalues: list[Upvalue], stack: list[object], index: int) -> Upvalue:
+    """Return the upvalue of the local stack[index], shared by every closure."""
+    i = len(open_upvalues)
+    while i and open_upvalues[i - 1].index > index:
+        i -= 1
+    if i and open_upvalues[i - 1].index == index:
+        return open_upvalues[i - 1]
+    upvalue = Upvalue(stack, index)
+    open_upvalues.insert(i, upvalue)
+    return upvalue
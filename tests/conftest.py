@@ -0,0 +1,118 @@
+import pytest
+
+from plox.ast import Expr, compile_expr
+from plox.ast import evaluate as tree_evaluate
+from plox.environment import Environment
+
+
+def _evaluate_compiled(expr: Expr, env: Environment) -> object:
+    return compile_expr(expr)(env)
+
+
+@pytest.fixture(
+    name="evaluate", params=[tree_evaluate, _evaluate_compiled], ids=["tree", "closure"]
+)
+def evaluate_(request):
+    """evaluate, as each engine does it."""
+    return request.param
+
+
+# Lox programs that every engine must run with the same output and errors as the tree
+# walker, by name.
+_PROGRAMS = {
+    "arithmetic": """
+        print 1 + 2 * 3 - 4 / 8;
+        print -(1 / 0);
+        print 0 / 0 == 0 / 0;
+        print "a" + "b";
+        print !nil and true or "x";
+        print 1 < 2 == 2 <= 2;
+    """,
+    "control_flow": """
+        var total = 0;
+        for (var i = 0; i < 10; i = i + 1) {
+            if (i > 4) total = total + i; else { var j = i; total = total - j; }
+        }
+        while (total > 20) total = total - 7;
+        print total;
+    """,
+    "closures": """
+        fun counter() {
+            var count = 0;
+            fun increment() {
+                count = count + 1;
+                return count;
+            }
+            return increment;
+        }
+        var a = counter();
+        var b = counter();
+        a();
+        print a();
+        print b();
+        print a;
+        print clock;
+    """,
+    "scopes": """
+        var a = "global";
+        {
+            fun show() { print a; }
+            show();
+            var a = "block";
+            show();
+            print a;
+        }
+    """,
+    "recursion": """
+        fun fib(n) {
+            if (n < 2) return n;
+            return fib(n - 2) + fib(n - 1);
+        }
+        print fib(15);
+    """,
+    "return_from_loop": """
+        fun find(n) {
+            var i = 0;
+            while (true) {
+                for (var j = 0; j < 3; j = j + 1) {
+                    var k = i * 3 + j;
+                    if (k == n) { return k; }
+                }
+                i = i + 1;
+            }
+        }
+        fun early() { { return; } print "unreachable"; }
+        print find(7);
+        print early();
+    """,
+    "changing_callee": """
+        fun one(a) { return a; }
+        fun two(a, b) { return a + b; }
+        fun call(f) {
+            return f(1) + 1;
+        }
+        print call(one);
+        print call(one);
+        print call(two);
+    """,
+    "add_error": 'print 1;\nprint 1 + "a";\nprint 2;',
+    "negate_error": "print -nil;",
+    "compare_error": 'print 1 < "2";',
+    "undefined_error": "print a;",
+    "assign_error": "a = 1;",
+    "call_error": "nil();",
+    "arity_error": "fun f(a) {}\nf(1, 2);",
+    "error_in_function": "fun f() {\n  return -f;\n}\nprint f();",
+}
+
+
+@pytest.fixture(name="program", params=_PROGRAMS.values(), ids=list(_PROGRAMS))
+def program_(request):
+    """Each Lox program that engines must run alike."""
+    return request.param
+
+
+@pytest.fixture
+def programs():
+    """The Lox programs that engines must run alike, by name."""
+    return _PROGRAMS
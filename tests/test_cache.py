@@ -0,0 +1,173 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from plox import cache, cli
+from plox.lox import Lox
+
+_SRC = "var a = 1;\nfun f(x) { return x + a; }\nprint f(2);\n"
+
+
+def _fail(*_):
+    raise AssertionError("script was parsed")
+
+
+def test_run_file_caches_statements(tmp_path, capsys, monkeypatch):
+    path = tmp_path / "test.lox"
+    path.write_text(_SRC)
+
+    Lox().run_file(path)
+    assert (tmp_path / "__loxcache__" / "test.loxc").exists()
+
+    monkeypatch.setattr(Lox, "_parse", _fail)
+    Lox().run_file(path)
+
+    out, _ = capsys.readouterr()
+    assert out == "3\n3\n"
+
+
+def test_changed_source_is_parsed(tmp_path, capsys):
+    path = tmp_path / "test.lox"
+    path.write_text(_SRC)
+    Lox().run_file(path)
+
+    path.write_text(_SRC.replace("x + a", "x * 3"))
+    Lox().run_file(path)
+
+    out, _ = capsys.readouterr()
+    assert out == "3\n6\n"
+
+
+def test_corrupt_cache_is_ignored(tmp_path, capsys):
+    path = tmp_path / "test.lox"
+    path.write_text(_SRC)
+    Lox().run_file(path)
+    cache_path = cache.cache_path(path)
+
+    # A truncated pickle, after a valid header.
+    cache_path.write_bytes(cache_path.read_bytes()[:-10])
+    Lox().run_file(path)
+    cache_path.write_bytes(b"not a cache file")
+    Lox().run_file(path)
+
+    out, _ = capsys.readouterr()
+    assert out == "3\n3\n3\n"
+
+
+def test_other_format_is_ignored(tmp_path, monkeypatch):
+    path = tmp_path / "test.lox"
+    path.write_text(_SRC)
+    Lox().run_file(path)
+
+    monkeypatch.setattr(cache, "FORMAT_VERSION", cache.FORMAT_VERSION + 1)
+
+    assert cache.load(path, _SRC) is None
+
+
+def test_cache_has_mode_of_script(tmp_path):
+    path = tmp_path / "test.lox"
+    path.write_text(_SRC)
+    path.chmod(0o644)
+
+    Lox().run_file(path)
+
+    assert cache.cache_path(path).stat().st_mode & 0o777 == 0o644
+
+
+def test_parse_error_is_not_cached(tmp_path):
+    path = tmp_path / "test.lox"
+    path.write_text("print ;")
+
+    with pytest.raises(SystemExit):
+        Lox().run_file(path)
+
+    assert not cache.cache_path(path).exists()
+
+
+def test_caching_disabled(tmp_path, capsys):
+    path = tmp_path / "test.lox"
+    path.write_text(_SRC)
+
+    Lox(caching=False).run_file(path)
+
+    assert not (tmp_path / "__loxcache__").exists()
+    out, _ = capsys.readouterr()
+    assert out == "3\n"
+
+
+def test_concurrent_writers(tmp_path):
+    path = tmp_path / "test.lox"
+    path.write_text(_SRC)
+    statements = Lox()._parse(_SRC)  # pylint: disable=protected-access
+
+    with ThreadPoolExecutor(8) as executor:
+        for _ in range(32):
+            executor.submit(cache.dump, path, _SRC, statements)
+
+    assert cache.load(path, _SRC) == statements
+    assert [p.name for p in (tmp_path / "__loxcache__").iterdir()] == ["test.loxc"]
+
+
+def test_compile(tmp_path, capsys, monkeypatch):
+    paths = [tmp_path / "a.lox", tmp_path / "b.lox"]
+    for path in paths:
+        path.write_text(_SRC)
+
+    monkeypatch.setattr(sys, "argv", ["plox", "--compile", *map(str, paths)])
+    cli.main()
+
+    out, _ = capsys.readouterr()
+    assert out == ""
+    assert all(cache.load(path, _SRC) is not None for path in paths)
+
+
+def test_compile_caches_what_running_does(tmp_path, capsys):
+    path = tmp_path / "test.lox"
+    path.write_text(_SRC)
+    cache_path = cache.cache_path(path)
+
+    Lox().compile_file(path)
+    compiled = cache_path.read_bytes()
+    cache_path.unlink()
+    Lox().run_file(path)
+
+    assert cache_path.read_bytes() == compiled
+    out, _ = capsys.readouterr()
+    assert out == "3\n"
+
+
+def test_compile_reports_resolver_errors(tmp_path, capsys):
+    path = tmp_path / "test.lox"
+    path.write_text("return 1;")
+
+    with pytest.raises(SystemExit) as e:
+        Lox().compile_file(path)
+
+    assert e.value.code == 65
+    _, err = capsys.readouterr()
+    assert err == "[line 1] Error at 'return': Can't return from top-level code.\n"
+
+
+def test_run_script_named_compile(tmp_path, capsys, monkeypatch):
+    (tmp_path / "compile").write_text(_SRC)
+    monkeypatch.chdir(tmp_path)
+
+    monkeypatch.setattr(sys, "argv", ["plox", "compile"])
+    cli.main()
+
+    out, _ = capsys.readouterr()
+    assert out == "3\n"
+
+
+def test_lazy_statements_cached_separately(tmp_path, capsys, monkeypatch):
+    path = tmp_path / "test.lox"
+    path.write_text(_SRC)
+    Lox().run_file(path)
+    Lox(lazy=True).run_file(path)
+
+    monkeypatch.setattr(Lox, "_parse", _fail)
+    Lox(lazy=True).run_file(path)
+
+    out, _ = capsys.readouterr()
+    assert out == "3\n3\n3\n"
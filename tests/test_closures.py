@@ -0,0 +1,15 @@
+from plox.interpreter import ClosureInterpreter, Interpreter
+from plox.parser import Parser
+from plox.scanner import RegexScanner
+
+
+def test_unresolved_same_as_tree_walker(capsys, programs):
+    source = programs["closures"] + programs["scopes"] + programs["control_flow"]
+    outputs = []
+    for engine in (Interpreter, ClosureInterpreter):
+        statements = Parser(RegexScanner(source).scan_tokens()).parse()
+        engine().interpret(statements)
+        outputs.append(capsys.readouterr())
+
+    assert outputs[0] == outputs[1]
+    assert outputs[0].out.split()[-3:] == ["block", "block", "18"]
@@ -0,0 +1,37 @@
+import pytest
+
+from plox.errors import ExecutionError
+from plox.interpreter import (
+    ClosureInterpreter,
+    Interpreter,
+    StackInterpreter,
+    TranspilingInterpreter,
+    VMInterpreter,
+)
+from plox.lox import Lox
+
+# The options of Lox for each way of running programs, other than walking the tree.
+_ENGINES = {
+    "closure": {"engine": ClosureInterpreter},
+    "stack": {"engine": StackInterpreter},
+    "python": {"engine": TranspilingInterpreter},
+    "vm": {"engine": VMInterpreter},
+    "tree_memoized": {"engine": Interpreter, "memoize": 100},
+    "closure_memoized": {"engine": ClosureInterpreter, "memoize": 100},
+    "stack_memoized": {"engine": StackInterpreter, "memoize": 100},
+}
+
+
+@pytest.mark.parametrize("options", _ENGINES.values(), ids=_ENGINES)
+@pytest.mark.parametrize("lazy", [False, True])
+def test_same_as_tree_walker(capsys, program, options, lazy):
+    outputs = []
+    for lox in (Lox(lazy=lazy), Lox(lazy=lazy, **options)):
+        try:
+            lox.run(program)
+        except ExecutionError:
+            pass
+        outputs.append(capsys.readouterr())
+
+    assert outputs[0] == outputs[1]
+    assert outputs[0].out or outputs[0].err
@@ -69,3 +69,31 @@ def test_define_with_enclosing(foo):
 
     assert enclosing[foo] == "foo"
     assert env[foo] == "foobar"
+
+
+def test_get_and_set_at():
+    globals_ = Environment()
+    enclosing = Environment(globals_, [1.0, 2.0])
+    env = Environment(enclosing, [3.0])
+
+    assert env.get_at(0, 0) == 3.0
+    assert env.get_at(1, 1) == 2.0
+
+    env.set_at(1, 0, "foo")
+    assert enclosing.slots == ["foo", 2.0]
+    assert env.globals is globals_
+
+
+def test_version_changes(foo):
+    env = Environment.from_globals({"bar": 1.0})
+    other = Environment()
+    versions = {env.version, other.version}
+
+    env.define(foo, "foo")
+    versions.add(env.version)
+    env[foo] = "foobar"
+    versions.add(env.version)
+    Environment(enclosing=env)[foo] = "baz"
+    versions.add(env.version)
+
+    assert len(versions) == 5
@@ -1,13 +1,16 @@
 import pytest
 
-from plox.ast import Assign, Binary, Grouping, Literal, Unary, evaluate
-from plox.environment import Environment
+from plox.ast import Assign, Binary, Call, Grouping, Literal, Unary, Variable
+from plox.ast import evaluate as tree_evaluate
+from plox.builtins import Clock
+from plox.callables import LoxCallable
+from plox.environment import GLOBAL, Environment
 from plox.errors import ExecutionError
 from plox.tokens import Token, TokenType
 
 
 # fmt: off
-def test_evaluate():
+def test_evaluate(evaluate):
     # Test case from
     #  https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/expressions/evaluate.lox
     minus = Token(TokenType.MINUS, "-", None, 1)
@@ -31,7 +34,7 @@ def test_evaluate():
 # fmt: on
 
 
-def test_assignment():
+def test_assignment(evaluate):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/assignment/grouping.lox
     id_a = Token(TokenType.IDENTIFIER, "a", None, 1)
     literal_a = Literal("a")
@@ -45,7 +48,7 @@ def test_assignment():
     assert evaluate(expr, env) == literal_a.value
 
 
-def test_assignment_undefined_variable():
+def test_assignment_undefined_variable(evaluate):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/assignment/undefined.lox
     id_a = Token(TokenType.IDENTIFIER, "a", None, 1)
     literal_a = Literal("a")
@@ -59,7 +62,7 @@ def test_assignment_undefined_variable():
 
 
 @pytest.mark.parametrize("value", [False, None])
-def test_unary_bang_falsey_literals(value):
+def test_unary_bang_falsey_literals(value, evaluate):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/operator/not.lox
     bang = Token(TokenType.BANG, "1", None, 1)
     literal = Literal(value)
@@ -71,7 +74,7 @@ def test_unary_bang_falsey_literals(value):
 
 
 @pytest.mark.parametrize("value", [True, 0, 123, ""])
-def test_unary_bang_truthy_literals(value):
+def test_unary_bang_truthy_literals(value, evaluate):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/operator/not.lox
     bang = Token(TokenType.BANG, "1", None, 1)
     literal = Literal(value)
@@ -82,7 +85,7 @@ def test_unary_bang_truthy_literals(value):
     assert evaluate(expr, env) is False
 
 
-def test_unary_double_bang():
+def test_unary_double_bang(evaluate):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/operator/not.lox
     bang = Token(TokenType.BANG, "1", None, 1)
     true = Literal(True)
@@ -94,7 +97,7 @@ def test_unary_double_bang():
     assert evaluate(expr, env) is True
 
 
-def test_unary_neg_string_error():
+def test_unary_neg_string_error(evaluate):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/operator/negate_nonnum.lox
     neg = Token(TokenType.MINUS, "-", None, 1)
     literal_a = Literal("a")
@@ -107,3 +110,100 @@ def test_unary_neg_string_error():
         ExecutionError, match="Unsupported operand for '-', must be 'number'"
     ):
         evaluate(expr, env)
+
+
+def test_binary_operand_types_change(evaluate):
+    id_a = Token(TokenType.IDENTIFIER, "a", None, 1)
+    plus = Token(TokenType.PLUS, "+", None, 1)
+    less = Token(TokenType.LESS, "<", None, 1)
+    env = Environment()
+    env.define(id_a, 1.0)
+
+    # a + a, with a's type changing between evaluations of the same nodes.
+    add = Binary(Variable(id_a), plus, Variable(id_a))
+    compare = Binary(Variable(id_a), less, Literal(2.0))
+
+    assert evaluate(add, env) == 2.0
+    assert evaluate(compare, env) is True
+    env[id_a] = "a"
+    assert evaluate(add, env) == "aa"
+    with pytest.raises(ExecutionError, match="Unsupported operands for '<'"):
+        evaluate(compare, env)
+    env[id_a] = True
+    with pytest.raises(ExecutionError, match="Unsupported operands for '\\+'"):
+        evaluate(add, env)
+    env[id_a] = 3.0
+    assert evaluate(add, env) == 6.0
+    assert evaluate(compare, env) is False
+
+
+def test_unary_operand_type_changes(evaluate):
+    id_a = Token(TokenType.IDENTIFIER, "a", None, 1)
+    minus = Token(TokenType.MINUS, "-", None, 1)
+    env = Environment()
+    env.define(id_a, 1.0)
+    expr = Unary(minus, Variable(id_a))
+
+    assert evaluate(expr, env) == -1.0
+    env[id_a] = "a"
+    with pytest.raises(ExecutionError, match="Unsupported operand for '-'"):
+        evaluate(expr, env)
+    env[id_a] = -2.0
+    assert evaluate(expr, env) == 2.0
+
+
+class _Identity(LoxCallable):
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def call(self, arguments: list[object]) -> object:
+        return arguments[0]
+
+
+def test_callable_must_define_call():
+    class Uncallable(LoxCallable):  # pylint: disable=abstract-method
+        pass
+
+    with pytest.raises(TypeError):
+        # pylint: disable-next=abstract-class-instantiated
+        Uncallable(0)  # type: ignore[abstract]
+
+
+def test_callee_changes(evaluate):
+    id_f = Token(TokenType.IDENTIFIER, "f", None, 1)
+    paren = Token(TokenType.RIGHT_PAREN, ")", None, 1)
+    env = Environment()
+    env.define(id_f, _Identity())
+    expr = Call(Variable(id_f), paren, [Literal(1.0)])
+
+    assert [evaluate(expr, env) for _ in range(2)] == [1.0] * 2
+    env[id_f] = _Identity()
+    assert evaluate(expr, env) == 1.0
+    env[id_f] = Clock()
+    with pytest.raises(ExecutionError, match="Expected 0 arguments but got 1."):
+        evaluate(expr, env)
+    env[id_f] = None
+    with pytest.raises(ExecutionError, match="Can only call functions"):
+        evaluate(expr, env)
+
+
+def test_global_cache():
+    id_a = Token(TokenType.IDENTIFIER, "a", None, 1)
+    globals_ = Environment.from_globals({"a": 1.0})
+    env = Environment(globals_, [])
+    expr = Variable(id_a)
+    expr.depth = GLOBAL
+
+    assert [tree_evaluate(expr, env) for _ in range(3)] == [1.0] * 3
+    assert (globals_.hits, globals_.misses) == (2, 1)
+
+    # Assigning, or defining, any global invalidates the cache.
+    tree_evaluate(Assign(id_a, Literal(2.0)), globals_)
+    assert tree_evaluate(expr, env) == 2.0
+    globals_.define(Token(TokenType.IDENTIFIER, "b", None, 1), None)
+    assert tree_evaluate(expr, env) == 2.0
+    assert (globals_.hits, globals_.misses) == (2, 3)
+
+    # The cache is of the globals it was read from.
+    other = Environment.from_globals({"a": "other"})
+    assert tree_evaluate(expr, other) == "other"
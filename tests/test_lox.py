@@ -0,0 +1,124 @@
+from collections.abc import Iterator
+
+import pytest
+
+from plox.errors import ParserError
+from plox.lox import Lox
+
+
+def test_run_file(tmp_path, capsys):
+    path = tmp_path / "test.lox"
+    path.write_text('var a = "☃";\nprint a + "!";\n', encoding="utf-8")
+
+    Lox().run_file(path)
+
+    out, _ = capsys.readouterr()
+    assert out == "☃!\n"
+
+
+def test_run_file_scanner_error(tmp_path, capsys):
+    path = tmp_path / "test.lox"
+    path.write_text('print "ok";\n\n£', encoding="utf-8")
+
+    with pytest.raises(SystemExit) as e:
+        Lox().run_file(path)
+
+    assert e.value.code == 65
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == "[line 3] Error: Unexpected character: £.\n"
+
+
+def test_run_parse_error_runs_nothing(capsys):
+    with pytest.raises(ParserError):
+        Lox().run("print 1;\nprint ;\nprint 2;")
+
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == "[line 2] Error at ';': Expect expression.\n"
+
+
+def test_run_streaming_parse_error(capsys):
+    with pytest.raises(ParserError):
+        Lox(streaming=True).run("print 1;\nprint ;\nprint 2;\nprint -;")
+
+    out, err = capsys.readouterr()
+    assert out == "1\n"
+    assert err.splitlines() == [
+        "[line 2] Error at ';': Expect expression.",
+        "[line 4] Error at ';': Expect expression.",
+    ]
+
+
+@pytest.mark.parametrize(
+    "source, code, error",
+    [
+        (
+            'print 1 + "a";',
+            70,
+            "[line 2] Error: Unsupported operands for '+', must both be 'string' or"
+            " 'number'.",
+        ),
+        (
+            "return 1;",
+            65,
+            "[line 2] Error at 'return': Can't return from top-level code.",
+        ),
+    ],
+    ids=["runtime", "resolver"],
+)
+def test_run_file_streaming_error(tmp_path, capsys, source, code, error):
+    path = tmp_path / "test.lox"
+    path.write_text(f"print 1;\n{source}\nprint 2;\n", encoding="utf-8")
+
+    with pytest.raises(SystemExit) as e:
+        Lox(streaming=True).run_file(path)
+
+    assert e.value.code == code
+    out, err = capsys.readouterr()
+    assert out == "1\n"
+    assert err == f"{error}\n"
+
+
+def test_run_lines_streaming_runs_each_line_as_it_arrives(capsys):
+    def lines() -> Iterator[str]:
+        yield "var a = 1;\n"
+        yield "print a;\n"
+        # The previous line has run before the next is read.
+        out, _ = capsys.readouterr()
+        assert out == "1\n"
+        yield 'print "multi\n'
+        yield 'line";\n'
+
+    Lox(streaming=True).run_lines(lines())
+
+    out, _ = capsys.readouterr()
+    assert out == "multi\nline\n"
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_run_lines_unterminated_string(capsys, streaming):
+    with pytest.raises(SystemExit) as e:
+        Lox(streaming=streaming).run_lines(["print 1;\n", '"a\n', "b\n"])
+
+    assert e.value.code == 65
+    _, err = capsys.readouterr()
+    assert err == "[line 4] Error: Unterminated string.\n"
+
+
+def test_run_lazy_only_parses_called_functions(tmp_path, capsys):
+    path = tmp_path / "test.lox"
+    path.write_text(
+        "fun ok() { fun inner() { return 1; } return inner(); }\n"
+        "fun broken() { print ; }\n"
+        "print ok();\n"
+        "broken();\n"
+    )
+
+    with pytest.raises(SystemExit) as e:
+        Lox(lazy=True).run_file(path)
+
+    assert e.value.code == 65
+    out, err = capsys.readouterr()
+    assert out == "1\n"
+    assert err == "[line 2] Error at ';': Expect expression.\n"
@@ -0,0 +1,185 @@
+from collections.abc import Callable
+
+import pytest
+
+from plox.interpreter import ClosureInterpreter, Interpreter, StackInterpreter
+from plox.lox import Lox
+from plox.memo import MISSING, Memo, key
+
+_ENGINES = pytest.mark.parametrize(
+    "engine",
+    [Interpreter, ClosureInterpreter, StackInterpreter],
+    ids=["tree", "closure", "stack"],
+)
+
+
+def _stats() -> tuple[int, int, int]:
+    return Memo.hits, Memo.misses, Memo.evictions
+
+
+def _run(
+    engine: Callable[[], Interpreter], source: str, memoize: int = 100
+) -> tuple[int, ...]:
+    """Run source, returning the change in the memo statistics."""
+    before = _stats()
+    Lox(engine=engine, memoize=memoize).run(source)
+    return tuple(after - b for after, b in zip(_stats(), before))
+
+
+@_ENGINES
+def test_pure_recursion(capsys, engine):
+    stats = _run(
+        engine,
+        """
+        fun fib(n) {
+            if (n < 2) return n;
+            return fib(n - 2) + fib(n - 1);
+        }
+        print fib(90);
+        """,
+    )
+
+    out, _ = capsys.readouterr()
+    assert out == "2.880067194370816e+18\n"
+    assert stats == (88, 91, 0)
+
+
+@_ENGINES
+def test_pure_functions_calling_pure_functions(capsys, engine):
+    stats = _run(
+        engine,
+        """
+        var two = 2;
+        fun double(n) { return n * two; }
+        fun quadruple(n) {
+            var d = double(n);
+            return (double)(d) + 0;
+        }
+        {
+            var limit = 3;
+            fun below(n) {
+                var i = 0;
+                while (i < limit) i = i + 1;
+                return n < i;
+            }
+            print below(2) and below(2);
+        }
+        print quadruple(1) + quadruple(1);
+        """,
+    )
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["true", "8"]
+    # below(2) and quadruple(1) once each, and double(1) and double(2) inside it.
+    assert stats == (2, 4, 0)
+
+
+@_ENGINES
+@pytest.mark.parametrize(
+    "declaration",
+    [
+        'fun f(n) { print "called"; return n; }',
+        "var calls = 0;\nfun f(n) { calls = calls + 1; return n; }",
+        "fun f(n) { fun g() { return n; } return g(); }",
+        "fun f(n) { return clock() * 0 + n; }",
+        "fun g(n) { print n; }\nfun f(n) { g(n); return n; }",
+        "fun id(x) { return x; }\nfun f(n) { return (nil or id)(n); }",
+        "fun id(x) { return x; }\nfun f(n, h) { return h(n); }",
+    ],
+    ids=["print", "assign", "declare", "native", "callee", "call", "parameter"],
+)
+def test_impure_functions_not_memoized(engine, declaration):
+    arguments = "1, id" if "h)" in declaration else "1"
+    stats = _run(
+        engine,
+        f"{declaration}\nf({arguments});\nf({arguments});",
+    )
+
+    assert stats == (0, 0, 0)
+
+
+@_ENGINES
+def test_values_that_python_considers_equal(capsys, engine):
+    _run(
+        engine,
+        """
+        fun id(x) { return x; }
+        print id(1);
+        print id(true);
+        print id(0);
+        print id(-0);
+        """,
+    )
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["1", "true", "0", "-0"]
+
+
+@_ENGINES
+def test_least_recently_used_evicted(engine):
+    stats = _run(
+        engine,
+        """
+        fun id(x) { return x; }
+        id(1);
+        id(2);
+        id(1);
+        id(3);
+        id(1);
+        id(2);
+        """,
+        memoize=2,
+    )
+
+    # id(3) evicts id(2), and id(2) evicts id(3).
+    assert stats == (2, 4, 2)
+
+
+@_ENGINES
+def test_memo_cleared_when_callee_changes(capsys, engine):
+    Lox(engine=engine, memoize=100, streaming=True).run("""
+        fun g(n) { return n; }
+        fun f(n) { return g(n) + 1; }
+        print f(1);
+        fun g(n) { return n * 10; }
+        print f(1);
+        fun g(n) { print "impure"; return n; }
+        print f(1);
+        print f(1);
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["2", "11", "impure", "2", "impure", "2"]
+
+
+def test_lazy_bodies(capsys):
+    before = _stats()
+    Lox(lazy=True, memoize=100).run("""
+        fun f(n) { return g(n) + 0; }
+        fun g(n) { return n; }
+        f(1);
+        f(1);
+        f(1);
+        """)
+    stats = tuple(after - b for after, b in zip(_stats(), before))
+    Lox(lazy=True, memoize=100).run("fun f(n) { print n; }\nf(1);\nf(1);")
+
+    # The first call of f parses the bodies, so only the second can find f and g pure.
+    assert stats == (1, 2, 0)
+    out, _ = capsys.readouterr()
+    assert out.split() == ["1", "1"]
+
+
+def test_memo():
+    memo = Memo(2)
+    memo.put(key([1.0]), "a")
+    memo.put(key([True]), "b")
+
+    assert memo.get(key([1.0])) == "a"
+    assert memo.get(key([True])) == "b"
+    assert memo.get(key([-0.0])) is MISSING
+    memo.put(key([0.0]), "c")
+    assert len(memo) == 2
+    assert memo.get(key([1.0])) is MISSING
+    memo.clear()
+    assert len(memo) == 0
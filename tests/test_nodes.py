@@ -0,0 +1,39 @@
+import pickle
+
+import pytest
+
+from plox.ast import Binary, Block, Grouping, Literal, Variable
+from plox.tokens import Token, TokenType
+
+_PLUS = Token(TokenType.PLUS, "+", None, 1)
+
+
+def test_equality_by_class_and_fields():
+    node = Binary(Literal(1.0), _PLUS, Literal(2.0))
+
+    assert node == Binary(Literal(1.0), _PLUS, Literal(2.0))
+    assert node != Binary(Literal(1.0), _PLUS, Literal(3.0))
+    assert Grouping(Literal(1.0)) != Block([Literal(1.0)])  # type: ignore[list-item]
+    assert Literal(1.0) != 1.0
+
+
+def test_hash():
+    assert hash(Literal(1.0)) == hash(Literal(1.0))
+    with pytest.raises(TypeError):
+        hash(Block([]))
+
+
+def test_repr():
+    assert repr(Variable(_PLUS)) == f"Variable(name={_PLUS!r})"
+    assert repr(Block([])) == "Block(statements=[])"
+
+
+def test_slotted():
+    with pytest.raises(AttributeError):
+        setattr(Literal(1.0), "other", 2.0)
+
+
+def test_pickle():
+    node = Binary(Literal(1.0), _PLUS, Variable(_PLUS))
+
+    assert pickle.loads(pickle.dumps(node)) == node
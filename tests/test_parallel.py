@@ -0,0 +1,83 @@
+from textwrap import dedent
+
+import pytest
+
+from plox import parallel
+from plox.errors import ParserError, ScannerError
+from plox.lox import Lox
+from plox.parser import Parser
+from plox.scanner import RegexScanner
+
+_SRC = dedent("""\
+    var a = 1;
+    fun f(x) {
+      var y = x;
+      return y;
+    }
+    { var b = 2; fun g() {} }
+    var s = "not { a fun";
+    // not a var {
+    for (var i = 0; i < 1; i = i + 1) print i;
+    fun h() { var z; }
+    var t = "multi
+    line";
+    print f(a);
+    """)
+
+
+def test_split_at_top_level_declarations():
+    chunks = parallel.split(_SRC, 100)
+
+    assert [_SRC[start:].split(maxsplit=2)[:2] for start, _ in chunks] == [
+        ["var", "a"],
+        ["fun", "f(x)"],
+        ["var", "s"],
+        ["fun", "h()"],
+        ["var", "t"],
+    ]
+    assert [lno for _, lno in chunks] == [1, 2, 7, 10, 11]
+
+
+@pytest.mark.parametrize("encode", [str, str.encode])
+def test_parse_matches_parser(encode):
+    expected = Parser(RegexScanner(_SRC).scan_tokens()).parse()
+
+    assert parallel.parse(encode(_SRC), 2) == expected
+
+
+@pytest.mark.parametrize(
+    "src,exc,err",
+    [
+        (
+            _SRC + "print ;\n" + _SRC + "var ;\n",
+            ParserError,
+            [
+                "[line 14] Error at ';': Expect expression.",
+                "[line 28] Error at ';': Expect a variable name.",
+            ],
+        ),
+        (
+            _SRC + "var u = @;\n" + _SRC,
+            ScannerError,
+            ["[line 14] Error: Unexpected character: @."],
+        ),
+    ],
+)
+def test_parse_errors_match_parser(capsys, src, exc, err):
+    with pytest.raises(exc):
+        parallel.parse(src, 2)
+
+    _, err_out = capsys.readouterr()
+    assert err_out.splitlines() == err
+
+
+def test_run_file_line_numbers(tmp_path, capsys):
+    path = tmp_path / "test.lox"
+    path.write_text(_SRC + "print -s;\n")
+
+    with pytest.raises(SystemExit):
+        Lox(workers=2).run_file(path)
+
+    out, err = capsys.readouterr()
+    assert out == "0\n1\n"
+    assert err == "[line 14] Error: Unsupported operand for '-', must be 'number'.\n"
@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+
 import pytest
 
 from plox.ast.expressions import (
@@ -6,6 +8,7 @@ from plox.ast.expressions import (
     Call,
     Grouping,
     Literal,
+    Logical,
     Unary,
     Variable,
 )
@@ -1210,3 +1213,84 @@ def test_return_without_value_is_none():
 
     assert len(statements) == 1
     assert statements[0] == Return(ret, Literal(None))
+
+
+def test_declarations_yields_before_consuming_next_token():
+    print_ = Token(TokenType.PRINT, "print", None, 1)
+    one = Token(TokenType.NUMBER, "1", 1.0, 1)
+    semicolon = Token(TokenType.SEMICOLON, ";", None, 1)
+    end = Token(TokenType.EOF, "", None, 1)
+    consumed = []
+
+    def tokens() -> Iterator[Token]:
+        for token in [print_, one, semicolon, print_, one, semicolon, end]:
+            consumed.append(token)
+            yield token
+
+    declarations = Parser(tokens()).declarations()
+
+    assert next(declarations) == Print(Literal(1.0))
+    assert len(consumed) == 3
+    assert next(declarations) == Print(Literal(1.0))
+    assert len(consumed) == 6
+
+
+def test_parse_precedence_or_and_unary_call():
+    or_ = Token(TokenType.OR, "or", None, 1)
+    and_ = Token(TokenType.AND, "and", None, 1)
+    bang = Token(TokenType.BANG, "!", None, 1)
+    lparen = Token(TokenType.LEFT_PAREN, "(", None, 1)
+    rparen = Token(TokenType.RIGHT_PAREN, ")", None, 1)
+    a = Token(TokenType.IDENTIFIER, "a", None, 1)
+    b = Token(TokenType.IDENTIFIER, "b", None, 1)
+    c = Token(TokenType.IDENTIFIER, "c", None, 1)
+    semicolon = Token(TokenType.SEMICOLON, ";", None, 1)
+    end = Token(TokenType.EOF, "", None, 1)
+
+    # a or !b() and c;
+    tokens = [a, or_, bang, b, lparen, rparen, and_, c, semicolon, end]
+    statements = Parser(tokens).parse()
+
+    assert len(statements) == 1
+    assert statements[0] == Expression(
+        Logical(
+            Variable(a),
+            or_,
+            Logical(Unary(bang, Call(Variable(b), rparen, [])), and_, Variable(c)),
+        )
+    )
+
+
+@pytest.mark.parametrize("container", [list, iter])
+def test_lazy_function_body(capsys, container):
+    fun = Token(TokenType.FUN, "fun", None, 1)
+    f = Token(TokenType.IDENTIFIER, "f", None, 1)
+    lparen = Token(TokenType.LEFT_PAREN, "(", None, 1)
+    rparen = Token(TokenType.RIGHT_PAREN, ")", None, 1)
+    lbrace = Token(TokenType.LEFT_BRACE, "{", None, 1)
+    rbrace = Token(TokenType.RIGHT_BRACE, "}", None, 1)
+    print_ = Token(TokenType.PRINT, "print", None, 2)
+    semicolon = Token(TokenType.SEMICOLON, ";", None, 2)
+    end = Token(TokenType.EOF, "", None, 3)
+
+    # fun f() { { } print ; }
+    # f();
+    # fmt: off
+    tokens = [
+        fun, f, lparen, rparen, lbrace, lbrace, rbrace, print_, semicolon, rbrace,
+        f, lparen, rparen, semicolon,
+        end,
+    ]
+    # fmt: on
+    statements = Parser(container(tokens), lazy=True).parse()
+
+    assert len(statements) == 2
+    assert statements[1] == Expression(Call(Variable(f), rparen, []))
+    function = statements[0]
+    assert isinstance(function, Function)
+    assert capsys.readouterr().err == ""
+
+    with pytest.raises(ParserError, match="Expect expression."):
+        function.body.statements  # pylint: disable=pointless-statement
+
+    assert capsys.readouterr().err == "[line 2] Error at ';': Expect expression.\n"
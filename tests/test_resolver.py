@@ -0,0 +1,303 @@
+from typing import Any
+
+import pytest
+
+from plox.environment import GLOBAL, Environment
+from plox.errors import ResolverError
+from plox.interpreter import Interpreter
+from plox.lox import Lox
+from plox.parser import Parser
+from plox.resolver import resolve
+from plox.scanner import RegexScanner
+from plox.stack_parser import StackParser
+
+
+def _parse(source: str, parser: type[Parser] = Parser) -> list[Any]:
+    return parser(RegexScanner(source).scan_tokens()).parse()
+
+
+def test_depths_and_slots():
+    statements = _parse("""
+        var a = 1;
+        {
+            var b = 2;
+            fun f(c) {
+                var d = 3;
+                {
+                    print a + b + c + d;
+                }
+            }
+        }
+        """)
+    resolve(statements)
+
+    block = statements[1].statements[1].body.statements[1]
+    expr = block.statements[0].expression
+    variables = [expr.right, expr.left.right, expr.left.left.right, expr.left.left.left]
+    resolved = [(v.name.lexeme, v.depth, v.slot) for v in variables]
+
+    assert resolved == [("d", 0, 1), ("c", 0, 0), ("b", 1, 0), ("a", GLOBAL, 0)]
+    assert statements[1].size == 2
+    assert statements[1].statements[1].size == 2
+    assert block.size == 0
+
+
+def test_resolving_does_not_change_equality():
+    statements = _parse("{ var a = 1; print a; }")
+    unresolved = _parse("{ var a = 1; print a; }")
+
+    resolve(statements)
+
+    assert statements[0].statements[1].expression.depth == 0
+    assert statements == unresolved
+
+
+def test_closure_sees_declaration_in_scope_when_declared(capsys):
+    # Test case from
+    #  https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/closure/assign_to_shadowed_later.lox
+    Lox().run("""
+        var a = "global";
+        {
+            fun show() {
+                print a;
+            }
+            show();
+            var a = "block";
+            show();
+        }
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out == "global\nglobal\n"
+
+
+def test_closure_assigns_captured_variable(capsys):
+    Lox().run("""
+        fun counter() {
+            var i = 0;
+            fun count() {
+                i = i + 1;
+                return i;
+            }
+            return count;
+        }
+        var c = counter();
+        c();
+        print c();
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out == "2\n"
+
+
+@pytest.mark.parametrize(
+    "source,error",
+    [
+        (
+            "{ var a = 1; { var a = a; } }",
+            "[line 1] Error at 'a': Can't read local variable in its own initializer.",
+        ),
+        (
+            "{ var a = 1; var a = 2; }",
+            "[line 1] Error at 'a': Already a variable with this name in this scope.",
+        ),
+        (
+            "fun f(a, a) {}",
+            "[line 1] Error at 'a': Already a variable with this name in this scope.",
+        ),
+        (
+            "fun f(a) { var a = 1; }",
+            "[line 1] Error at 'a': Already a variable with this name in this scope.",
+        ),
+        (
+            "return 1;",
+            "[line 1] Error at 'return': Can't return from top-level code.",
+        ),
+    ],
+)
+def test_errors(capsys, source, error):
+    with pytest.raises(ResolverError):
+        Lox().run(source)
+
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == error + "\n"
+
+
+def test_globals_may_be_redeclared(capsys):
+    Lox().run("var a = 1; var a = a + 1; print a;")
+
+    out, _ = capsys.readouterr()
+    assert out == "2\n"
+
+
+def test_reports_every_error(capsys):
+    with pytest.raises(ResolverError):
+        Lox().run("print 1;\nreturn 1;\n{ var a = a; }")
+
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err.splitlines() == [
+        "[line 2] Error at 'return': Can't return from top-level code.",
+        "[line 3] Error at 'a': Can't read local variable in its own initializer.",
+    ]
+
+
+def test_streaming_stops_at_error(capsys):
+    with pytest.raises(ResolverError):
+        Lox(streaming=True).run("print 1;\nreturn 1;\nprint 2;")
+
+    out, err = capsys.readouterr()
+    assert out == "1\n"
+    assert err == "[line 2] Error at 'return': Can't return from top-level code.\n"
+
+
+def test_run_file_error_exits_65(tmp_path, capsys):
+    path = tmp_path / "test.lox"
+    path.write_text("return 1;\n", encoding="utf-8")
+
+    with pytest.raises(SystemExit) as e:
+        Lox().run_file(path)
+
+    assert e.value.code == 65
+    _, err = capsys.readouterr()
+    assert err == "[line 1] Error at 'return': Can't return from top-level code.\n"
+
+
+def test_lazy_body_resolved_when_called(capsys):
+    lox = Lox(lazy=True)
+    lox.run("""
+        var a = "global";
+        {
+            fun show() {
+                print a;
+            }
+            fun broken() {
+                var b = b;
+            }
+            var a = "block";
+            show();
+        }
+        """)
+
+    out, err = capsys.readouterr()
+    assert out == "global\n"
+    assert err == ""
+
+
+def test_lazy_body_error_raised_when_called(capsys):
+    with pytest.raises(ResolverError):
+        Lox(lazy=True).run("fun f() {\n  var b = b;\n}\nprint 1;\nf();")
+
+    out, err = capsys.readouterr()
+    assert out == "1\n"
+    assert err == (
+        "[line 2] Error at 'b': Can't read local variable in its own initializer.\n"
+    )
+
+
+def test_deeply_nested():
+    n = 100_000
+    source = "{ var a = 1; print " + "-" * n + "a; }"
+    statements = _parse(source, StackParser)
+
+    resolve(statements)
+
+    expr = statements[0].statements[1].expression
+    for _ in range(n):
+        expr = expr.right
+    assert (expr.depth, expr.slot) == (0, 0)
+
+
+def test_blocks_share_environments():
+    statements = _parse("""
+        fun f() {
+            var a = 1;
+            for (var i = 0; i < 3; i = i + 1) {
+                var a = i * 2;
+                print a;
+            }
+            { print a; }
+        }
+        { var b = 2; { var c = b; } }
+        """)
+    resolve(statements)
+
+    f, block = statements
+    loop, no_declarations = f.body.statements[1:]
+    assert f.size == 3
+    assert loop.size == 0
+    assert loop.statements[1].body.statements[0].size == 0
+    assert no_declarations.size == 0
+    assert block.size == 2
+    assert block.statements[1].size == 0
+
+
+def test_blocks_with_functions_have_environments():
+    statements = _parse("""
+        fun f() {
+            for (var i = 0; i < 3; i = i + 1) {
+                var j = i;
+                fun g() { print j; }
+            }
+        }
+        """)
+    resolve(statements)
+
+    loop = statements[0].body.statements[0]
+    assert statements[0].size == 0
+    assert loop.size == 1
+    assert loop.statements[1].body.statements[0].size == 2
+
+
+def test_shared_environments_run(capsys):
+    Lox().run("""
+        fun f() {
+            var a = "outer";
+            var first;
+            var second;
+            for (var i = 0; i < 2; i = i + 1) {
+                var a = i;
+                fun g() { print a; }
+                if (first == nil) first = g; else second = g;
+            }
+            for (var i = 0; i < 2; i = i + 1) {
+                var a = i + 10;
+                print a;
+            }
+            print a;
+            first();
+            second();
+        }
+        f();
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["10", "11", "outer", "0", "1"]
+
+
+def test_environments_that_cannot_be_captured_are_reused(capsys):
+    statements = _parse("""
+        fun add(a, b) { return a + b; }
+        fun adder(a) {
+            fun add_a(b) { return a + b; }
+            return add_a;
+        }
+        for (var i = 0; i < 3; i = i + 1) {
+            print add(i, adder(i)(1));
+        }
+        """)
+    resolve(statements)
+    add, adder, loop = statements
+    assert add.free == []
+    assert adder.free is None
+    assert loop.free == []
+
+    created, reused = Environment.created, Environment.reused
+    Interpreter().interpret(statements)
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["1", "3", "5"]
+    # The globals, the loop, each call to adder, and the first to add and to add_a.
+    assert Environment.created - created == 7
+    assert Environment.reused - reused == 4
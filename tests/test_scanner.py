@@ -1,19 +1,25 @@
+import sys
 from textwrap import dedent
 
 import pytest
 
 from plox.errors import ScannerError
-from plox.scanner import Scanner
+from plox.scanner import RegexScanner, Scanner, mapped_source, scan_lines
 from plox.tokens import Token, TokenType
 
 
-def test_identifiers():
+@pytest.fixture(name="scanner", params=[Scanner, RegexScanner])
+def scanner_(request):
+    return request.param
+
+
+def test_identifiers(scanner):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/scanning/identifiers.lox
     src = """
     andy formless fo _ _123 _abc ab123
     abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890_
     """
-    t = Scanner(dedent(src)).scan_tokens()
+    t = scanner(dedent(src)).scan_tokens()
 
     assert t == [
         Token(TokenType.IDENTIFIER, "andy", None, 2),
@@ -33,10 +39,10 @@ def test_identifiers():
     ]
 
 
-def test_keywords():
+def test_keywords(scanner):
     # https://github.com/munificent/craftinginterpreters/tree/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/scanning/keywords.lox
     src = "and class else false for fun if nil or return super this true var while"
-    t = Scanner(dedent(src)).scan_tokens()
+    t = scanner(dedent(src)).scan_tokens()
 
     assert t == [
         Token(TokenType.AND, "and", None, 1),
@@ -58,7 +64,27 @@ def test_keywords():
     ]
 
 
-def test_numbers():
+@pytest.mark.parametrize(
+    "scan",
+    [
+        lambda src: Scanner(src).scan_tokens(),
+        lambda src: list(RegexScanner(src).scan_tokens()),
+        lambda src: RegexScanner(src).scan_tokens()[:],
+        lambda src: list(RegexScanner(src.encode()).scan_tokens()),
+        lambda src: list(RegexScanner(src).iter_tokens()),
+        lambda src: list(scan_lines(src.splitlines(keepends=True))),
+    ],
+    ids=["scanner", "stream", "indexed", "encoded", "iter", "lines"],
+)
+def test_identifiers_interned(scan):
+    src = "var count =\n  count + counter;"
+    lexemes = [t.lexeme for t in scan(src) if t.kind == TokenType.IDENTIFIER]
+
+    assert lexemes == ["count", "count", "counter"]
+    assert lexemes[0] is lexemes[1] is sys.intern("count")
+
+
+def test_numbers(scanner):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/scanning/numbers.lox
     src = """
     123
@@ -66,7 +92,7 @@ def test_numbers():
     .456
     123.
     """
-    t = Scanner(dedent(src)).scan_tokens()
+    t = scanner(dedent(src)).scan_tokens()
 
     assert t == [
         Token(TokenType.NUMBER, "123", 123.0, 2),
@@ -79,10 +105,10 @@ def test_numbers():
     ]
 
 
-def test_punctuators():
+def test_punctuators(scanner):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/scanning/punctuators.lox
     src = "(){};,+-*!===<=>=!=<>/."
-    t = Scanner(dedent(src)).scan_tokens()
+    t = scanner(dedent(src)).scan_tokens()
 
     assert t == [
         Token(TokenType.LEFT_PAREN, "(", None, 1),
@@ -107,14 +133,14 @@ def test_punctuators():
     ]
 
 
-def test_strings():
+def test_strings(scanner):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/scanning/strings.lox
     src = """
     ""
     "string"
 
     """
-    t = Scanner(dedent(src)).scan_tokens()
+    t = scanner(dedent(src)).scan_tokens()
 
     assert t == [
         Token(TokenType.STRING, '""', "", 2),
@@ -123,18 +149,18 @@ def test_strings():
     ]
 
 
-def test_unterminated_string(capsys):
+def test_unterminated_string(scanner, capsys):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/string/unterminated.lox
     src = """"this string has no close quote"""
 
     with pytest.raises(ScannerError, match="Unterminated string"):
-        Scanner(dedent(src)).scan_tokens()
+        scanner(dedent(src)).scan_tokens()
 
     _, err = capsys.readouterr()
     assert "[line 1] Error: Unterminated string." in err
 
 
-def test_whitespace():
+def test_whitespace(scanner):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/scanning/whitespace.lox
     src = """
     space    tabs				newlines
@@ -144,7 +170,7 @@ def test_whitespace():
 
     end
     """
-    t = Scanner(dedent(src)).scan_tokens()
+    t = scanner(dedent(src)).scan_tokens()
 
     assert t == [
         Token(TokenType.IDENTIFIER, "space", None, 2),
@@ -155,13 +181,13 @@ def test_whitespace():
     ]
 
 
-def test_comments_ignored():
+def test_comments_ignored(scanner):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/comments/line_at_eof.lox
     src = """
     print "ok";
     // comment
     """
-    t = Scanner(dedent(src)).scan_tokens()
+    t = scanner(dedent(src)).scan_tokens()
 
     assert t == [
         Token(TokenType.PRINT, "print", None, 2),
@@ -171,23 +197,23 @@ def test_comments_ignored():
     ]
 
 
-def test_only_comment():
+def test_only_comment(scanner):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/comments/only_line_comment.lox
     src = "// comment"
-    t = Scanner(dedent(src)).scan_tokens()
+    t = scanner(dedent(src)).scan_tokens()
 
     assert t == [Token(TokenType.EOF, "", None, 1)]
 
 
-def test_only_comment_and_newline():
+def test_only_comment_and_newline(scanner):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/comments/only_line_comment_and_line.lox
     src = "// comment\n"
-    t = Scanner(dedent(src)).scan_tokens()
+    t = scanner(dedent(src)).scan_tokens()
 
     assert t == [Token(TokenType.EOF, "", None, 2)]
 
 
-def test_unicode_in_comments():
+def test_unicode_in_comments(scanner):
     # https://github.com/munificent/craftinginterpreters/blob/6c2ea6f7192910053a78832f0cc34ad56b17ce7c/test/comments/unicode.lox
     src = """
     // Unicode characters are allowed in comments.
@@ -198,6 +224,96 @@ def test_unicode_in_comments():
     // Other stuff: ឃᢆ᯽₪ℜ↩⊗┺░
     // Emoji: ☃☺♣
     """
-    t = Scanner(dedent(src)).scan_tokens()
+    t = scanner(dedent(src)).scan_tokens()
 
     assert t == [Token(TokenType.EOF, "", None, 9)]
+
+
+@pytest.mark.parametrize(
+    "src",
+    [
+        "",
+        "\n\n",
+        "a/b//c\n/",
+        'var s = "multi\nline\n";\nprint s;',
+        "fun f(a, b) {\n  return a >= b and !(a == 1.5);\n}\n   \t\r\n",
+        'print "£§¶"; // ☃☺♣',
+    ],
+)
+def test_regex_scanner_matches_scanner(src):
+    assert RegexScanner(src).scan_tokens() == Scanner(src).scan_tokens()
+
+
+@pytest.mark.parametrize(
+    "src,err",
+    [
+        ('a\n"unterminated\n\n', "[line 4] Error: Unterminated string."),
+        ("a\nb @ c\n", "[line 2] Error: Unexpected character: @."),
+        ("\n\né", "[line 3] Error: Unexpected character: é."),
+        ("a\t#b", "[line 1] Error: Unexpected character: #."),
+    ],
+)
+def test_regex_scanner_errors_match_scanner(capsys, src, err):
+    with pytest.raises(ScannerError) as expected:
+        Scanner(src).scan_tokens()
+    with pytest.raises(ScannerError) as actual:
+        RegexScanner(src).scan_tokens()
+
+    assert (actual.value.lno, actual.value.message) == (
+        expected.value.lno,
+        expected.value.message,
+    )
+    _, err_out = capsys.readouterr()
+    assert err_out.splitlines() == [err, err]
+
+
+@pytest.mark.parametrize(
+    "src",
+    [
+        "",
+        "a/b//c\n/",
+        'var s = "multi\nline\n";\nprint s;',
+        'print "£§¶"; // ☃☺♣',
+    ],
+)
+def test_regex_scanner_encoded_matches_scanner(src):
+    expected = Scanner(src).scan_tokens()
+
+    assert RegexScanner(src.encode()).scan_tokens() == expected
+    assert RegexScanner(memoryview(src.encode())).scan_tokens() == expected
+
+
+@pytest.mark.parametrize(
+    "src,err",
+    [
+        ('a\n"unterminated ☃\n\n', "[line 4] Error: Unterminated string."),
+        ("\n\né", "[line 3] Error: Unexpected character: é."),
+    ],
+)
+def test_regex_scanner_encoded_errors(capsys, src, err):
+    with pytest.raises(ScannerError):
+        RegexScanner(src.encode()).scan_tokens()
+
+    _, err_out = capsys.readouterr()
+    assert err_out.splitlines() == [err]
+
+
+@pytest.mark.parametrize("src", ["", 'print "☃";\n'])
+def test_mapped_source(tmp_path, src):
+    path = tmp_path / "test.lox"
+    path.write_text(src, encoding="utf-8")
+
+    with mapped_source(path) as source:
+        assert RegexScanner(source).scan_tokens() == Scanner(src).scan_tokens()
+
+
+def test_mapped_source_error(tmp_path):
+    path = tmp_path / "test.lox"
+    path.write_text("print 1;\nprint 2;\n", encoding="utf-8")
+
+    # The suspended iterator still holds the source when the error leaves the block.
+    with pytest.raises(ScannerError):
+        with mapped_source(path) as source:
+            tokens = RegexScanner(source).iter_tokens()
+            next(tokens)
+            raise ScannerError("Error.", 1)
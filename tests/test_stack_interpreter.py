@@ -0,0 +1,68 @@
+import pytest
+
+from plox.errors import ExecutionError
+from plox.interpreter import Interpreter, StackInterpreter
+from plox.lox import Lox
+from plox.stack_parser import StackParser
+
+# Deep enough that Interpreter cannot run it with the default recursion limit.
+_DEPTH = 10**4
+
+
+def test_deep_recursion(capsys):
+    source = f"""
+        fun count(n) {{
+            if (n == 0) return 0;
+            return count(n - 1) + 1;
+        }}
+        print count({_DEPTH});
+        """
+    with pytest.raises(RecursionError):
+        Lox(engine=Interpreter).run(source)
+
+    Lox(engine=StackInterpreter).run(source)
+
+    out, _ = capsys.readouterr()
+    assert out == f"{_DEPTH}\n"
+
+
+def test_deep_nesting(capsys):
+    source = "print " + "(-" * _DEPTH + "1" + ")" * _DEPTH + ";"
+    Lox(parser=StackParser, engine=StackInterpreter).run(source)
+
+    out, _ = capsys.readouterr()
+    assert out == "1\n"
+
+
+def test_stack_overflow(capsys):
+    lox = Lox(engine=lambda: StackInterpreter(max_depth=100), streaming=True)
+    source = """
+        fun count(n) {
+            if (n == 0) return 0;
+            return count(
+                n - 1) + 1;
+        }
+        print count(99);
+        """
+    lox.run(source)
+    with pytest.raises(ExecutionError):
+        lox.run("print count(100);")
+    # The depth is counted afresh for each statement.
+    lox.run("print count(99);")
+
+    out, err = capsys.readouterr()
+    assert out == "99\n99\n"
+    assert err == "[line 5] Error: Stack overflow.\n"
+
+
+def test_tail_calls_do_not_count(capsys):
+    Lox(engine=lambda: StackInterpreter(max_depth=2)).run("""
+        fun sum(n, total) {
+            if (n == 0) return total;
+            return sum(n - 1, total + n);
+        }
+        print sum(1000, 0);
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out == "500500\n"
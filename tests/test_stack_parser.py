@@ -0,0 +1,162 @@
+import sys
+from collections.abc import Callable
+
+import pytest
+
+from plox import cli
+from plox.ast import (
+    Block,
+    Call,
+    Expr,
+    Expression,
+    Grouping,
+    If,
+    Literal,
+    Stmt,
+    Unary,
+)
+from plox.errors import ParserError
+from plox.parser import Parser
+from plox.scanner import RegexScanner
+from plox.stack_parser import StackParser
+
+# Deep enough that Parser cannot parse it with the default recursion limit.
+_DEPTH = 10**5
+
+
+def _parse(parser: type[Parser], source: str) -> list[Stmt]:
+    return parser(RegexScanner(source).scan_tokens()).parse()
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        'var a = -b + c * (d - 1) / e >= f or !g and h(i, 2) == "s";',
+        "a = b = c = d;",
+        "fun f(a, b) { for (var i = 0; i < a; i = i + 1) { if (b) print i; } }",
+        "for (;;) while (a) { return; } if (a) if (b) print 1; else print 2;",
+        "f(1)(2)(); { var x; { x = 1; } }",
+    ],
+)
+def test_same_trees_as_parser(source):
+    assert _parse(StackParser, source) == _parse(Parser, source)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "(a;",
+        "f(a,;",
+        "1 = 2; -;",
+        "fun (",
+        "{ var = 3; print 2;",
+        "f(" + ", ".join(["1"] * 256) + ");",
+    ],
+)
+def test_same_errors_as_parser(capsys, source):
+    with pytest.raises(ParserError) as expected:
+        _parse(Parser, source)
+    expected_err = capsys.readouterr().err
+
+    with pytest.raises(ParserError) as e:
+        _parse(StackParser, source)
+
+    assert e.value.message == expected.value.message
+    assert e.value.token == expected.value.token
+    assert capsys.readouterr().err == expected_err
+
+
+def _call_nested(depth: int, f: Callable[[], None]) -> None:
+    """Call f that many frames further down the Python stack."""
+    if depth:
+        _call_nested(depth - 1, f)
+    else:
+        f()
+
+
+def test_too_much_nesting_for_parser(tmp_path, capsys, monkeypatch):
+    path = tmp_path / "test.lox"
+    path.write_text("print " + "(" * 1000 + "1" + ")" * 1000 + ";")
+    monkeypatch.setattr(sys, "argv", ["plox", str(path)])
+
+    # Where the RecursionError is raised, and so what its frames hold, depends on how
+    # deep the stack already is.
+    for depth in range(50):
+        with pytest.raises(SystemExit) as e:
+            _call_nested(depth, cli.main)
+
+        assert e.value.code == 65
+        _, err = capsys.readouterr()
+        assert err == "[line 1] Error at '(': Too much nesting.\n"
+
+
+# Nested trees are walked in loops, since comparing them would recurse.
+
+
+def test_deeply_nested_groupings():
+    source = "(" * _DEPTH + "1" + ")" * _DEPTH + ";"
+
+    [statement] = _parse(StackParser, source)
+
+    assert isinstance(statement, Expression)
+    expr: Expr = statement.expression
+    for _ in range(_DEPTH):
+        assert isinstance(expr, Grouping)
+        expr = expr.expression
+    assert expr == Literal(1.0)
+
+
+def test_deeply_nested_unary():
+    [statement] = _parse(StackParser, "-" * _DEPTH + "1;")
+
+    assert isinstance(statement, Expression)
+    expr: Expr = statement.expression
+    for _ in range(_DEPTH):
+        assert isinstance(expr, Unary)
+        expr = expr.right
+    assert expr == Literal(1.0)
+
+
+def test_deeply_nested_calls():
+    [statement] = _parse(StackParser, "f(" * _DEPTH + ")" * _DEPTH + ";")
+
+    assert isinstance(statement, Expression)
+    expr: Expr = statement.expression
+    for _ in range(_DEPTH - 1):
+        assert isinstance(expr, Call)
+        [expr] = expr.arguments
+    assert isinstance(expr, Call) and not expr.arguments
+
+
+def test_deeply_nested_blocks():
+    [statement] = _parse(StackParser, "{" * _DEPTH + "}" * _DEPTH)
+
+    for _ in range(_DEPTH - 1):
+        assert isinstance(statement, Block)
+        [statement] = statement.statements
+    assert statement == Block([])
+
+
+def test_deeply_nested_ifs():
+    [statement] = _parse(StackParser, "if (a) " * _DEPTH + "print 1;")
+
+    for _ in range(_DEPTH):
+        assert isinstance(statement, If)
+        statement = statement.then_branch
+    assert not isinstance(statement, If)
+
+
+def test_deeply_nested_error(capsys):
+    with pytest.raises(ParserError, match="Expect '\\)' after expression."):
+        _parse(StackParser, "(" * _DEPTH + "1;")
+
+    assert capsys.readouterr().err == (
+        "[line 1] Error at ';': Expect ')' after expression.\n"
+    )
+
+
+def test_parser_reports_too_much_nesting(capsys):
+    with pytest.raises(ParserError, match="Too much nesting."):
+        _parse(Parser, "(" * _DEPTH + "1" + ")" * _DEPTH + ";")
+
+    assert capsys.readouterr().err == "[line 1] Error at '(': Too much nesting.\n"
@@ -0,0 +1,80 @@
+import pytest
+
+from plox.errors import ExecutionError
+from plox.interpreter import ClosureInterpreter, Interpreter
+from plox.lox import Lox
+
+_ENGINES = pytest.mark.parametrize(
+    "engine", [Interpreter, ClosureInterpreter], ids=["tree", "closure"]
+)
+
+
+@_ENGINES
+def test_tail_recursion_in_constant_stack(capsys, engine):
+    Lox(engine=engine).run("""
+        fun sum(n, total) {
+            if (n == 0) return total;
+            return sum(n - 1, total + n);
+        }
+        print sum(1000000, 0);
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out == "500000500000\n"
+
+
+@_ENGINES
+def test_mutual_tail_recursion(capsys, engine):
+    Lox(engine=engine).run("""
+        fun even(n) {
+            if (n == 0) return true;
+            return (odd(n - 1));
+        }
+        fun odd(n) {
+            if (n == 0) return false;
+            { return even(n - 1); }
+        }
+        print even(100001);
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out == "false\n"
+
+
+@_ENGINES
+def test_tail_calls_to_closures_and_natives(capsys, engine):
+    Lox(engine=engine).run("""
+        fun adder(n) {
+            fun add(m) { return n + m; }
+            return add;
+        }
+        fun apply(f, x) { return f(x); }
+        fun now() { return clock(); }
+        print apply(adder(1), 2);
+        print now() > 0;
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["3", "true"]
+
+
+@_ENGINES
+@pytest.mark.parametrize(
+    "source,error",
+    [
+        (
+            "fun f() {\n  return nil(f());\n}\nf();",
+            "[line 2] Error: Can only call functions and classes.",
+        ),
+        (
+            "fun f(a) {\n  return f(\n    1, 2);\n}\nf(1);",
+            "[line 3] Error: Expected 1 arguments but got 2.",
+        ),
+    ],
+)
+def test_tail_call_errors(capsys, engine, source, error):
+    with pytest.raises(ExecutionError):
+        Lox(engine=engine).run(source)
+
+    _, err = capsys.readouterr()
+    assert err == error + "\n"
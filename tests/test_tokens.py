@@ -0,0 +1,73 @@
+import pytest
+
+from plox.parser import Parser
+from plox.scanner import RegexScanner, Scanner
+from plox.tokens import Token, TokenStream, TokenType
+
+
+@pytest.fixture(name="stream")
+def stream_():
+    source = 'var s = "str";'
+    stream = TokenStream(source)
+    stream.append(TokenType.VAR, 0, 3, 1)
+    stream.append(TokenType.IDENTIFIER, 4, 5, 1)
+    stream.append(TokenType.EQUAL, 6, 7, 1)
+    stream.append(TokenType.STRING, 8, 13, 1, "str")
+    stream.append(TokenType.SEMICOLON, 13, 14, 1)
+    stream.append(TokenType.EOF, 14, 14, 1)
+    return stream
+
+
+def test_materializes_tokens(stream):
+    assert len(stream) == 6
+    assert stream[0] == Token(TokenType.VAR, "var", None, 1)
+    assert stream[3] == Token(TokenType.STRING, '"str"', "str", 1)
+    assert stream[-1] == Token(TokenType.EOF, "", None, 1)
+
+
+def test_slice(stream):
+    assert stream[1:3] == [
+        Token(TokenType.IDENTIFIER, "s", None, 1),
+        Token(TokenType.EQUAL, "=", None, 1),
+    ]
+
+
+def test_index_out_of_range(stream):
+    with pytest.raises(IndexError):
+        _ = stream[6]
+
+
+def test_equals_list(stream):
+    tokens = list(stream)
+
+    assert stream == tokens
+    assert tokens == stream
+    assert stream != tokens[:-1]
+
+
+def test_scanned_stream_equals_scanner_tokens():
+    src = 'fun f(a) {\n  return a + 1.5 * "x\ny";\n}\n// done\n'
+
+    assert RegexScanner(src).scan_tokens() == Scanner(src).scan_tokens()
+
+
+def test_parse_stream():
+    src = 'print "a" + "b";'
+
+    assert (
+        Parser(RegexScanner(src).scan_tokens()).parse()
+        == Parser(Scanner(src).scan_tokens()).parse()
+    )
+
+
+def test_iter_from(stream):
+    assert list(stream.iter_from(3)) == stream[3:]
+
+
+def test_block_end():
+    stream = RegexScanner("{ a { b } { } c } d; {").scan_tokens()
+
+    assert stream[stream.block_end(1)] == Token(TokenType.RIGHT_BRACE, "}", None, 1)
+    assert stream.block_end(1) == 8
+    assert stream.block_end(3) == 4
+    assert stream.block_end(11) == len(stream) - 1
@@ -0,0 +1,115 @@
+import pytest
+
+from plox.errors import ExecutionError
+from plox.interpreter import TranspilingInterpreter
+from plox.lox import Lox
+
+
+@pytest.mark.parametrize(
+    "source,error",
+    [
+        ("print 1;\n\nprint a;", "[line 3] Error: Undefined variable 'a'."),
+        ("var a;\n{\n  b = a;\n}", "[line 3] Error: Undefined variable 'b'."),
+        (
+            "fun f() {\n  return g();\n}\nf();",
+            "[line 2] Error: Undefined variable 'g'.",
+        ),
+        (
+            'print 1 +\n  "a";',
+            "[line 1] Error: Unsupported operands for '+', must both"
+            " be 'string' or 'number'.",
+        ),
+        ("var f = 1;\n\nf();", "[line 3] Error: Can only call functions and classes."),
+        # Python allows at most 20 nested loops.
+        (
+            "var a = false;\n" + "while (a)\n" * 21 + "print 1;",
+            "[line 22] Error: Too much nesting.",
+        ),
+        # Unlike the other engines, calls in tail position use the Python stack.
+        ("fun f() {\n  return f();\n}\nf();", "[line 2] Error: Stack overflow."),
+    ],
+)
+def test_errors_on_lox_lines(capsys, source, error):
+    with pytest.raises(ExecutionError):
+        Lox(engine=TranspilingInterpreter).run(source)
+
+    _, err = capsys.readouterr()
+    assert err == error + "\n"
+
+
+def test_closures_capture_each_iteration(capsys):
+    Lox(engine=TranspilingInterpreter).run("""
+        var first;
+        var second;
+        for (var i = 0; i < 2; i = i + 1) {
+            var j = i;
+            fun get() { return j; }
+            if (first == nil) first = get; else second = get;
+        }
+        print first();
+        print second();
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["0", "1"]
+
+
+def test_return_from_block(capsys):
+    Lox(engine=TranspilingInterpreter).run("""
+        fun find(n) {
+            for (var i = 0; i < 10; i = i + 1) {
+                {
+                    fun get() { return i; }
+                    if (i == n) return get() * 10;
+                }
+            }
+            return -1;
+        }
+        print find(3);
+        print find(20);
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["30", "-1"]
+
+
+def test_same_slot_in_enclosing_function(capsys):
+    Lox(engine=TranspilingInterpreter).run("""
+        fun outer() {
+            var a = "outer";
+            fun inner() {
+                print a;
+                { var a = "inner"; print a; }
+            }
+            inner();
+        }
+        outer();
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["outer", "inner"]
+
+
+def test_python_names(capsys):
+    Lox(engine=TranspilingInterpreter).run("""
+        var def = "def";
+        var _tokens = "tokens";
+        fun type(float) { return float; }
+        print type(def) + _tokens;
+        print type;
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["deftokens", "<fn", "type>"]
+
+
+def test_globals_kept_between_statements(capsys):
+    Lox(engine=TranspilingInterpreter, streaming=True).run("""
+        var a = 1;
+        fun f() { a = a + 1; return a; }
+        f();
+        print f();
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out == "3\n"
@@ -0,0 +1,194 @@
+import pytest
+
+from plox.bytecode import Code, OpCode, disassemble
+from plox.compiler import compile_script
+from plox.errors import ExecutionError
+from plox.interpreter import VMInterpreter
+from plox.lox import Lox
+from plox.parser import Parser
+from plox.resolver import resolve
+from plox.scanner import RegexScanner
+
+
+def _compile(source: str) -> Code:
+    statements = Parser(RegexScanner(source).scan_tokens()).parse()
+    resolve(statements)
+    return compile_script(statements)
+
+
+def test_disassemble():
+    code = _compile("var a = 1;\n{\n  var b = a + 1;\n  print b;\n}")
+
+    assert disassemble(code) == [
+        "1 CONSTANT 0",
+        "1 DEFINE_GLOBAL 1",
+        "3 GET_GLOBAL 1",
+        "3 CONSTANT 0",
+        "3 ADD",
+        "4 GET_LOCAL 1",
+        "4 PRINT",
+        "4 POP",
+        "4 NIL",
+        "4 RETURN",
+    ]
+
+
+def test_constants_deduplicated():
+    code = _compile('print 1 == "1"; print "1"; print 1;')
+
+    assert code.constants == [1.0, "1"]
+
+
+def test_closure_upvalues():
+    code = _compile("fun f() {\n  var a;\n  fun g() { return a; }\n}")
+    function = code.constants[0]
+    assert isinstance(function, Code)
+
+    assert [OpCode.CLOSURE.name, "0", "1", "1"] in [
+        line.split()[1:] for line in disassemble(function)
+    ]
+
+
+@pytest.mark.parametrize(
+    "source,error",
+    [
+        ("print 1;\n\nprint a;", "[line 3] Error: Undefined variable 'a'."),
+        ("var a;\n{\n  b = a;\n}", "[line 3] Error: Undefined variable 'b'."),
+        (
+            "fun f() {\n  return g();\n}\nf();",
+            "[line 2] Error: Undefined variable 'g'.",
+        ),
+        (
+            'print 1 +\n  "a";',
+            "[line 1] Error: Unsupported operands for '+', must both"
+            " be 'string' or 'number'.",
+        ),
+        ("var f = 1;\n\nf();", "[line 3] Error: Can only call functions and classes."),
+        (
+            "fun f(a) {}\nf(\n  1, 2\n);",
+            "[line 4] Error: Expected 1 arguments but got 2.",
+        ),
+    ],
+)
+def test_errors_on_lox_lines(capsys, source, error):
+    with pytest.raises(ExecutionError):
+        Lox(engine=VMInterpreter).run(source)
+
+    _, err = capsys.readouterr()
+    assert err == error + "\n"
+
+
+def test_callee_checked_before_arguments(capsys):
+    with pytest.raises(ExecutionError):
+        Lox(engine=VMInterpreter).run('fun f() { print "called"; }\nnil(f());')
+
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert err == "[line 2] Error: Can only call functions and classes.\n"
+
+
+def test_closures_capture_each_iteration(capsys):
+    Lox(engine=VMInterpreter).run("""
+        var first;
+        var second;
+        for (var i = 0; i < 2; i = i + 1) {
+            var j = i;
+            fun get() { return j; }
+            if (first == nil) first = get; else second = get;
+        }
+        print first();
+        print second();
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["0", "1"]
+
+
+def test_closures_share_variable(capsys):
+    Lox(engine=VMInterpreter).run("""
+        fun pair() {
+            var n = 0;
+            fun get() { return n; }
+            fun set(v) { n = v; }
+            set(1);
+            return get;
+        }
+        var get = pair();
+        print get();
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out == "1\n"
+
+
+def test_return_from_block(capsys):
+    Lox(engine=VMInterpreter).run("""
+        fun find(n) {
+            for (var i = 0; i < 10; i = i + 1) {
+                {
+                    fun get() { return i; }
+                    if (i == n) return get() * 10;
+                }
+            }
+            return -1;
+        }
+        print find(3);
+        print find(20);
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out.split() == ["30", "-1"]
+
+
+def test_deep_recursion(capsys):
+    Lox(engine=VMInterpreter).run("""
+        fun count(n) {
+            if (n == 0) return 0;
+            return count(n - 1) + 1;
+        }
+        print count(99999);
+        """)
+
+    out, _ = capsys.readouterr()
+    # 100000 calls, as many as the default maximum depth allows at once.
+    assert out == "99999\n"
+
+
+def test_stack_overflow(capsys):
+    lox = Lox(engine=lambda: VMInterpreter(max_depth=100), streaming=True)
+    lox.run("""
+        fun count(n) {
+            if (n == 0) return 0;
+            return count(
+                n - 1) + 1;
+        }
+        print count(99);
+        """)
+    with pytest.raises(ExecutionError):
+        lox.run("print count(100);")
+    # The frames are counted afresh for each statement.
+    lox.run("print count(99);")
+
+    out, err = capsys.readouterr()
+    assert out == "99\n99\n"
+    assert err == "[line 5] Error: Stack overflow.\n"
+
+
+def test_unbounded_recursion(capsys):
+    with pytest.raises(ExecutionError):
+        Lox(engine=VMInterpreter).run("fun f(n) { return f(n + 1) + 1; }\nf(0);")
+
+    _, err = capsys.readouterr()
+    assert err == "[line 1] Error: Stack overflow.\n"
+
+
+def test_globals_kept_between_statements(capsys):
+    Lox(engine=VMInterpreter, streaming=True).run("""
+        var a = 1;
+        fun f() { a = a + 1; return a; }
+        f();
+        print f();
+        """)
+
+    out, _ = capsys.readouterr()
+    assert out == "3\n"